@@ -1,36 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Optional
 from sqlalchemy.orm import Session
+from app.core.container import container
 from app.core.database import get_db
+from app.core.executor import run_cpu, run_io
 from app.models.article import Article
-from app.services.search_service import SearchService
+from app.services.recommendations import recommendations
+from app.utils.pagination import paginate, select_columns
 
 router = APIRouter()
-search_service = SearchService()
 
 @router.get("/")
 async def get_articles(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    after_id: Optional[int] = None,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all articles with pagination"""
-    articles = db.query(Article).offset(skip).limit(limit).all()
+    """Get all articles with offset or keyset (after_id) pagination"""
+    columns = select_columns(Article, fields)
+    query = db.query(*columns) if columns else db.query(Article)
+    articles = await run_io(
+        paginate, query, Article, response, skip, limit, after_id, projected=bool(columns)
+    )
     return articles
 
 @router.get("/search")
 async def search_articles(
     query: str = Query(..., min_length=2),
     limit: int = 10,
+    mode: Optional[str] = Query(None, pattern="^(dense|inverted|hybrid|semantic)$"),
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    content_type: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Search articles using TF-IDF"""
-    results = search_service.search(query, limit, db)
+    """Search articles using TF-IDF, optionally over full-text index candidates"""
+    try:
+        results = await run_cpu(
+            container.search_service.search, query, limit, db, mode=mode,
+            year_from=year_from, year_to=year_to, content_type=content_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return results
 
+@router.get("/{article_id}/related")
+async def get_related_articles(article_id: int, limit: int = Query(10, ge=1, le=100)):
+    """Get the precomputed most similar articles"""
+    if not recommendations.is_built:
+        raise HTTPException(
+            status_code=503,
+            detail="Recommendations not built. Build them with: python scripts/build_search_index.py --recommendations"
+        )
+    related = recommendations.related(article_id, limit)
+    if related is None:
+        raise HTTPException(status_code=404, detail="Article not indexed")
+    return {"article_id": article_id, "related": related}
+
 @router.get("/{article_id}")
 async def get_article(article_id: int, db: Session = Depends(get_db)):
     """Get specific article"""
-    article = db.query(Article).filter(Article.id == article_id).first()
+    article = await run_io(lambda: db.query(Article).filter(Article.id == article_id).first())
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     return article
\ No newline at end of file
@@ -1,33 +1,141 @@
-from fastapi import APIRouter, Depends
-from app.core.database import get_neo4j
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.config import settings
+from app.core.container import container
+from app.core.executor import run_cpu, run_io
+from app.services.graph_engine import graph_engine
+from app.services.graph_queries import graph_queries
+from app.services.graph_sync import SyncInProgress, graph_sync
+from app.utils.export import stream_rows
+
+NETWORK_EXPORT_TYPES = {'student_id': int, 'relationship': str, 'target_label': str, 'target': str}
 
 router = APIRouter()
 
+def use_memory_engine():
+    return settings.GRAPH_BACKEND == "memory"
+
 @router.get("/students/network")
 async def get_student_network(limit: int = 50):
-    """Get student network from Neo4j"""
-    neo4j = get_neo4j()
-    
-    query = f"""
-    MATCH (s:Student)-[r]->(n)
-    RETURN s, r, n
-    LIMIT {limit}
-    """
+    """Get student network from Neo4j or the in-memory snapshot"""
+    if use_memory_engine():
+        results = await run_cpu(lambda: graph_engine.current().network(limit))
+        return {"nodes": len(results), "data": results}
     
-    results = neo4j.query(query)
+    results = await run_io(graph_queries.run, "student_network", {"limit": limit})
     return {"nodes": len(results), "data": results}
 
+@router.get("/students/network/export")
+async def export_student_network(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|arrow)$"),
+    limit: Optional[int] = None
+):
+    """Stream student relationships as NDJSON, CSV or Arrow IPC"""
+    if use_memory_engine():
+        snapshot = await run_io(graph_engine.current)
+        rows = snapshot.iter_edges(limit)
+    elif limit is not None:
+        rows = graph_queries.stream("student_network_export_limited", {"limit": limit})
+    else:
+        rows = graph_queries.stream("student_network_export")
+    return stream_rows(
+        rows, list(NETWORK_EXPORT_TYPES), format, "student_network", NETWORK_EXPORT_TYPES
+    )
+
 @router.get("/cities/depression")
 async def get_cities_depression():
     """Get depression rate by city"""
-    neo4j = get_neo4j()
-    
-    query = """
-    MATCH (s:Student)-[:LIVES_IN]->(c:City)
-    WHERE s.depression = 1
-    RETURN c.name as city, count(s) as depressed_count
-    ORDER BY depressed_count DESC
-    """
-    
-    results = neo4j.query(query)
-    return results
\ No newline at end of file
+    if use_memory_engine():
+        return await run_cpu(lambda: graph_engine.current().depressed_count_by_city())
+    return await run_io(graph_queries.run, "depressed_count_by_city")
+
+@router.get("/students/{student_id}/network")
+async def get_student_neighborhood(student_id: int):
+    """Get the relationships around one student"""
+    if use_memory_engine():
+        return await run_cpu(lambda: graph_engine.current().neighborhood(student_id))
+    return await run_io(container.graph_service.get_student_network, student_id)
+
+@router.get("/cities/stats")
+async def get_city_stats():
+    """Get students, depressed count and rate per city"""
+    if use_memory_engine():
+        return await run_cpu(lambda: graph_engine.current().depression_by_city())
+    return await run_io(container.graph_service.get_depression_by_city)
+
+@router.get("/professions/stats")
+async def get_profession_stats():
+    """Get students, depressed count and rate per profession"""
+    if use_memory_engine():
+        return await run_cpu(lambda: graph_engine.current().depression_by_profession())
+    return await run_io(container.graph_service.get_depression_by_profession)
+
+@router.get("/engine/status")
+async def get_engine_status():
+    """Get the in-memory graph snapshot status"""
+    return graph_engine.status()
+
+@router.post("/engine/reload")
+async def reload_engine(force: bool = False):
+    """Rebuild the in-memory graph snapshot if the data changed"""
+    swapped = await run_io(graph_engine.reload, force)
+    return {"reloaded": swapped, **graph_engine.status()}
+
+@router.get("/engine/pagerank")
+async def get_engine_pagerank(limit: int = 20):
+    """Get PageRank computed on the in-memory snapshot"""
+    return await run_cpu(lambda: graph_engine.current().pagerank(limit))
+
+@router.get("/engine/components")
+async def get_engine_components(limit: int = 20):
+    """Get connected components of the in-memory snapshot"""
+    return await run_cpu(lambda: graph_engine.current().components(limit))
+
+@router.get("/engine/students/{student_id}/degree")
+async def get_student_degree(student_id: int):
+    """Get a student's degree in the in-memory snapshot"""
+    degree = await run_cpu(lambda: graph_engine.current().degree(student_id))
+    if degree is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return {"student_id": student_id, "degree": degree}
+
+@router.get("/queries/stats")
+async def get_query_stats():
+    """Get per-query latency and row counts for the registered Cypher"""
+    return graph_queries.stats()
+
+@router.get("/analytics/status")
+async def get_analytics_status():
+    """Get GDS projection and precomputed analytics status"""
+    return await run_io(container.graph_analytics.status)
+
+@router.post("/analytics/refresh")
+async def refresh_analytics(force: bool = False):
+    """Recompute PageRank and communities if the graph changed"""
+    summary = await run_io(container.graph_analytics.ensure_fresh, force)
+    return {"refreshed": summary is not None, "summary": summary}
+
+@router.get("/analytics/pagerank")
+async def get_pagerank(limit: int = 20):
+    """Get students with the highest precomputed PageRank"""
+    return await run_io(container.graph_analytics.top_pagerank, limit)
+
+@router.get("/analytics/communities")
+async def get_communities(limit: int = 20):
+    """Get the largest precomputed Louvain communities"""
+    return await run_io(container.graph_analytics.top_communities, limit)
+
+@router.get("/sync/status")
+async def get_sync_status():
+    """Get the PostgreSQL → Neo4j sync watermark, lag and last run"""
+    return graph_sync.status()
+
+@router.post("/sync")
+async def run_sync(reset: bool = False):
+    """Merge students changed since the watermark into Neo4j now; reset resyncs all"""
+    try:
+        if reset:
+            await run_io(graph_sync.reset)
+        return await run_io(graph_sync.run_once)
+    except SyncInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
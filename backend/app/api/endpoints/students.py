@@ -1,20 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
 from pydantic import BaseModel
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.container import container
+from app.core.database import SessionLocal, get_db
+from app.core.executor import ExecutorSaturated, run_cpu, run_io
 from app.models.student import Student
-from app.services.ml_service import MLService
+from app.services.model_registry import ModelRegistryError
+from app.services.prediction_cache import prediction_cache
+from app.services.recommendations import recommendations
+from app.services.stats_service import stats_service
+from app.utils.export import column_types, stream_rows
+from app.utils.pagination import paginate, select_columns
 
 router = APIRouter()
-ml_service = MLService()
-
-# Load model at startup
-try:
-    ml_service.load_model('/app/models/depression_model.pkl')
-except:
-    print("⚠️ Model not found. Train it first with: python scripts/train_model.py")
 
 class StudentCreate(BaseModel):
     gender: str
@@ -33,14 +35,22 @@ class StudentCreate(BaseModel):
 
 @router.get("/")
 async def get_all_students(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after_id: Optional[int] = None,
+    fields: Optional[str] = None,
     depression: Optional[int] = None,
     city: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all students with filters"""
-    query = db.query(Student)
+    """Get all students with filters, offset or keyset (after_id) pagination"""
+    columns = select_columns(Student, fields)
+    return await run_io(_list_students, db, response, skip, limit, after_id, columns, depression, city)
+
+def _list_students(db: Session, response: Response, skip: int, limit: int, after_id: Optional[int],
+                   columns: Optional[list], depression: Optional[int], city: Optional[str]):
+    query = db.query(*columns) if columns else db.query(Student)
     
     if depression is not None:
         query = query.filter(Student.depression == depression)
@@ -48,85 +58,161 @@ async def get_all_students(
     if city:
         query = query.filter(Student.city == city)
     
-    students = query.offset(skip).limit(limit).all()
-    return students
+    return paginate(query, Student, response, skip, limit, after_id, projected=bool(columns))
+
+@router.get("/export")
+async def export_students(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|arrow)$"),
+    fields: Optional[str] = None,
+    depression: Optional[int] = None,
+    city: Optional[str] = None
+):
+    """Stream every matching student as NDJSON, CSV or Arrow IPC"""
+    columns = select_columns(Student, fields) or list(Student.__table__.columns)
+    names = [column.name for column in columns]
+    return stream_rows(
+        _iter_students(columns, depression, city), names, format, "students", column_types(columns)
+    )
+
+def _iter_students(columns: list, depression: Optional[int], city: Optional[str]):
+    # Own session: get_db() is closed before a streaming body starts
+    db = SessionLocal()
+    try:
+        query = db.query(*columns).order_by(Student.id)
+        
+        if depression is not None:
+            query = query.filter(Student.depression == depression)
+        
+        if city:
+            query = query.filter(Student.city == city)
+        
+        # yield_per uses a server-side cursor, so rows arrive in batches
+        for row in query.yield_per(settings.EXPORT_BATCH_SIZE):
+            yield row._asdict()
+    finally:
+        db.close()
 
 @router.get("/stats/overview")
 async def get_statistics(db: Session = Depends(get_db)):
     """Get general statistics"""
-    total = db.query(Student).count()
-    depressed = db.query(Student).filter(Student.depression == 1).count()
-    
-    avg_cgpa = db.query(func.avg(Student.cgpa)).scalar()
-    avg_age = db.query(func.avg(Student.age)).scalar()
-    
-    suicidal = db.query(Student).filter(Student.suicidal_thoughts == 'Yes').count()
-    
-    return {
-        "total_students": total,
-        "depressed_count": depressed,
-        "depression_rate": round(depressed / total * 100, 2) if total > 0 else 0,
-        "avg_cgpa": round(avg_cgpa, 2) if avg_cgpa else 0,
-        "avg_age": round(avg_age, 2) if avg_age else 0,
-        "suicidal_thoughts_count": suicidal,
-        "suicidal_rate": round(suicidal / total * 100, 2) if total > 0 else 0
-    }
+    return await run_io(stats_service.overview, db)
 
 @router.get("/stats/by_city")
 async def get_stats_by_city(db: Session = Depends(get_db)):
     """Get depression statistics by city"""
-    results = db.query(
-        Student.city,
-        func.count(Student.id).label('total'),
-        func.sum(Student.depression).label('depressed')
-    ).group_by(Student.city).all()
-    
-    stats = []
-    for city, total, depressed in results:
-        if city:
-            stats.append({
-                "city": city,
-                "total": total,
-                "depressed": depressed or 0,
-                "rate": round((depressed or 0) / total * 100, 2)
-            })
-    
-    return sorted(stats, key=lambda x: x['rate'], reverse=True)
+    return await run_io(stats_service.by_city, db)
 
 @router.get("/stats/by_profession")
 async def get_stats_by_profession(db: Session = Depends(get_db)):
     """Get depression statistics by profession"""
-    results = db.query(
-        Student.profession,
-        func.count(Student.id).label('total'),
-        func.sum(Student.depression).label('depressed')
-    ).group_by(Student.profession).all()
-    
-    stats = []
-    for profession, total, depressed in results:
-        if profession:
-            stats.append({
-                "profession": profession,
-                "total": total,
-                "depressed": depressed or 0,
-                "rate": round((depressed or 0) / total * 100, 2)
-            })
-    
-    return sorted(stats, key=lambda x: x['rate'], reverse=True)
+    return await run_io(stats_service.by_profession, db)
+
+@router.get("/stats/cache")
+async def get_stats_cache():
+    """Get statistics cache hit ratio"""
+    return stats_service.cache.stats()
+
+def _active_model():
+    """MLService for this request; a hot swap does not affect it once taken"""
+    try:
+        return container.model_manager.current()
+    except ModelRegistryError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/model")
+async def get_model_status():
+    """Get the active model version and its load time"""
+    return container.model_manager.status()
+
+@router.post("/model/reload")
+async def reload_model(force: bool = False):
+    """Load the registry's active model version if it changed"""
+    try:
+        swapped = await run_io(container.model_manager.refresh, force)
+    except ModelRegistryError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"reloaded": swapped, **container.model_manager.status()}
+
+@router.get("/predict/cache")
+async def get_prediction_cache():
+    """Get prediction cache hit ratio and evictions"""
+    return prediction_cache.stats()
 
 @router.post("/predict")
 async def predict_depression(student: StudentCreate):
     """Predict depression for a new student"""
+    ml_service = _active_model()
+    try:
+        if settings.PREDICTION_CACHE_ENABLED:
+            return await run_cpu(prediction_cache.predict, ml_service, student.dict())
+        return await run_cpu(ml_service.predict, student.dict())
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+@router.post("/predict/batch")
+async def predict_depression_batch(
+    students: List[StudentCreate],
+    format: str = Query("json", pattern="^(json|ndjson)$")
+):
+    """Predict depression for a cohort of students in one vectorized call"""
+    if len(students) > settings.PREDICT_BATCH_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(students)} > {settings.PREDICT_BATCH_MAX}"
+        )
+    
+    records = [student.dict() for student in students]
+    ml_service = _active_model()
+    
     try:
-        prediction = ml_service.predict(student.dict())
-        return prediction
+        X = await run_cpu(ml_service.encode_records, records)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    if format == "ndjson":
+        chunk_size = settings.PREDICT_STREAM_CHUNK
+        # Chunks go through the CPU pool too; the first runs before the response
+        # starts, so a saturated pool still answers 503
+        first = await run_cpu(ml_service.predict_encoded, X[:chunk_size])
+        
+        def lines(chunk):
+            return "".join(json.dumps(prediction) + "\n" for prediction in chunk)
+        
+        async def stream_predictions():
+            yield lines(first)
+            for start in range(chunk_size, len(X), chunk_size):
+                yield lines(await run_cpu(ml_service.predict_encoded, X[start:start + chunk_size]))
+        
+        return StreamingResponse(stream_predictions(), media_type="application/x-ndjson")
+    
+    try:
+        return await run_cpu(ml_service.predict_encoded, X)
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 @router.get("/{student_id}")
 async def get_student(student_id: int, db: Session = Depends(get_db)):
     """Get specific student by ID"""
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await run_io(lambda: db.query(Student).filter(Student.id == student_id).first())
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return student
+
+@router.get("/{student_id}/recommended-articles")
+async def get_recommended_articles(student_id: int, limit: int = Query(10, ge=1, le=100),
+                                   db: Session = Depends(get_db)):
+    """Get precomputed articles for the student's risk profile"""
+    if not recommendations.is_built:
+        raise HTTPException(
+            status_code=503,
+            detail="Recommendations not built. Build them with: python scripts/build_search_index.py --recommendations"
+        )
+    student = await run_io(lambda: db.query(Student).filter(Student.id == student_id).first())
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return student
\ No newline at end of file
+    features = {column.name: getattr(student, column.name) for column in Student.__table__.columns}
+    return {"student_id": student_id, **recommendations.for_student(features, limit)}
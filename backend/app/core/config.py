@@ -9,14 +9,100 @@ class Settings(BaseSettings):
     NEO4J_URI: str = "bolt://neo4j:7687"
     NEO4J_USER: str = "neo4j"
     NEO4J_PASSWORD: str = "password123"
+    NEO4J_POOL_SIZE: int = 50
+    NEO4J_ACQUISITION_TIMEOUT: float = 30.0
+    NEO4J_LIVENESS_CHECK_TIMEOUT: Optional[float] = 30.0
+    NEO4J_MAX_CONNECTION_LIFETIME: float = 3600.0
+    NEO4J_MAX_RETRY_TIME: float = 15.0
+    NEO4J_FETCH_SIZE: int = 1000
+    NEO4J_BATCH_SIZE: int = 1000
+    NEO4J_LOAD_WORKERS: int = 1
+    
+    # Graph Data Science
+    GDS_GRAPH_NAME: str = "student-graph"
+    GDS_KEEP_PROJECTION: bool = True
+    GDS_COMMUNITY_MEMBERS: int = 100
+    
+    # Student similarity graph (SIMILAR_TO edges)
+    SIMILARITY_K: int = 10
+    SIMILARITY_BLOCK_SIZE: int = 2048
+    SIMILARITY_DATA_DIR: str = "./models/similarity"
+    
+    # Graph reads: "neo4j" or the in-process "memory" snapshot
+    GRAPH_BACKEND: str = "neo4j"
+    GRAPH_SNAPSHOT_SOURCE: str = "postgres"
+    GRAPH_SNAPSHOT_TTL: float = 300.0
+
+    # Incremental PostgreSQL → Neo4j sync (0 disables the background loop)
+    SYNC_INTERVAL: float = 30.0
+    SYNC_BATCH_SIZE: Optional[int] = None
+    SYNC_OVERLAP_SECONDS: float = 60.0
+
+    # Loading
+    LOAD_CHUNK_SIZE: int = 50000
+    
+    # Streaming exports
+    EXPORT_BATCH_SIZE: int = 5000
     
     # API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     DEBUG: bool = True
     
+    # Observability
+    SLOW_QUERY_MS: float = 200.0
+    HEALTH_TIMEOUT: float = 2.0
+
+    # Startup warm-up: comma-separated steps out of
+    # postgres, neo4j, model, search, recommendations, graph
+    WARMUP_COMPONENTS: str = "postgres,neo4j,model,search,recommendations,graph"
+    WARMUP_IN_BACKGROUND: bool = False
+    WARMUP_POOL_CONNECTIONS: int = 4
+    SEARCH_BUILD_ON_STARTUP: bool = False
+    
+    # Worker pools for blocking calls
+    IO_POOL_SIZE: int = 32
+    IO_POOL_QUEUE: int = 512
+    CPU_POOL_SIZE: Optional[int] = None
+    CPU_POOL_QUEUE: int = 256
+    
+    # Statistics
+    STATS_CACHE_TTL: float = 300.0
+    # Seconds between max(updated_at) checks for writes made by other processes (0 disables)
+    STATS_VERSION_INTERVAL: float = 5.0
+    
     # ML
     MODEL_PATH: str = "./models/depression_model.pkl"
+    MODEL_REGISTRY_DIR: str = "./models/registry"
+    MODEL_WATCH_INTERVAL: float = 10.0
+    PREDICT_BATCH_MAX: int = 10000
+    PREDICT_STREAM_CHUNK: int = 1000
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_BACKEND: str = "memory"
+    PREDICTION_CACHE_URL: str = "redis://redis:6379/0"
+    PREDICTION_CACHE_SIZE: int = 100000
+    PREDICTION_CACHE_TTL: float = 3600.0
+    PREDICTION_CACHE_DECIMALS: Optional[int] = None
+    TRAIN_CHUNK_SIZE: int = 50000
+    TRAIN_WORKERS: Optional[int] = None
+    TRAIN_DATA_DIR: str = "./models/training"
+    
+    # Search
+    SEARCH_INDEX_DIR: str = "./models/search_index"
+    SEARCH_MAX_FEATURES: int = 1000
+    SEARCH_REBUILD_RATIO: float = 0.2
+    SEARCH_MODE: str = "dense"
+    SEARCH_EARLY_TERMINATION: bool = False
+    SEARCH_HYBRID_CANDIDATES: int = 2000
+    SEARCH_EMBEDDING_DIR: str = "./models/embedding_index"
+    SEARCH_EMBEDDING_DIM: int = 256
+    SEARCH_EMBEDDING_MAX_FEATURES: int = 100000
+    SEARCH_IVF_LISTS: Optional[int] = None
+    SEARCH_IVF_NPROBE: int = 16
+    RECOMMENDATION_DIR: str = "./models/recommendations"
+    RECOMMENDATION_K: int = 20
+    # Rebuild recommendations at startup when the search index changed since
+    RECOMMENDATION_REFRESH_ON_STARTUP: bool = True
     
     class Config:
         env_file = ".env"
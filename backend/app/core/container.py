@@ -0,0 +1,148 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+class ServiceContainer:
+    """Process-wide services, each constructed on first use and only once
+
+    Factories import their service modules themselves, so importing the API
+    does not pull in the Neo4j driver, pandas or scikit-learn, and a backend
+    that is down fails the first call that needs it instead of the import.
+    Construction times are kept per service for the startup report.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._lock = threading.RLock()
+        self.timings = {}
+
+    def register(self, factory):
+        """Register a factory under its function name, usable as a decorator"""
+        self._factories[factory.__name__] = factory
+        return factory
+
+    def get(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                start = time.perf_counter()
+                instance = self._factories[name]()
+                self.timings[name] = round(time.perf_counter() - start, 4)
+                self._instances[name] = instance
+            return instance
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name not in self._factories:
+            raise AttributeError(name)
+        return self.get(name)
+
+    def is_loaded(self, name: str):
+        return name in self._instances
+
+    def reset(self, name: str):
+        """Drop an instance so the next use constructs a new one"""
+        with self._lock:
+            return self._instances.pop(name, None)
+
+container = ServiceContainer()
+
+@container.register
+def neo4j():
+    from app.core.database import Neo4jConnection
+    return Neo4jConnection()
+
+@container.register
+def model_manager():
+    from app.services.model_registry import ModelManager
+    return ModelManager()
+
+@container.register
+def search_service():
+    from app.services.search_service import SearchService
+    return SearchService()
+
+@container.register
+def graph_service():
+    from app.services.graph_service import GraphService
+    return GraphService()
+
+@container.register
+def graph_analytics():
+    from app.services.graph_analytics import GraphAnalytics
+    return GraphAnalytics()
+
+class Warmup:
+    """Runs startup steps in order, timing each, and tracks readiness
+
+    A failing step is recorded and warm-up moves on, so a missing index or
+    an unreachable backend degrades the service instead of stopping it.
+    The service is only ready once every step ran and no required one
+    failed; skipped steps do not count.
+    """
+
+    def __init__(self):
+        self.steps = []
+        self.required = set()
+        self.components = {}
+        self.started_at = None
+        self.seconds = None
+        self.finished = threading.Event()
+
+    def step(self, name: str, required: bool = False):
+        def decorator(fn):
+            self.steps.append((name, fn))
+            if required:
+                self.required.add(name)
+            return fn
+        return decorator
+
+    def run(self, enabled=None):
+        """Run the steps named in `enabled` (all when None)"""
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        start = time.perf_counter()
+        for name, fn in self.steps:
+            if enabled is not None and name not in enabled:
+                self.components[name] = {"status": "skipped"}
+                continue
+            step_start = time.perf_counter()
+            try:
+                detail = fn()
+                entry = {"status": "ok"}
+                if detail is not None:
+                    entry["detail"] = detail
+            except Exception as e:
+                entry = {"status": "failed", "error": str(e)}
+                print(f"⚠️ Warm-up {name} failed: {e}")
+            entry["seconds"] = round(time.perf_counter() - step_start, 4)
+            self.components[name] = entry
+            print(f"⏱️ Warm-up {name}: {entry['seconds']}s ({entry['status']})")
+        self.seconds = round(time.perf_counter() - start, 4)
+        self.finished.set()
+        print(f"✅ Warm-up finished in {self.seconds}s")
+
+    @property
+    def failed_required(self):
+        return [
+            name for name, _ in self.steps
+            if name in self.required and self.components.get(name, {}).get("status") == "failed"
+        ]
+
+    @property
+    def ready(self):
+        return self.finished.is_set() and not self.failed_required
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "failed_required": self.failed_required,
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "components": dict(self.components),
+            "services": dict(container.timings)
+        }
+
+warmup = Warmup()
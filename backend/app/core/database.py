@@ -1,11 +1,15 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from neo4j import GraphDatabase
+import threading
+import time
+from contextlib import ExitStack, contextmanager
 from app.core.config import settings
+from app.core.container import container
+from app.core.metrics import cypher_fingerprint, instrument_engine, metrics, record_query
 
 # PostgreSQL
-engine = create_engine(settings.DATABASE_URL)
+engine = instrument_engine(create_engine(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -16,23 +20,181 @@ def get_db():
     finally:
         db.close()
 
-# Neo4j
+def ping_postgres():
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+def prime_postgres(connections: int = 1):
+    """Open `connections` pooled connections at once, so first requests skip the handshake"""
+    with ExitStack() as stack:
+        for _ in range(connections):
+            stack.enter_context(engine.connect()).execute(text("SELECT 1"))
+    return connections
+
+# Neo4j; the driver package is imported on first use, the access modes
+# are the same strings as neo4j.READ_ACCESS and neo4j.WRITE_ACCESS
+READ_ACCESS = "READ"
+WRITE_ACCESS = "WRITE"
+
+_neo4j_driver = None
+_neo4j_driver_lock = threading.Lock()
+
+def get_neo4j_driver():
+    """Process-wide Neo4j driver, so every connection shares one pool"""
+    global _neo4j_driver
+    with _neo4j_driver_lock:
+        if _neo4j_driver is None:
+            from neo4j import GraphDatabase
+            _neo4j_driver = GraphDatabase.driver(
+                settings.NEO4J_URI,
+                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                max_connection_pool_size=settings.NEO4J_POOL_SIZE,
+                connection_acquisition_timeout=settings.NEO4J_ACQUISITION_TIMEOUT,
+                liveness_check_timeout=settings.NEO4J_LIVENESS_CHECK_TIMEOUT,
+                max_connection_lifetime=settings.NEO4J_MAX_CONNECTION_LIFETIME,
+                max_transaction_retry_time=settings.NEO4J_MAX_RETRY_TIME
+            )
+        return _neo4j_driver
+
 class Neo4jConnection:
+    """Neo4j access over the shared driver
+    
+    `read`/`write` run managed transaction functions, which the driver
+    retries on transient errors and routes to readers or the leader in a
+    cluster. `query` keeps the auto-commit behaviour needed for schema
+    statements and GDS procedures. `stream` yields records lazily.
+    """
+    
     def __init__(self):
-        self.driver = GraphDatabase.driver(
-            settings.NEO4J_URI,
-            auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
-        )
+        self.driver = get_neo4j_driver()
+        self._lock = threading.Lock()
+        self.sessions_active = 0
+        self.sessions_peak = 0
+        self.sessions_opened = 0
+        self.session_errors = 0
     
     def close(self):
+        global _neo4j_driver
+        with _neo4j_driver_lock:
+            if _neo4j_driver is self.driver:
+                _neo4j_driver = None
         self.driver.close()
     
+    @contextmanager
+    def session(self, access_mode=WRITE_ACCESS, **kwargs):
+        """Session from the shared driver, counted for session metrics"""
+        with self._lock:
+            self.sessions_active += 1
+            self.sessions_opened += 1
+            self.sessions_peak = max(self.sessions_peak, self.sessions_active)
+        try:
+            with self.driver.session(default_access_mode=access_mode, **kwargs) as session:
+                yield session
+        except Exception:
+            with self._lock:
+                self.session_errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.sessions_active -= 1
+    
+    @contextmanager
+    def _timed(self, cypher_query):
+        """Record a statement's latency and row count in the query metrics"""
+        start = time.perf_counter()
+        outcome = {"rows": None}
+        failed = False
+        try:
+            yield outcome
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # Also reached when a stream is closed early
+            record_query("neo4j", cypher_query, cypher_fingerprint(cypher_query),
+                         time.perf_counter() - start, outcome["rows"], failed)
+    
     def query(self, cypher_query, parameters=None):
-        with self.driver.session() as session:
+        with self._timed(cypher_query) as outcome, self.session() as session:
             result = session.run(cypher_query, parameters)
-            return [record.data() for record in result]
+            records = [record.data() for record in result]
+            outcome["rows"] = len(records)
+            return records
+    
+    def read(self, cypher_query, parameters=None):
+        """Run a read in a managed, retried transaction"""
+        with self._timed(cypher_query) as outcome, self.session(READ_ACCESS) as session:
+            records = session.execute_read(_collect, cypher_query, parameters or {})
+            outcome["rows"] = len(records)
+            return records
+    
+    def write(self, cypher_query, parameters=None):
+        """Run a write in a managed, retried transaction"""
+        with self._timed(cypher_query) as outcome, self.session(WRITE_ACCESS) as session:
+            records = session.execute_write(_collect, cypher_query, parameters or {})
+            outcome["rows"] = len(records)
+            return records
+    
+    def write_transaction(self, work, *args, **kwargs):
+        """Run `work(tx, ...)` as a managed, retried write transaction"""
+        with self.session(WRITE_ACCESS) as session:
+            return session.execute_write(work, *args, **kwargs)
+    
+    def stream(self, cypher_query, parameters=None, fetch_size: int = None):
+        """Yield records one at a time, fetching them from the server in batches"""
+        with self._timed(cypher_query) as outcome, \
+                self.session(READ_ACCESS, fetch_size=fetch_size or settings.NEO4J_FETCH_SIZE) as session:
+            result = session.run(cypher_query, parameters)
+            outcome["rows"] = 0
+            for record in result:
+                outcome["rows"] += 1
+                yield record.data()
+    
+    def session_stats(self):
+        """Sessions opened through this wrapper; the driver's own connection pool is not exposed"""
+        with self._lock:
+            return {
+                "max_pool_size": settings.NEO4J_POOL_SIZE,
+                "sessions_active": self.sessions_active,
+                "sessions_peak": self.sessions_peak,
+                "sessions_opened": self.sessions_opened,
+                "session_errors": self.session_errors
+            }
 
-neo4j_conn = Neo4jConnection()
+def _collect(tx, cypher_query, parameters):
+    return [record.data() for record in tx.run(cypher_query, parameters)]
 
 def get_neo4j():
-    return neo4j_conn
\ No newline at end of file
+    """Shared Neo4jConnection, created on first use"""
+    return container.neo4j
+
+def close_neo4j():
+    """Close the driver if it was ever opened"""
+    conn = container.reset("neo4j")
+    if conn is not None:
+        conn.close()
+
+def ping_neo4j():
+    with get_neo4j().session(READ_ACCESS) as session:
+        session.run("RETURN 1").consume()
+
+def prime_neo4j(connections: int = 1):
+    """Verify connectivity and fill the driver pool with `connections` connections"""
+    conn = get_neo4j()
+    conn.driver.verify_connectivity()
+    with ExitStack() as stack:
+        for _ in range(connections):
+            stack.enter_context(conn.session(READ_ACCESS)).run("RETURN 1").consume()
+    return connections
+
+@metrics.collector
+def neo4j_session_metrics():
+    if not container.is_loaded("neo4j"):
+        return []
+    stats = get_neo4j().session_stats()
+    return [
+        ("mindgraph_neo4j_sessions_active", "gauge", "Neo4j sessions open in this process, not driver connections", [({}, stats["sessions_active"])]),
+        ("mindgraph_neo4j_sessions_peak", "gauge", "Most Neo4j sessions open at once in this process", [({}, stats["sessions_peak"])]),
+        ("mindgraph_neo4j_sessions_opened_total", "counter", "Neo4j sessions opened", [({}, stats["sessions_opened"])]),
+        ("mindgraph_neo4j_session_errors_total", "counter", "Neo4j sessions that failed", [({}, stats["session_errors"])])
+    ]
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+from app.core.metrics import metrics
+
+class ExecutorSaturated(Exception):
+    """Raised when a pool's queue is full and new work is rejected"""
+
+class BoundedExecutor:
+    """Size-bounded thread pool for blocking calls made from async endpoints
+
+    At most `max_workers` calls run at once and at most `max_queue` wait for a
+    worker; anything beyond that is rejected instead of piling up behind a
+    slow backend. Queue depth and wait times are tracked for metrics.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"mindgraph-{name}"
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.peak_queued = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn` in the pool and await its result"""
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(f"{self.name} pool queue is full ({self.max_queue})")
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self.total_wait += started - submitted
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.total_run += time.perf_counter() - started
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._pool, task)
+        except RuntimeError:
+            # Pool already shut down, give the queue slot back
+            with self._lock:
+                self.queued -= 1
+            raise
+        return await future
+
+    def stats(self):
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "queued": self.queued,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait / finished * 1000, 3) if finished else 0.0,
+                "avg_run_ms": round(self.total_run / finished * 1000, 3) if finished else 0.0
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+# Database and Neo4j calls: mostly waiting on the network
+io_executor = BoundedExecutor(
+    "io", settings.IO_POOL_SIZE, settings.IO_POOL_QUEUE
+)
+
+# ML predictions and search scoring: CPU bound, sized to the cores
+cpu_executor = BoundedExecutor(
+    "cpu", settings.CPU_POOL_SIZE or os.cpu_count() or 1, settings.CPU_POOL_QUEUE
+)
+
+def run_io(fn, *args, **kwargs):
+    return io_executor.run(fn, *args, **kwargs)
+
+def run_cpu(fn, *args, **kwargs):
+    return cpu_executor.run(fn, *args, **kwargs)
+
+def executor_stats():
+    return {
+        "io": io_executor.stats(),
+        "cpu": cpu_executor.stats()
+    }
+
+@metrics.collector
+def executor_metrics():
+    stats = executor_stats()
+    families = []
+    for name, kind, documentation in (
+        ("active", "gauge", "Calls running in the worker pool"),
+        ("queued", "gauge", "Calls waiting for a worker"),
+        ("completed", "counter", "Calls that finished"),
+        ("failed", "counter", "Calls that raised"),
+        ("rejected", "counter", "Calls rejected because the queue was full")
+    ):
+        metric = f"mindgraph_executor_{name}" + ("_total" if kind == "counter" else "")
+        families.append((metric, kind, documentation, [({"pool": pool}, values[name]) for pool, values in stats.items()]))
+    return families
+
+def shutdown_executors():
+    io_executor.shutdown()
+    cpu_executor.shutdown()
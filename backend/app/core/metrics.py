@@ -0,0 +1,308 @@
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from app.core.config import settings
+
+# Seconds, from sub-millisecond cache hits to multi-second graph analytics
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: dict):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _format_value(value: float):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield self.name + "_total", dict(zip(self.labelnames, key)), value
+
+class Histogram:
+    """Cumulative-bucket latency histogram with optional labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        for key, (counts, total, count) in series.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                yield self.name + "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, count
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text format
+
+    Besides counters and histograms, collectors are callables returning
+    `(name, type, help, [(labels, value), ...])` tuples; they expose state
+    other components already track, such as pool utilization.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, collect):
+        with self._lock:
+            self._collectors.append(collect)
+        return collect
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for collect in collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                lines.append(f"# collector {getattr(collect, '__name__', collect)} failed: {_escape(e)}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+def timed(histogram: Histogram, **labels):
+    """Decorator observing a function's duration in `histogram`"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
+
+# Statement labels: SQL and Cypher texts are reduced to a short, bounded name
+_SQL_VERB = re.compile(r"^\s*(\w+)", re.IGNORECASE)
+_SQL_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE|INDEX\s+\w+\s+ON)\s+\"?(\w+)", re.IGNORECASE)
+_CYPHER_CLAUSE = re.compile(r"\b(MATCH|MERGE|CREATE|CALL)\b\s*(?:\(\s*\w*\s*:?\s*(\w+)|([\w.]+))?", re.IGNORECASE)
+
+_statement_names = {}
+
+def _normalize(text: str):
+    return " ".join(text.split())
+
+def name_statement(text: str, name: str):
+    """Label a statement with a given name instead of its fingerprint"""
+    _statement_names[_normalize(text)] = name
+
+def sql_fingerprint(statement: str):
+    verb = _SQL_VERB.match(statement)
+    table = _SQL_TABLE.search(statement)
+    return " ".join(part for part in (
+        verb.group(1).lower() if verb else "sql",
+        table.group(1).lower() if table else None
+    ) if part)
+
+def cypher_fingerprint(text: str):
+    named = _statement_names.get(_normalize(text))
+    if named:
+        return named
+    clause = _CYPHER_CLAUSE.search(text)
+    if not clause:
+        return "cypher"
+    target = clause.group(2) or clause.group(3)
+    return f"{clause.group(1).lower()} {target}" if target else clause.group(1).lower()
+
+class SlowQueryLog:
+    """Statements slower than SLOW_QUERY_MS, printed and kept for /metrics/slow-queries"""
+
+    def __init__(self, threshold_ms: float = None, maxlen: int = 100):
+        self.threshold_ms = settings.SLOW_QUERY_MS if threshold_ms is None else threshold_ms
+        self._entries = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, backend: str, statement: str, elapsed: float, rows: int = None):
+        elapsed_ms = elapsed * 1000
+        if self.threshold_ms <= 0 or elapsed_ms < self.threshold_ms:
+            return
+        text = _normalize(statement)
+        entry = {
+            "backend": backend,
+            "statement": text[:1000],
+            "ms": round(elapsed_ms, 3),
+            "rows": rows,
+            "at": datetime.now(timezone.utc).isoformat()
+        }
+        with self._lock:
+            self._entries.append(entry)
+        print(f"⚠️ Slow {backend} query ({entry['ms']} ms): {text[:200]}")
+
+    def entries(self):
+        with self._lock:
+            return list(reversed(self._entries))
+
+slow_queries = SlowQueryLog()
+
+DB_QUERY_SECONDS = metrics.histogram(
+    "mindgraph_db_query_seconds", "Query latency by backend and statement", ["backend", "statement"]
+)
+DB_QUERY_ROWS = metrics.counter(
+    "mindgraph_db_query_rows", "Rows returned or affected by backend and statement", ["backend", "statement"]
+)
+DB_QUERY_ERRORS = metrics.counter(
+    "mindgraph_db_query_errors", "Failed queries by backend and statement", ["backend", "statement"]
+)
+
+def record_query(backend: str, statement: str, label: str, elapsed: float, rows: int = None,
+                 failed: bool = False):
+    DB_QUERY_SECONDS.observe(elapsed, backend=backend, statement=label)
+    if rows:
+        DB_QUERY_ROWS.inc(rows, backend=backend, statement=label)
+    if failed:
+        DB_QUERY_ERRORS.inc(backend=backend, statement=label)
+    slow_queries.record(backend, statement, elapsed, rows)
+
+def instrument_engine(engine):
+    """Time every SQLAlchemy cursor execution on `engine`"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        # -1 for server-side cursors, whose rows are fetched later
+        rows = max(cursor.rowcount, 0) if cursor.rowcount is not None else None
+        record_query("postgres", statement, sql_fingerprint(statement), elapsed, rows)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            statement = context.statement or ""
+            elapsed = time.perf_counter() - starts.pop()
+            record_query("postgres", statement, sql_fingerprint(statement), elapsed, failed=True)
+
+    return engine
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "mindgraph_http_request_seconds", "Request latency by method, route and status", ["method", "route", "status"]
+)
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request until its last body chunk is sent
+
+    Requests are labelled with the matched route template (`/students/{student_id}`,
+    not the raw path), so label cardinality stays bounded; unmatched paths
+    share the `unmatched` label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status["code"]
+            )
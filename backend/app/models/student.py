@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, func
 from app.core.database import Base
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        # Watermark scans of the incremental Neo4j sync
+        Index("idx_students_updated_at", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     gender = Column(String)
@@ -21,4 +25,7 @@ class Student(Base):
     work_study_hours = Column(Float)
     financial_stress = Column(Float)
     family_history = Column(String)
-    depression = Column(Integer)
\ No newline at end of file
+    depression = Column(Integer)
+    # Bumped on every change; PostgreSQL also sets it with a trigger for
+    # writes outside the ORM (see app/services/graph_sync.py)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,140 @@
+import json
+import time
+from pathlib import Path
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from app.core.config import settings
+from app.services.search_engine import IVFIndex, top_k
+from app.services.search_index import article_doc, article_text
+from app.utils.index_files import build_directory
+
+class EmbeddingIndex:
+    """LSA document embeddings served through an IVF index
+
+    Built offline: TF-IDF over a large vocabulary, projected to
+    SEARCH_EMBEDDING_DIM dimensions with TruncatedSVD and L2 normalized.
+    Vectors are saved grouped by IVF list as a float32 .npy and memory-mapped
+    on load, so serving only touches the pages of the probed lists. Articles
+    added after a build are found once the index is rebuilt.
+    """
+
+    def __init__(self, index_dir: str = None):
+        self.index_dir = Path(index_dir or settings.SEARCH_EMBEDDING_DIR)
+        self.vectorizer = None
+        self.components = None
+        self.vectors = None
+        self.ivf = None
+        self.docs = []
+        self.meta = {}
+
+    @staticmethod
+    def _new_vectorizer(**kwargs):
+        return TfidfVectorizer(stop_words='english', sublinear_tf=True, **kwargs)
+
+    @property
+    def size(self):
+        return len(self.docs)
+
+    def build(self, rows, dim: int = None, max_features: int = None, n_lists: int = None):
+        """Fit TF-IDF + SVD on (id, title, authors, year, abstract, introduction) rows"""
+        start = time.perf_counter()
+        corpus = []
+        docs = []
+        for article_id, title, authors, year, abstract, introduction in rows:
+            corpus.append(article_text(title, abstract, introduction))
+            docs.append(article_doc(article_id, title, authors, year, abstract))
+
+        if not corpus:
+            return False
+
+        max_features = max_features or settings.SEARCH_EMBEDDING_MAX_FEATURES
+        self.vectorizer = self._new_vectorizer(max_features=max_features)
+        tfidf = self.vectorizer.fit_transform(corpus)
+
+        dim = min(dim or settings.SEARCH_EMBEDDING_DIM, tfidf.shape[1] - 1, len(docs) - 1)
+        svd = TruncatedSVD(n_components=max(dim, 1), algorithm='randomized', random_state=42)
+        vectors = svd.fit_transform(tfidf).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1)
+        self.components = svd.components_.astype(np.float32)
+
+        n_lists = n_lists or settings.SEARCH_IVF_LISTS or int(np.sqrt(len(docs)))
+        self.ivf, order = IVFIndex.build(vectors, n_lists)
+        self.vectors = vectors[order]
+        self.docs = [docs[i] for i in order]
+        self.meta = {
+            "built_at": time.time(),
+            "n_docs": len(docs),
+            "n_terms": len(self.vectorizer.vocabulary_),
+            "dim": int(self.components.shape[0]),
+            "n_lists": self.ivf.n_lists,
+            "explained_variance": round(float(svd.explained_variance_ratio_.sum()), 4),
+            "build_seconds": round(time.perf_counter() - start, 3)
+        }
+        return True
+
+    def save(self):
+        """Write the index as a new build of `index_dir`"""
+        terms = sorted(self.vectorizer.vocabulary_, key=self.vectorizer.vocabulary_.get)
+        with build_directory(self.index_dir) as build:
+            np.save(build / "idf.npy", self.vectorizer.idf_)
+            np.save(build / "components.npy", self.components)
+            np.save(build / "vectors.npy", self.vectors)
+            np.save(build / "ivf_centroids.npy", self.ivf.centroids)
+            np.save(build / "ivf_offsets.npy", self.ivf.offsets)
+
+            with open(build / "vocabulary.json", "w", encoding="utf-8") as f:
+                json.dump(terms, f, ensure_ascii=False)
+            with open(build / "docs.json", "w", encoding="utf-8") as f:
+                json.dump(self.docs, f, ensure_ascii=False)
+            with open(build / "meta.json", "w") as f:
+                json.dump(self.meta, f)
+
+    def load(self):
+        """Memory-map a saved index, returns False if none exists"""
+        root = self.index_dir.resolve()
+        if not (root / "meta.json").exists():
+            return False
+
+        with open(root / "meta.json") as f:
+            self.meta = json.load(f)
+        with open(root / "vocabulary.json", encoding="utf-8") as f:
+            terms = json.load(f)
+        with open(root / "docs.json", encoding="utf-8") as f:
+            self.docs = json.load(f)
+
+        self.vectorizer = self._new_vectorizer(
+            vocabulary={term: i for i, term in enumerate(terms)}
+        )
+        self.vectorizer.idf_ = np.load(root / "idf.npy")
+        self.components = np.load(root / "components.npy")
+        self.vectors = np.load(root / "vectors.npy", mmap_mode='r')
+        self.ivf = IVFIndex(
+            np.load(root / "ivf_centroids.npy"),
+            np.load(root / "ivf_offsets.npy")
+        )
+        return True
+
+    def embed(self, query: str):
+        """Unit LSA vector for a query, None when it has no known terms"""
+        tfidf = self.vectorizer.transform([query])
+        if tfidf.nnz == 0:
+            return None
+        vector = np.asarray(tfidf @ self.components.T, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def search(self, query: str, k: int, nprobe: int = None, exact: bool = False):
+        """Return (positions, scores) of the nearest articles to a query"""
+        vector = self.embed(query)
+        if vector is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if exact:
+            scores = self.vectors @ vector
+            positions = top_k(scores, k)
+            return positions, scores[positions]
+        return self.ivf.search(self.vectors, vector, k, nprobe or settings.SEARCH_IVF_NPROBE)
+
+    def doc(self, position: int):
+        return self.docs[position]
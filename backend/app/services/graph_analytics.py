@@ -0,0 +1,106 @@
+import threading
+import time
+from app.core.config import settings
+from app.services.graph_queries import graph_queries
+
+GRAPH_NODE_LABELS = ['Student', 'City', 'Profession', 'MentalCondition']
+
+# PageRank and Louvain weigh edges by `weight`: SIMILAR_TO carries the k-NN
+# similarity, the other types have none and count as 1.0. GDS needs the
+# property on every projected type to use it.
+WEIGHT_PROPERTY = {'weight': {'defaultValue': 1.0}}
+
+GRAPH_RELATIONSHIPS = {
+    'LIVES_IN': {'orientation': 'UNDIRECTED', 'properties': WEIGHT_PROPERTY},
+    'HAS_PROFESSION': {'orientation': 'UNDIRECTED', 'properties': WEIGHT_PROPERTY},
+    'SUFFERS_FROM': {'orientation': 'UNDIRECTED', 'properties': WEIGHT_PROPERTY},
+    'SIMILAR_TO': {'orientation': 'UNDIRECTED', 'properties': WEIGHT_PROPERTY},
+}
+
+ANALYTICS_INDEXES = ["index_student_pagerank", "constraint_community_id"]
+
+class GraphAnalytics:
+    """GDS projection lifecycle and precomputed graph algorithm results
+
+    Loaders bump a data version on a `GraphMeta` node. `ensure_fresh()`
+    compares it with the version the stored results were computed from and,
+    only when they differ, drops the stale projection, projects the graph
+    again and runs PageRank and Louvain in write mode. Reads then return the
+    `pagerank`/`community` node properties without running any algorithm.
+    """
+
+    def __init__(self, graph_name: str = None):
+        self.graph_name = graph_name or settings.GDS_GRAPH_NAME
+        self._lock = threading.Lock()
+
+    def mark_stale(self):
+        """Record that graph data changed and drop the now stale projection"""
+        graph_queries.run("analytics_mark_stale", {"name": self.graph_name})
+        self.drop_projection()
+
+    def status(self):
+        status = graph_queries.run("analytics_status", {"name": self.graph_name})[0]
+        status["projection_exists"] = self.projection_exists()
+        status["stale"] = status["analytics_version"] != status["data_version"]
+        return status
+
+    def projection_exists(self):
+        return graph_queries.run("gds_projection_exists", {"name": self.graph_name})[0]["exists"]
+
+    def drop_projection(self):
+        """Free the in-memory GDS projection"""
+        if self.projection_exists():
+            graph_queries.run("gds_drop_projection", {"name": self.graph_name})
+
+    def create_projection(self):
+        # GDS rejects relationship types missing from the database, e.g. SIMILAR_TO before it is built
+        existing = set(graph_queries.run("relationship_types")[0]["types"])
+        return graph_queries.run("gds_project", {
+            "name": self.graph_name,
+            "labels": GRAPH_NODE_LABELS,
+            "relationships": {
+                name: projection for name, projection in GRAPH_RELATIONSHIPS.items() if name in existing
+            }
+        })[0]
+
+    def ensure_fresh(self, force: bool = False):
+        """Recompute stored analytics if the data changed, returns the run summary or None"""
+        with self._lock:
+            status = graph_queries.run("analytics_status", {"name": self.graph_name})[0]
+            if not force and status["analytics_version"] == status["data_version"]:
+                return None
+            return self._refresh(status["data_version"])
+
+    def _refresh(self, version: int):
+        start = time.perf_counter()
+        for name in ANALYTICS_INDEXES:
+            graph_queries.run(name)
+
+        self.drop_projection()
+        projection = self.create_projection()
+        pagerank = graph_queries.run("gds_pagerank_write", {"name": self.graph_name})[0]
+        louvain = graph_queries.run("gds_louvain_write", {"name": self.graph_name})[0]
+        graph_queries.run("community_summaries", {"max_members": settings.GDS_COMMUNITY_MEMBERS})
+
+        if not settings.GDS_KEEP_PROJECTION:
+            self.drop_projection()
+
+        graph_queries.run("analytics_mark_fresh", {"name": self.graph_name, "version": version})
+
+        summary = {
+            "version": version,
+            "seconds": round(time.perf_counter() - start, 3),
+            **projection,
+            **pagerank,
+            **louvain
+        }
+        print(f"✅ Graph analytics refreshed: {summary}")
+        return summary
+
+    def top_pagerank(self, limit: int = 20):
+        self.ensure_fresh()
+        return graph_queries.run("top_pagerank", {"limit": limit})
+
+    def top_communities(self, limit: int = 20):
+        self.ensure_fresh()
+        return graph_queries.run("top_communities", {"limit": limit})
@@ -0,0 +1,294 @@
+import threading
+import time
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from sqlalchemy import func
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.student import Student
+from app.services.graph_queries import graph_queries
+
+STUDENT_PROPERTIES = ['id', 'gender', 'age', 'cgpa', 'depression', 'suicidal_thoughts']
+
+POSTGRES_FINGERPRINT_COLUMNS = (
+    func.count(Student.id),
+    func.coalesce(func.max(Student.id), 0),
+    func.coalesce(func.sum(Student.depression), 0),
+    func.max(Student.updated_at)
+)
+
+EDGE_TARGET_LABELS = {
+    'LIVES_IN': 'City',
+    'HAS_PROFESSION': 'Profession',
+    'SUFFERS_FROM': 'MentalCondition',
+}
+
+def _encode(values):
+    """Category codes (-1 for missing) and the ordered category names"""
+    names = sorted({value for value in values if value})
+    lookup = {name: code for code, name in enumerate(names)}
+    codes = np.fromiter((lookup.get(value, -1) for value in values), dtype=np.int32, count=len(values))
+    return codes, names
+
+class GraphSnapshot:
+    """Immutable, array-backed copy of the Student/City/Profession/MentalCondition graph
+
+    Nodes are laid out as [students | cities | professions | condition] and
+    the undirected adjacency is a CSR matrix over that layout, so
+    neighborhood, degree and aggregation queries are array lookups.
+    """
+
+    def __init__(self, rows: list, fingerprint=None):
+        rows = sorted(rows, key=lambda row: row['id'])
+        self.fingerprint = fingerprint
+        self.built_at = time.time()
+
+        self.student_ids = np.array([row['id'] for row in rows], dtype=np.int64)
+        self.properties = {
+            name: [row.get(name) for row in rows] for name in STUDENT_PROPERTIES
+        }
+        self.depression = np.array(
+            [row.get('depression') or 0 for row in rows], dtype=np.int8
+        )
+        self.city_codes, self.cities = _encode([row.get('city') for row in rows])
+        self.profession_codes, self.professions = _encode([row.get('profession') for row in rows])
+
+        n_students = len(rows)
+        self.city_offset = n_students
+        self.profession_offset = self.city_offset + len(self.cities)
+        self.condition_node = self.profession_offset + len(self.professions)
+        self.n_nodes = self.condition_node + 1
+
+        students = np.arange(n_students)
+        has_city = self.city_codes >= 0
+        has_profession = self.profession_codes >= 0
+        depressed = self.depression == 1
+
+        sources = np.concatenate([students[has_city], students[has_profession], students[depressed]])
+        targets = np.concatenate([
+            self.city_codes[has_city] + self.city_offset,
+            self.profession_codes[has_profession] + self.profession_offset,
+            np.full(int(depressed.sum()), self.condition_node)
+        ])
+
+        weights = np.ones(sources.size * 2, dtype=np.float32)
+        self.adjacency = sp.csr_matrix(
+            (weights, (np.concatenate([sources, targets]), np.concatenate([targets, sources]))),
+            shape=(self.n_nodes, self.n_nodes)
+        )
+        self.degrees = np.diff(self.adjacency.indptr)
+
+    @property
+    def n_students(self):
+        return self.student_ids.size
+
+    def student_row(self, student_id: int):
+        row = int(np.searchsorted(self.student_ids, student_id))
+        if row < self.n_students and self.student_ids[row] == student_id:
+            return row
+        return None
+
+    def student_node(self, row: int):
+        return {name: values[row] for name, values in self.properties.items()}
+
+    def node(self, index: int):
+        """Node properties and relationship type for a node position"""
+        if index < self.city_offset:
+            return self.student_node(index), None
+        if index < self.profession_offset:
+            return {"name": self.cities[index - self.city_offset]}, 'LIVES_IN'
+        if index < self.condition_node:
+            return {"name": self.professions[index - self.profession_offset]}, 'HAS_PROFESSION'
+        return {"type": "Depression"}, 'SUFFERS_FROM'
+
+    def neighborhood(self, student_id: int):
+        """Same shape as GraphService.get_student_network"""
+        row = self.student_row(student_id)
+        if row is None:
+            return []
+        student = self.student_node(row)
+        neighbors = self.adjacency.indices[self.adjacency.indptr[row]:self.adjacency.indptr[row + 1]]
+        results = []
+        for index in neighbors:
+            node, relationship = self.node(int(index))
+            results.append({"s": student, "relationship": relationship, "n": node})
+        return results
+
+    def degree(self, student_id: int):
+        row = self.student_row(student_id)
+        return None if row is None else int(self.degrees[row])
+
+    def network(self, limit: int):
+        """First `limit` student relationships, shaped like /graphs/students/network"""
+        results = []
+        for row in range(self.n_students):
+            student = self.student_node(row)
+            neighbors = self.adjacency.indices[self.adjacency.indptr[row]:self.adjacency.indptr[row + 1]]
+            for index in neighbors:
+                node, relationship = self.node(int(index))
+                results.append({"s": student, "r": [student, relationship, node], "n": node})
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def iter_edges(self, limit: int = None):
+        """Student relationships as flat rows, shaped like the network export"""
+        emitted = 0
+        for row in range(self.n_students):
+            student_id = int(self.student_ids[row])
+            neighbors = self.adjacency.indices[self.adjacency.indptr[row]:self.adjacency.indptr[row + 1]]
+            for index in neighbors:
+                node, relationship = self.node(int(index))
+                yield {
+                    "student_id": student_id,
+                    "relationship": relationship,
+                    "target_label": EDGE_TARGET_LABELS[relationship],
+                    "target": node.get("name") or node.get("type")
+                }
+                emitted += 1
+                if limit is not None and emitted >= limit:
+                    return
+
+    def _depression_by(self, codes, names, label: str):
+        known = codes >= 0
+        totals = np.bincount(codes[known], minlength=len(names))
+        depressed = np.bincount(codes[known], weights=self.depression[known], minlength=len(names))
+        stats = [
+            {
+                label: name,
+                "total": int(total),
+                "depressed": int(count),
+                "depression_rate": round(float(count) / total * 100, 2)
+            }
+            for name, total, count in zip(names, totals, depressed) if total > 0
+        ]
+        return sorted(stats, key=lambda x: x['depression_rate'], reverse=True)
+
+    def depression_by_city(self):
+        return self._depression_by(self.city_codes, self.cities, "city")
+
+    def depression_by_profession(self):
+        return self._depression_by(self.profession_codes, self.professions, "profession")
+
+    def depressed_count_by_city(self):
+        """Same shape as /graphs/cities/depression"""
+        stats = [
+            {"city": row["city"], "depressed_count": row["depressed"]}
+            for row in self.depression_by_city() if row["depressed"] > 0
+        ]
+        return sorted(stats, key=lambda x: x['depressed_count'], reverse=True)
+
+    def pagerank(self, limit: int = 20, damping: float = 0.85,
+                 max_iterations: int = 20, tolerance: float = 1e-7):
+        """PageRank over the undirected graph with GDS' unnormalized formulation"""
+        out_degree = self.degrees.astype(np.float64)
+        inverse_degree = np.divide(1.0, out_degree, out=np.zeros_like(out_degree), where=out_degree > 0)
+        transition = self.adjacency.T.tocsr()
+
+        scores = np.full(self.n_nodes, 1 - damping)
+        for _ in range(max_iterations):
+            updated = (1 - damping) + damping * (transition @ (scores * inverse_degree))
+            converged = np.abs(updated - scores).max() < tolerance
+            scores = updated
+            if converged:
+                break
+
+        student_scores = scores[:self.n_students]
+        order = np.argsort(student_scores)[::-1][:limit]
+        return [
+            {"student_id": int(self.student_ids[row]), "score": float(student_scores[row])}
+            for row in order
+        ]
+
+    def components(self, limit: int = 20):
+        """Connected components, largest first"""
+        count, labels = connected_components(self.adjacency, directed=False)
+        sizes = np.bincount(labels)
+        order = np.argsort(sizes)[::-1][:limit]
+        return {
+            "component_count": int(count),
+            "components": [{"component": int(label), "size": int(sizes[label])} for label in order]
+        }
+
+class GraphEngine:
+    """Holds the current GraphSnapshot and swaps in rebuilt ones atomically
+
+    Readers grab `snapshot` once per request and keep using it even while a
+    reload builds the next one; the swap is a single reference assignment.
+    """
+
+    def __init__(self, source: str = None):
+        self.source = source or settings.GRAPH_SNAPSHOT_SOURCE
+        self.snapshot = None
+        self._reload_lock = threading.Lock()
+        self._last_check = 0.0
+
+    def _fingerprint(self):
+        if self.source == "neo4j":
+            row = graph_queries.run("snapshot_fingerprint")[0]
+            return (row['total'], row['max_id'], row['depressed'], row['updated_at'])
+
+        db = SessionLocal()
+        try:
+            return tuple(db.query(*POSTGRES_FINGERPRINT_COLUMNS).one())
+        finally:
+            db.close()
+
+    def _load_rows(self):
+        if self.source == "neo4j":
+            return list(graph_queries.stream("snapshot_students"))
+
+        columns = [getattr(Student, name) for name in STUDENT_PROPERTIES + ['city', 'profession']]
+        db = SessionLocal()
+        try:
+            return [row._asdict() for row in db.query(*columns).yield_per(10000)]
+        finally:
+            db.close()
+
+    def reload(self, force: bool = False):
+        """Rebuild the snapshot if the source data changed, returns True if swapped"""
+        with self._reload_lock:
+            self._last_check = time.monotonic()
+            fingerprint = self._fingerprint()
+            if not force and self.snapshot is not None and self.snapshot.fingerprint == fingerprint:
+                return False
+
+            start = time.perf_counter()
+            snapshot = GraphSnapshot(self._load_rows(), fingerprint=fingerprint)
+            self.snapshot = snapshot
+            print(f"✅ Graph snapshot built from {self.source}: {snapshot.n_students} students, "
+                  f"{snapshot.n_nodes} nodes in {time.perf_counter() - start:.2f}s")
+            return True
+
+    def current(self):
+        """Current snapshot, loading the first one and refreshing stale ones in the background"""
+        if self.snapshot is None:
+            self.reload()
+        elif time.monotonic() - self._last_check > settings.GRAPH_SNAPSHOT_TTL \
+                and not self._reload_lock.locked():
+            self._last_check = time.monotonic()
+            threading.Thread(target=self._background_reload, daemon=True).start()
+        return self.snapshot
+
+    def _background_reload(self):
+        try:
+            self.reload()
+        except Exception as e:
+            print(f"⚠️ Graph snapshot reload failed, keeping the previous one: {e}")
+
+    def status(self):
+        snapshot = self.snapshot
+        if snapshot is None:
+            return {"loaded": False, "source": self.source}
+        return {
+            "loaded": True,
+            "source": self.source,
+            "students": snapshot.n_students,
+            "nodes": snapshot.n_nodes,
+            "edges": int(snapshot.adjacency.nnz // 2),
+            "built_at": snapshot.built_at,
+            "age_seconds": round(time.time() - snapshot.built_at, 1)
+        }
+
+graph_engine = GraphEngine()
@@ -0,0 +1,419 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+from app.core.database import get_neo4j
+from app.core.metrics import name_statement, record_query
+
+class CypherQuery:
+    """One named, parameterized Cypher statement and its execution statistics"""
+
+    def __init__(self, name: str, text: str, mode: str = "read", warm: bool = True):
+        self.name = name
+        self.text = text.strip()
+        self.mode = mode
+        self.warm = warm
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed: float, rows: int = 0, failed: bool = False):
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            self.calls += 1
+            self.errors += int(failed)
+            self.rows += rows
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self._latencies.append(elapsed_ms)
+
+    def stats(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+            calls = self.calls
+            return {
+                "mode": self.mode,
+                "calls": calls,
+                "errors": self.errors,
+                "rows": self.rows,
+                "avg_rows": round(self.rows / calls, 2) if calls else 0.0,
+                "avg_ms": round(self.total_ms / calls, 3) if calls else 0.0,
+                "p50_ms": round(float(np.percentile(latencies, 50)), 3) if latencies.size else 0.0,
+                "p95_ms": round(float(np.percentile(latencies, 95)), 3) if latencies.size else 0.0,
+                "max_ms": round(self.max_ms, 3)
+            }
+
+class QueryRegistry:
+    """All Cypher used by the graph service and endpoints, declared once
+
+    Statements never embed values in their text, so each one has a single
+    entry in Neo4j's query cache no matter which parameters it runs with.
+    `warm_up()` runs EXPLAIN for every statement at startup so the plans
+    are compiled before the first request.
+    """
+
+    def __init__(self):
+        self.queries = {}
+
+    def register(self, name: str, text: str, mode: str = "read", warm: bool = True):
+        if name in self.queries:
+            raise ValueError(f"Cypher query already registered: {name}")
+        self.queries[name] = CypherQuery(name, text, mode, warm)
+        name_statement(self.queries[name].text, name)
+        return self.queries[name]
+
+    def __getitem__(self, name: str):
+        return self.queries[name]
+
+    def run(self, name: str, parameters: dict = None):
+        """Run a registered query in a managed transaction (auto-commit for schema)"""
+        query = self.queries[name]
+        neo4j = get_neo4j()
+        execute = {"read": neo4j.read, "write": neo4j.write, "schema": neo4j.query}[query.mode]
+        start = time.perf_counter()
+        try:
+            results = execute(query.text, parameters)
+        except Exception:
+            query.record(time.perf_counter() - start, failed=True)
+            raise
+        query.record(time.perf_counter() - start, len(results))
+        return results
+
+    def run_in(self, tx, name: str, **parameters):
+        """Run a registered query inside an open transaction, returns its summary"""
+        query = self.queries[name]
+        start = time.perf_counter()
+        try:
+            summary = tx.run(query.text, parameters).consume()
+        except Exception:
+            elapsed = time.perf_counter() - start
+            query.record(elapsed, failed=True)
+            record_query("neo4j", query.text, name, elapsed, failed=True)
+            raise
+        elapsed = time.perf_counter() - start
+        query.record(elapsed)
+        # Inside a caller's transaction, so not seen by the Neo4jConnection timers
+        record_query("neo4j", query.text, name, elapsed)
+        return summary
+
+    def stream(self, name: str, parameters: dict = None):
+        """Yield the records of a registered read query lazily"""
+        query = self.queries[name]
+        start = time.perf_counter()
+        rows = 0
+        failed = False
+        try:
+            for record in get_neo4j().stream(query.text, parameters):
+                rows += 1
+                yield record
+        except Exception:
+            failed = True
+            raise
+        finally:
+            query.record(time.perf_counter() - start, rows, failed)
+
+    def warm_up(self):
+        """Plan every warmable query with EXPLAIN, returns the number prepared"""
+        neo4j = get_neo4j()
+        neo4j.driver.verify_connectivity()
+        prepared = 0
+        for query in self.queries.values():
+            if not query.warm:
+                continue
+            try:
+                with neo4j.session() as session:
+                    session.run("EXPLAIN " + query.text).consume()
+                prepared += 1
+            except Exception as e:
+                print(f"⚠️ Could not prepare Cypher query {query.name}: {e}")
+        return prepared
+
+    def stats(self):
+        return {name: query.stats() for name, query in self.queries.items()}
+
+graph_queries = QueryRegistry()
+
+# Schema, same constraints as database/neo4j/init_graph.cypher; MERGE relies on them
+graph_queries.register("constraint_student_id", """
+CREATE CONSTRAINT student_id IF NOT EXISTS FOR (s:Student) REQUIRE s.id IS UNIQUE
+""", mode="schema", warm=False)
+
+graph_queries.register("constraint_city_name", """
+CREATE CONSTRAINT city_name IF NOT EXISTS FOR (c:City) REQUIRE c.name IS UNIQUE
+""", mode="schema", warm=False)
+
+graph_queries.register("constraint_profession_name", """
+CREATE CONSTRAINT profession_name IF NOT EXISTS FOR (p:Profession) REQUIRE p.name IS UNIQUE
+""", mode="schema", warm=False)
+
+# Bulk loading
+graph_queries.register("merge_students", """
+UNWIND $rows AS row
+MERGE (s:Student {id: row.id})
+SET s.gender = row.gender,
+    s.age = row.age,
+    s.cgpa = row.cgpa,
+    s.depression = row.depression,
+    s.suicidal_thoughts = row.suicidal_thoughts
+""", mode="write")
+
+graph_queries.register("merge_cities", """
+UNWIND $rows AS row
+MATCH (s:Student {id: row.id})
+OPTIONAL MATCH (s)-[old:LIVES_IN]->(c:City)
+WHERE row.city IS NULL OR c.name <> row.city
+DELETE old
+WITH DISTINCT s, row
+WHERE row.city IS NOT NULL
+MERGE (c:City {name: row.city})
+MERGE (s)-[:LIVES_IN]->(c)
+""", mode="write")
+
+graph_queries.register("merge_professions", """
+UNWIND $rows AS row
+MATCH (s:Student {id: row.id})
+OPTIONAL MATCH (s)-[old:HAS_PROFESSION]->(p:Profession)
+WHERE row.profession IS NULL OR p.name <> row.profession
+DELETE old
+WITH DISTINCT s, row
+WHERE row.profession IS NOT NULL
+MERGE (p:Profession {name: row.profession})
+MERGE (s)-[:HAS_PROFESSION]->(p)
+""", mode="write")
+
+graph_queries.register("merge_conditions", """
+UNWIND $rows AS row
+MATCH (s:Student {id: row.id})
+OPTIONAL MATCH (s)-[old:SUFFERS_FROM]->(:MentalCondition {type: 'Depression'})
+WHERE row.depression <> 1
+DELETE old
+WITH DISTINCT s, row
+WHERE row.depression = 1
+MERGE (m:MentalCondition {type: 'Depression'})
+MERGE (s)-[:SUFFERS_FROM]->(m)
+""", mode="write")
+
+# Similarity graph; pairs arrive deduplicated as (smaller id, larger id)
+graph_queries.register("merge_similar_to", """
+UNWIND $rows AS row
+MATCH (a:Student {id: row.source})
+MATCH (b:Student {id: row.target})
+MERGE (a)-[r:SIMILAR_TO]->(b)
+SET r.weight = row.weight
+""", mode="write")
+
+graph_queries.register("delete_similar_to", """
+MATCH (:Student)-[r:SIMILAR_TO]->(:Student)
+WITH r LIMIT $limit
+DELETE r
+RETURN count(*) AS deleted
+""", mode="write")
+
+# Incremental PostgreSQL sync; the watermark lives in the graph it describes
+graph_queries.register("sync_watermark", """
+OPTIONAL MATCH (m:GraphMeta {name: $name})
+RETURN m.sync_updated_at AS updated_at, m.sync_last_id AS last_id,
+       toString(m.synced_at) AS synced_at
+""")
+
+graph_queries.register("set_sync_watermark", """
+MERGE (m:GraphMeta {name: $name})
+SET m.sync_updated_at = $updated_at,
+    m.sync_last_id = $last_id,
+    m.synced_at = datetime()
+""", mode="write")
+
+graph_queries.register("reset_sync_watermark", """
+MATCH (m:GraphMeta {name: $name})
+REMOVE m.sync_updated_at, m.sync_last_id
+""", mode="write")
+
+# Single student writes; MERGE so that writing a student twice updates it
+graph_queries.register("create_student", """
+MERGE (s:Student {id: $id})
+SET s.gender = $gender,
+    s.age = $age,
+    s.cgpa = $cgpa,
+    s.depression = $depression,
+    s.suicidal_thoughts = $suicidal_thoughts
+RETURN s
+""", mode="write")
+
+graph_queries.register("create_city_relationship", """
+MATCH (s:Student {id: $student_id})
+MERGE (c:City {name: $city})
+MERGE (s)-[:LIVES_IN]->(c)
+""", mode="write")
+
+graph_queries.register("create_profession_relationship", """
+MATCH (s:Student {id: $student_id})
+MERGE (p:Profession {name: $profession})
+MERGE (s)-[:HAS_PROFESSION]->(p)
+""", mode="write")
+
+graph_queries.register("create_mental_condition_relationship", """
+MATCH (s:Student {id: $student_id})
+WHERE s.depression = 1
+MERGE (m:MentalCondition {type: 'Depression'})
+MERGE (s)-[:SUFFERS_FROM]->(m)
+""", mode="write")
+
+# Reads
+graph_queries.register("student_network", """
+MATCH (s:Student)-[r]->(n)
+RETURN s, r, n
+LIMIT $limit
+""")
+
+graph_queries.register("student_network_export", """
+MATCH (s:Student)-[r]->(n)
+RETURN s.id AS student_id, type(r) AS relationship,
+       labels(n)[0] AS target_label, coalesce(n.name, n.type, toString(n.id)) AS target
+""")
+
+graph_queries.register("student_network_export_limited", """
+MATCH (s:Student)-[r]->(n)
+RETURN s.id AS student_id, type(r) AS relationship,
+       labels(n)[0] AS target_label, coalesce(n.name, n.type, toString(n.id)) AS target
+LIMIT $limit
+""")
+
+graph_queries.register("student_neighborhood", """
+MATCH (s:Student {id: $student_id})-[r]-(n)
+RETURN s, type(r) as relationship, n
+""")
+
+graph_queries.register("depressed_count_by_city", """
+MATCH (s:Student)-[:LIVES_IN]->(c:City)
+WHERE s.depression = 1
+RETURN c.name as city, count(s) as depressed_count
+ORDER BY depressed_count DESC
+""")
+
+graph_queries.register("depression_by_city", """
+MATCH (s:Student)-[:LIVES_IN]->(c:City)
+WITH c.name as city,
+     count(s) as total,
+     sum(CASE WHEN s.depression = 1 THEN 1 ELSE 0 END) as depressed
+RETURN city, total, depressed,
+       round(toFloat(depressed) / total * 100, 2) as depression_rate
+ORDER BY depression_rate DESC
+""")
+
+graph_queries.register("depression_by_profession", """
+MATCH (s:Student)-[:HAS_PROFESSION]->(p:Profession)
+WITH p.name as profession,
+     count(s) as total,
+     sum(CASE WHEN s.depression = 1 THEN 1 ELSE 0 END) as depressed
+RETURN profession, total, depressed,
+       round(toFloat(depressed) / total * 100, 2) as depression_rate
+ORDER BY depression_rate DESC
+""")
+
+# In-process graph snapshot, see graph_engine.GraphEngine
+graph_queries.register("snapshot_students", """
+MATCH (s:Student)
+OPTIONAL MATCH (s)-[:LIVES_IN]->(c:City)
+OPTIONAL MATCH (s)-[:HAS_PROFESSION]->(p:Profession)
+RETURN s.id AS id, s.gender AS gender, s.age AS age, s.cgpa AS cgpa,
+       s.depression AS depression, s.suicidal_thoughts AS suicidal_thoughts,
+       c.name AS city, p.name AS profession
+""")
+
+# Students carry no updated_at in Neo4j; in-place updates arrive through the
+# incremental sync, which moves the watermark on GraphMeta
+graph_queries.register("snapshot_fingerprint", """
+MATCH (s:Student)
+WITH count(s) AS total, coalesce(max(s.id), 0) AS max_id,
+     coalesce(sum(s.depression), 0) AS depressed
+OPTIONAL MATCH (m:GraphMeta)
+RETURN total, max_id, depressed, max(m.sync_updated_at) AS updated_at
+""")
+
+# Graph Data Science analytics, see graph_analytics.GraphAnalytics
+graph_queries.register("index_student_pagerank", """
+CREATE INDEX student_pagerank IF NOT EXISTS FOR (s:Student) ON (s.pagerank)
+""", mode="schema", warm=False)
+
+graph_queries.register("constraint_community_id", """
+CREATE CONSTRAINT community_id IF NOT EXISTS FOR (c:Community) REQUIRE c.id IS UNIQUE
+""", mode="schema", warm=False)
+
+graph_queries.register("analytics_mark_stale", """
+MERGE (m:GraphMeta {name: $name})
+SET m.data_version = coalesce(m.data_version, 0) + 1,
+    m.data_updated_at = datetime()
+""", mode="write")
+
+graph_queries.register("analytics_status", """
+OPTIONAL MATCH (m:GraphMeta {name: $name})
+RETURN coalesce(m.data_version, 0) AS data_version,
+       m.analytics_version AS analytics_version,
+       toString(m.data_updated_at) AS data_updated_at,
+       toString(m.analytics_updated_at) AS analytics_updated_at
+""")
+
+graph_queries.register("analytics_mark_fresh", """
+MERGE (m:GraphMeta {name: $name})
+SET m.analytics_version = $version,
+    m.analytics_updated_at = datetime()
+""", mode="write")
+
+graph_queries.register("relationship_types", """
+CALL db.relationshipTypes() YIELD relationshipType RETURN collect(relationshipType) AS types
+""")
+
+# GDS procedures run auto-commit like schema statements, and are not planned
+# at startup since the plugin may be missing
+graph_queries.register("gds_projection_exists", """
+CALL gds.graph.exists($name) YIELD exists RETURN exists
+""", mode="schema", warm=False)
+
+graph_queries.register("gds_drop_projection", """
+CALL gds.graph.drop($name, false) YIELD graphName RETURN graphName
+""", mode="schema", warm=False)
+
+graph_queries.register("gds_project", """
+CALL gds.graph.project($name, $labels, $relationships)
+YIELD nodeCount, relationshipCount
+RETURN nodeCount, relationshipCount
+""", mode="schema", warm=False)
+
+graph_queries.register("gds_pagerank_write", """
+CALL gds.pageRank.write($name, {writeProperty: 'pagerank', relationshipWeightProperty: 'weight'})
+YIELD nodePropertiesWritten, ranIterations
+RETURN nodePropertiesWritten, ranIterations
+""", mode="schema", warm=False)
+
+graph_queries.register("gds_louvain_write", """
+CALL gds.louvain.write($name, {writeProperty: 'community', relationshipWeightProperty: 'weight'})
+YIELD communityCount, modularity
+RETURN communityCount, modularity
+""", mode="schema", warm=False)
+
+# Summaries let community reads touch one node per community, not every student
+graph_queries.register("community_summaries", """
+MATCH (c:Community) DETACH DELETE c
+WITH count(*) AS cleared
+MATCH (s:Student) WHERE s.community IS NOT NULL
+WITH s.community AS id, collect(s.id) AS members
+CREATE (:Community {id: id, size: size(members), members: members[..$max_members]})
+""", mode="schema")
+
+graph_queries.register("top_pagerank", """
+MATCH (s:Student) WHERE s.pagerank IS NOT NULL
+RETURN s.id AS student_id, s.pagerank AS score
+ORDER BY score DESC
+LIMIT $limit
+""")
+
+graph_queries.register("top_communities", """
+MATCH (c:Community)
+RETURN c.id AS communityId, c.size AS size, c.members AS members
+ORDER BY size DESC
+LIMIT $limit
+""")
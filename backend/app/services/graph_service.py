@@ -1,103 +1,169 @@
-from app.core.database import Neo4jConnection
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from app.core.config import settings
+from app.core.database import get_neo4j
+from app.services.graph_analytics import GraphAnalytics
+from app.services.graph_queries import graph_queries
+
+GRAPH_CONSTRAINTS = ["constraint_student_id", "constraint_city_name", "constraint_profession_name"]
+
+MERGE_STUDENT_BATCH = ["merge_students", "merge_cities", "merge_professions", "merge_conditions"]
 
 class GraphService:
     def __init__(self):
-        self.neo4j = Neo4jConnection()
+        self.neo4j = get_neo4j()
+        self.analytics = GraphAnalytics()
     
-    def create_student_node(self, student_data: dict):
-        """Create a student node in Neo4j"""
-        query = """
-        CREATE (s:Student {
-            id: $id,
-            gender: $gender,
-            age: $age,
-            cgpa: $cgpa,
-            depression: $depression,
-            suicidal_thoughts: $suicidal_thoughts
-        })
-        RETURN s
+    def ensure_constraints(self):
+        """Create the uniqueness constraints used by MERGE"""
+        for name in GRAPH_CONSTRAINTS:
+            graph_queries.run(name)
+    
+    def bulk_merge_students(self, rows: list, batch_size: int = None, workers: int = None):
+        """Idempotently MERGE students and their relationships in UNWIND batches
+        
+        Each batch is written in a single transaction. With workers > 1 the
+        batches are sent concurrently; lock conflicts on shared City/Profession
+        nodes are transient errors and are retried by the driver.
+        """
+        batch_size = batch_size or settings.NEO4J_BATCH_SIZE
+        workers = workers or settings.NEO4J_LOAD_WORKERS
+        
+        self.ensure_constraints()
+        
+        batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+        return self._write_batches(batches, self._write_student_batch, workers)
+    
+    def bulk_merge_similarities(self, batches, workers: int = None):
+        """MERGE weighted SIMILAR_TO edges from an iterable of edge batches
+        
+        Batches are consumed lazily, so edges for millions of students are
+        never held in memory at once.
+        """
+        self.ensure_constraints()
+        return self._write_batches(batches, self._write_similarity_batch, workers)
+    
+    def clear_similarities(self, batch_size: int = None):
+        """Delete every SIMILAR_TO edge in bounded transactions, returns the count"""
+        batch_size = batch_size or settings.NEO4J_BATCH_SIZE
+        deleted = 0
+        while True:
+            count = graph_queries.run("delete_similar_to", {"limit": batch_size})[0]["deleted"]
+            deleted += count
+            if count < batch_size:
+                return deleted
+    
+    def _write_batches(self, batches, write_batch, workers: int = None):
+        """Write batches sequentially or on a thread pool, then mark analytics stale"""
+        workers = workers or settings.NEO4J_LOAD_WORKERS
+        
+        start = time.perf_counter()
+        loaded = 0
+        written = 0
+        
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # At most two batches per worker in flight
+                pending = set()
+                for batch in batches:
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        loaded += sum(future.result() for future in done)
+                    pending.add(pool.submit(write_batch, batch))
+                    written += 1
+                loaded += sum(future.result() for future in pending)
+        else:
+            for batch in batches:
+                loaded += write_batch(batch)
+                written += 1
+        
+        elapsed = time.perf_counter() - start
+        
+        try:
+            self.analytics.mark_stale()
+        except Exception as e:
+            print(f"⚠️ Could not mark graph analytics stale: {e}")
+        
+        return {
+            "rows": loaded,
+            "batches": written,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(loaded / elapsed, 1) if elapsed > 0 else 0.0
+        }
+    
+    def _write_student_batch(self, rows: list):
+        """Write one batch of students in a single managed transaction"""
+        self.neo4j.write_transaction(self._merge_student_batch, rows)
+        return len(rows)
+    
+    def _write_similarity_batch(self, rows: list):
+        self.neo4j.write_transaction(
+            lambda tx: graph_queries.run_in(tx, "merge_similar_to", rows=rows)
+        )
+        return len(rows)
+    
+    @staticmethod
+    def _merge_student_batch(tx, rows: list):
+        for name in MERGE_STUDENT_BATCH:
+            graph_queries.run_in(tx, name, rows=rows)
+    
+    def sync_watermark(self, name: str):
+        """Stored (updated_at, last_id) of an incremental sync, (None, None) before the first"""
+        record = graph_queries.run("sync_watermark", {"name": name})[0]
+        return record["updated_at"], record["last_id"]
+    
+    def sync_student_batch(self, rows: list, name: str, updated_at: str, last_id: int):
+        """MERGE changed students and advance the sync watermark in one transaction
+        
+        A batch that fails leaves the watermark where it was, so the next
+        run retries it; MERGE makes the retry idempotent.
         """
-        return self.neo4j.query(query, student_data)
+        def work(tx):
+            self._merge_student_batch(tx, rows)
+            graph_queries.run_in(
+                tx, "set_sync_watermark", name=name, updated_at=updated_at, last_id=last_id
+            )
+        
+        self.neo4j.write_transaction(work)
+        return len(rows)
+    
+    def reset_sync_watermark(self, name: str):
+        graph_queries.run("reset_sync_watermark", {"name": name})
+    
+    def create_student_node(self, student_data: dict):
+        """Create or update a student node in Neo4j"""
+        return graph_queries.run("create_student", student_data)
     
     def create_city_relationship(self, student_id: int, city: str):
         """Create student-city relationship"""
-        query = """
-        MATCH (s:Student {id: $student_id})
-        MERGE (c:City {name: $city})
-        MERGE (s)-[:LIVES_IN]->(c)
-        """
-        self.neo4j.query(query, {"student_id": student_id, "city": city})
+        graph_queries.run("create_city_relationship", {"student_id": student_id, "city": city})
     
     def create_profession_relationship(self, student_id: int, profession: str):
         """Create student-profession relationship"""
-        query = """
-        MATCH (s:Student {id: $student_id})
-        MERGE (p:Profession {name: $profession})
-        MERGE (s)-[:HAS_PROFESSION]->(p)
-        """
-        self.neo4j.query(query, {"student_id": student_id, "profession": profession})
+        graph_queries.run(
+            "create_profession_relationship", {"student_id": student_id, "profession": profession}
+        )
     
     def create_mental_condition_relationship(self, student_id: int):
         """Create relationship to mental condition"""
-        query = """
-        MATCH (s:Student {id: $student_id})
-        WHERE s.depression = 1
-        MERGE (m:MentalCondition {type: 'Depression'})
-        MERGE (s)-[:SUFFERS_FROM]->(m)
-        """
-        self.neo4j.query(query, {"student_id": student_id})
+        graph_queries.run("create_mental_condition_relationship", {"student_id": student_id})
     
     def get_student_network(self, student_id: int):
         """Get network around a student"""
-        query = """
-        MATCH (s:Student {id: $student_id})-[r]-(n)
-        RETURN s, type(r) as relationship, n
-        """
-        return self.neo4j.query(query, {"student_id": student_id})
+        return graph_queries.run("student_neighborhood", {"student_id": student_id})
     
     def get_depression_by_city(self):
         """Get depression statistics by city"""
-        query = """
-        MATCH (s:Student)-[:LIVES_IN]->(c:City)
-        WITH c.name as city, 
-             count(s) as total,
-             sum(CASE WHEN s.depression = 1 THEN 1 ELSE 0 END) as depressed
-        RETURN city, total, depressed,
-               round(toFloat(depressed) / total * 100, 2) as depression_rate
-        ORDER BY depression_rate DESC
-        """
-        return self.neo4j.query(query)
+        return graph_queries.run("depression_by_city")
     
     def get_depression_by_profession(self):
         """Get depression statistics by profession"""
-        query = """
-        MATCH (s:Student)-[:HAS_PROFESSION]->(p:Profession)
-        WITH p.name as profession, 
-             count(s) as total,
-             sum(CASE WHEN s.depression = 1 THEN 1 ELSE 0 END) as depressed
-        RETURN profession, total, depressed,
-               round(toFloat(depressed) / total * 100, 2) as depression_rate
-        ORDER BY depression_rate DESC
-        """
-        return self.neo4j.query(query)
-    
-    def run_pagerank(self):
-        """Run PageRank algorithm on the graph"""
-        query = """
-        CALL gds.pageRank.stream('student-graph')
-        YIELD nodeId, score
-        RETURN gds.util.asNode(nodeId).id AS student_id, score
-        ORDER BY score DESC
-        LIMIT 20
-        """
-        return self.neo4j.query(query)
-    
-    def get_communities(self):
-        """Detect communities in the graph"""
-        query = """
-        CALL gds.louvain.stream('student-graph')
-        YIELD nodeId, communityId
-        RETURN communityId, collect(gds.util.asNode(nodeId).id) as members
-        ORDER BY size(members) DESC
-        """
-        return self.neo4j.query(query)
\ No newline at end of file
+        return graph_queries.run("depression_by_profession")
+    
+    def run_pagerank(self, limit: int = 20):
+        """Top students by precomputed PageRank score"""
+        return self.analytics.top_pagerank(limit)
+    
+    def get_communities(self, limit: int = 20):
+        """Largest precomputed Louvain communities"""
+        return self.analytics.top_communities(limit)
@@ -0,0 +1,329 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, func, inspect, or_, text
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.metrics import metrics
+from app.models.student import Student
+from app.services.stats_service import stats_service
+
+SYNC_NAME = "student_sync"
+
+# Advisory lock key, so only one process (API worker or script) syncs at a time
+SYNC_LOCK_KEY = 7_310_471_925
+
+SYNC_COLUMNS = [
+    Student.id, Student.gender, Student.age, Student.cgpa, Student.depression,
+    Student.suicidal_thoughts, Student.city, Student.profession, Student.updated_at
+]
+
+# PostgreSQL: add updated_at to tables created before it existed, and bump it
+# on every real change, including COPY upserts and manual SQL. Same statements
+# as database/postgres/init.sql
+CHANGE_TRACKING_DDL = [
+    "ALTER TABLE students ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS idx_students_updated_at ON students (updated_at, id)",
+    """
+    CREATE OR REPLACE FUNCTION students_touch_updated_at() RETURNS trigger AS $$
+    BEGIN
+        NEW.updated_at = now();
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS students_updated_at ON students",
+    """
+    CREATE TRIGGER students_updated_at BEFORE UPDATE ON students
+    FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+    EXECUTE FUNCTION students_touch_updated_at()
+    """,
+]
+
+SYNC_ROWS = metrics.counter("mindgraph_sync_rows", "Students merged into Neo4j by the incremental sync")
+SYNC_ERRORS = metrics.counter("mindgraph_sync_errors", "Failed incremental sync runs")
+SYNC_SECONDS = metrics.histogram("mindgraph_sync_seconds", "Duration of incremental sync runs")
+
+def ensure_change_tracking():
+    """Create the updated_at column, index and trigger on PostgreSQL
+
+    A no-op on other databases and before the students table exists.
+    """
+    if engine.dialect.name != "postgresql" or not inspect(engine).has_table("students"):
+        return False
+    with engine.begin() as conn:
+        for statement in CHANGE_TRACKING_DDL:
+            conn.execute(text(statement))
+    return True
+
+def check_change_tracking():
+    """Whether students has the updated_at column and, on PostgreSQL, its trigger
+
+    Read-only, for startup checks; `ensure_change_tracking()` creates them.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table("students"):
+        return {"column": False, "trigger": False}
+    column = "updated_at" in {c["name"] for c in inspector.get_columns("students")}
+    if engine.dialect.name != "postgresql":
+        return {"column": column, "trigger": None}
+    with engine.connect() as conn:
+        trigger = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_trigger "
+            "WHERE tgname = 'students_updated_at' AND tgrelid = 'students'::regclass)"
+        )).scalar()
+    return {"column": column, "trigger": trigger}
+
+class SyncInProgress(Exception):
+    """Raised when another process holds the sync lock"""
+
+@contextmanager
+def sync_lock():
+    """Yields whether this process got the PostgreSQL advisory lock; always True elsewhere"""
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    with engine.connect() as conn:
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": SYNC_LOCK_KEY}).scalar()
+        try:
+            yield acquired
+        finally:
+            # Session-level locks outlive the transaction, release before the connection returns to the pool
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SYNC_LOCK_KEY})
+
+def _utc(value: datetime):
+    # SQLite returns naive timestamps, stored in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _after(updated_at: datetime, last_id: int):
+    """Rows past the (updated_at, id) keyset position"""
+    return or_(
+        Student.updated_at > updated_at,
+        and_(Student.updated_at == updated_at, Student.id > last_id)
+    )
+
+def student_graph_row(row):
+    """Neo4j parameters of a student, same defaults as data_loader.students_to_graph_rows"""
+    return {
+        "id": row.id,
+        "gender": row.gender,
+        "age": row.age if row.age is not None else 0.0,
+        "cgpa": row.cgpa if row.cgpa is not None else 0.0,
+        "depression": row.depression if row.depression is not None else 0,
+        "suicidal_thoughts": row.suicidal_thoughts,
+        "city": row.city,
+        "profession": row.profession
+    }
+
+class GraphSync:
+    """Incremental PostgreSQL → Neo4j sync of students
+
+    Each run reads students changed since the watermark, ordered by
+    (updated_at, id), in keyset batches up to the newest change seen at
+    the start of the run. Every batch is MERGEd together with the new
+    watermark in one Neo4j transaction, so a crash resumes where it left
+    off and nothing is duplicated. The watermark lives on a GraphMeta
+    node: an emptied graph is resynced in full.
+
+    PostgreSQL stamps rows with the transaction start time, so a long
+    transaction can commit rows older than the watermark; each run
+    re-reads the last SYNC_OVERLAP_SECONDS to pick those up. Deleted
+    students are not propagated. Runs take a PostgreSQL advisory lock, so
+    with several API workers only one of them syncs at a time.
+    """
+
+    def __init__(self, graph_service=None, name: str = SYNC_NAME):
+        self._graph_service = graph_service
+        self.name = name
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self.state = {
+            "runs": 0,
+            "rows_total": 0,
+            "pending": None,
+            "lag_seconds": None,
+            "watermark": None,
+            "last_run": None,
+            "last_success_at": None,
+            "last_error": None
+        }
+
+    @property
+    def graph_service(self):
+        if self._graph_service is None:
+            from app.core.container import container
+            self._graph_service = container.graph_service
+        return self._graph_service
+
+    def watermark(self):
+        updated_at, last_id = self.graph_service.sync_watermark(self.name)
+        if updated_at is None:
+            return None, None
+        return datetime.fromisoformat(updated_at), last_id
+
+    def run_once(self, batch_size: int = None):
+        """Sync every change up to now, returns a report of the run"""
+        batch_size = batch_size or settings.SYNC_BATCH_SIZE or settings.NEO4J_BATCH_SIZE
+        with self._run_lock, sync_lock() as acquired:
+            if not acquired:
+                raise SyncInProgress("Another process is syncing students to Neo4j")
+            with SYNC_SECONDS.time():
+                try:
+                    report = self._run(batch_size)
+                except Exception as e:
+                    SYNC_ERRORS.inc()
+                    self.state["last_error"] = str(e)
+                    raise
+        self.state.update({
+            "runs": self.state["runs"] + 1,
+            "rows_total": self.state["rows_total"] + report["rows"],
+            "pending": report["pending"],
+            "lag_seconds": report["lag_seconds"],
+            "watermark": report["watermark"],
+            "last_run": report,
+            "last_success_at": time.time(),
+            "last_error": None
+        })
+        return report
+
+    def _run(self, batch_size: int):
+        start = time.perf_counter()
+        graph_service = self.graph_service
+        graph_service.ensure_constraints()
+
+        stored_at, stored_id = self.watermark()
+        cursor_at, cursor_id = stored_at, stored_id
+        if stored_at is not None and settings.SYNC_OVERLAP_SECONDS > 0:
+            cursor_at, cursor_id = stored_at - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS), 0
+
+        rows = 0
+        changed = 0
+        batches = 0
+        db = SessionLocal()
+        try:
+            until = db.query(func.max(Student.updated_at)).scalar()
+            while until is not None:
+                query = db.query(*SYNC_COLUMNS).filter(Student.updated_at <= until)
+                if cursor_at is not None:
+                    query = query.filter(_after(cursor_at, cursor_id))
+                batch = query.order_by(Student.updated_at, Student.id).limit(batch_size).all()
+                if not batch:
+                    break
+
+                # Rows of the overlap window are merged again but do not move the watermark
+                new = [
+                    row for row in batch
+                    if stored_at is None or (_utc(row.updated_at), row.id) > (_utc(stored_at), stored_id)
+                ]
+                if new:
+                    stored_at, stored_id = new[-1].updated_at, new[-1].id
+                    changed += len(new)
+                cursor_at, cursor_id = batch[-1].updated_at, batch[-1].id
+                graph_service.sync_student_batch(
+                    [student_graph_row(row) for row in batch],
+                    self.name, _utc(stored_at).isoformat(), stored_id
+                )
+                rows += len(batch)
+                batches += 1
+                SYNC_ROWS.inc(len(batch))
+                db.rollback()  # end the read transaction between batches
+
+            pending, oldest = (0, None)
+            if stored_at is not None:
+                pending, oldest = db.query(func.count(Student.id), func.min(Student.updated_at)) \
+                    .filter(_after(stored_at, stored_id)).one()
+        finally:
+            db.close()
+
+        if changed:
+            stats_service.invalidate()
+            try:
+                graph_service.analytics.mark_stale()
+            except Exception as e:
+                print(f"⚠️ Could not mark graph analytics stale: {e}")
+
+        lag = (datetime.now(timezone.utc) - _utc(oldest)).total_seconds() if oldest is not None else 0.0
+        elapsed = time.perf_counter() - start
+        return {
+            "rows": rows,
+            "changed": changed,
+            "batches": batches,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+            "watermark": {
+                "updated_at": _utc(stored_at).isoformat() if stored_at is not None else None,
+                "last_id": stored_id
+            },
+            "pending": pending,
+            "lag_seconds": round(max(lag, 0.0), 3)
+        }
+
+    def reset(self):
+        """Forget the watermark, so the next run merges every student again"""
+        with self._run_lock, sync_lock() as acquired:
+            if not acquired:
+                raise SyncInProgress("Another process is syncing students to Neo4j")
+            self.graph_service.reset_sync_watermark(self.name)
+            self.state["watermark"] = None
+
+    def start(self, interval: float = None):
+        """Run the sync every `interval` seconds in a daemon thread"""
+        interval = settings.SYNC_INTERVAL if interval is None else interval
+        if interval <= 0 or self._worker is not None:
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._loop, args=(interval,), name="mindgraph-sync", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+            self._worker = None
+
+    def _loop(self, interval: float):
+        while True:
+            try:
+                report = self.run_once()
+                if report["changed"]:
+                    print(f"✅ Synced {report['changed']} changed students to Neo4j in {report['seconds']}s")
+            except SyncInProgress:
+                pass
+            except Exception as e:
+                print(f"⚠️ Graph sync failed, retrying in {interval}s: {e}")
+            if self._stop.wait(interval):
+                return
+
+    def status(self):
+        last_success = self.state["last_success_at"]
+        return {
+            **self.state,
+            "running": self._worker is not None,
+            "seconds_since_success": round(time.time() - last_success, 1) if last_success else None
+        }
+
+graph_sync = GraphSync()
+
+@metrics.collector
+def graph_sync_metrics():
+    status = graph_sync.status()
+    families = [
+        ("mindgraph_sync_running", "gauge", "1 while the background sync loop runs",
+         [({}, int(status["running"]))])
+    ]
+    if status["lag_seconds"] is not None:
+        families += [
+            ("mindgraph_sync_lag_seconds", "gauge", "Age of the oldest change not yet in Neo4j, at the last run",
+             [({}, status["lag_seconds"])]),
+            ("mindgraph_sync_pending_rows", "gauge", "Changed students not yet in Neo4j, at the last run",
+             [({}, status["pending"])])
+        ]
+    if status["seconds_since_success"] is not None:
+        families.append(
+            ("mindgraph_sync_seconds_since_success", "gauge", "Seconds since the last successful sync run",
+             [({}, status["seconds_since_success"])])
+        )
+    return families
@@ -1,11 +1,16 @@
 import pickle
+import threading
 import numpy as np
+from scipy.special import logsumexp
 from sklearn.naive_bayes import GaussianNB
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score, classification_report
 import pandas as pd
 from pathlib import Path
+from app.core.metrics import metrics, timed
+
+PREDICT_SECONDS = metrics.histogram("mindgraph_ml_predict_seconds", "Model inference latency", ["method"])
 
 class MLService:
     def __init__(self):
@@ -18,6 +23,56 @@ class MLService:
         ]
         self.categorical_columns = ['gender', 'sleep_duration', 'dietary_habits', 
                                     'suicidal_thoughts', 'family_history']
+        self.category_codes = {}
+        self.version = None
+        self._compiled = None
+        self._local = threading.local()
+    
+    def _compile_encoders(self):
+        self.category_codes = {
+            col: {label: code for code, label in enumerate(encoder.classes_)}
+            for col, encoder in self.label_encoders.items()
+        }
+    
+    def _compile(self):
+        """Precompute lookup tables and GaussianNB constants for NumPy inference"""
+        self._compile_encoders()
+        
+        model = self.model
+        self._compiled = {
+            "classes": model.classes_,
+            "theta": model.theta_,
+            "var": model.var_,
+            "log_prior": np.log(model.class_prior_),
+            # Per-class -0.5 * sum(log(2*pi*var)), as in GaussianNB._joint_log_likelihood
+            "norm": np.array([
+                -0.5 * np.sum(np.log(2.0 * np.pi * model.var_[i, :]))
+                for i in range(len(model.classes_))
+            ])
+        }
+    
+    def _feature_vector(self):
+        """Per-thread preallocated feature vector for single predictions"""
+        vector = getattr(self._local, 'vector', None)
+        if vector is None:
+            vector = np.empty((1, len(self.feature_columns) + len(self.categorical_columns)))
+            self._local.vector = vector
+        return vector
+    
+    def _joint_log_likelihood(self, X: np.ndarray):
+        """GaussianNB joint log-likelihood, evaluated the same way as scikit-learn"""
+        compiled = self._compiled
+        theta, var = compiled["theta"], compiled["var"]
+        jll = np.empty((X.shape[0], len(compiled["classes"])))
+        for i in range(len(compiled["classes"])):
+            n_ij = compiled["norm"][i] - 0.5 * np.sum(((X - theta[i, :]) ** 2) / var[i, :], 1)
+            jll[:, i] = compiled["log_prior"][i] + n_ij
+        return jll
+    
+    def _predict_proba_compiled(self, X: np.ndarray):
+        jll = self._joint_log_likelihood(X)
+        log_prob_x = logsumexp(jll, axis=1)
+        return np.exp(jll - np.atleast_2d(log_prob_x).T), jll.argmax(axis=1)
     
     def prepare_features(self, df: pd.DataFrame, fit_encoders=False):
         """Prepare features for training/prediction"""
@@ -39,6 +94,39 @@ class MLService:
         
         return X[feature_cols].fillna(0)
     
+    def fit_encoders(self, categories: dict):
+        """Fit the label encoders from each column's distinct values
+        
+        'Unknown' is always a class, so missing values encode the same way
+        whether or not they occurred in the training data.
+        """
+        for col in self.categorical_columns:
+            values = set(categories.get(col, [])) | {'Unknown'}
+            self.label_encoders[col] = LabelEncoder().fit(sorted(values))
+        self._compile_encoders()
+    
+    def encode_rows(self, rows: list):
+        """Encode tuples ordered as feature_columns + categorical_columns"""
+        n = len(rows)
+        n_numeric = len(self.feature_columns)
+        X = np.empty((n, n_numeric + len(self.categorical_columns)))
+        columns = list(zip(*rows)) if rows else [()] * X.shape[1]
+        
+        for i in range(n_numeric):
+            X[:, i] = np.array(columns[i], dtype=float)
+        
+        for i, col in enumerate(self.categorical_columns, start=n_numeric):
+            codes = self.category_codes[col]
+            unknown = codes['Unknown']
+            X[:, i] = np.fromiter(
+                (unknown if value is None else codes[value] for value in columns[i]),
+                dtype=float, count=n
+            )
+        
+        # Same default as prepare_features' fillna(0)
+        X[np.isnan(X)] = 0
+        return X
+    
     def train(self, df: pd.DataFrame):
         """Train Naive Bayes model"""
         X = self.prepare_features(df, fit_encoders=True)
@@ -51,6 +139,7 @@ class MLService:
         
         # Train model
         self.model.fit(X_train, y_train)
+        self._compile()
         
         # Evaluate
         y_pred = self.model.predict(X_test)
@@ -64,8 +153,42 @@ class MLService:
             "test_size": len(X_test)
         }
     
+    @timed(PREDICT_SECONDS, method="single")
     def predict(self, student_data: dict):
-        """Predict depression for a single student"""
+        """Predict depression for a single student
+        
+        Uses the compiled NumPy path; the result is identical to predict_pandas.
+        """
+        if self._compiled is None:
+            return self.predict_pandas(student_data)
+        
+        X = self._feature_vector()
+        row = X[0]
+        for i, col in enumerate(self.feature_columns):
+            value = student_data.get(col)
+            # Same default as prepare_features' fillna(0)
+            row[i] = 0.0 if value is None or value != value else value
+        
+        offset = len(self.feature_columns)
+        for i, col in enumerate(self.categorical_columns, start=offset):
+            value = student_data.get(col)
+            code = self.category_codes[col].get('Unknown' if value is None else value)
+            if code is None:
+                raise ValueError(f"Unknown {col} value {value!r}")
+            row[i] = code
+        
+        probability, best = self._predict_proba_compiled(X)
+        
+        return {
+            "prediction": int(self._compiled["classes"][best[0]]),
+            "probability": {
+                "no_depression": float(probability[0, 0]),
+                "depression": float(probability[0, 1])
+            }
+        }
+    
+    def predict_pandas(self, student_data: dict):
+        """Predict depression for a single student through pandas and scikit-learn"""
         df = pd.DataFrame([student_data])
         X = self.prepare_features(df, fit_encoders=False)
         
@@ -80,6 +203,52 @@ class MLService:
             }
         }
     
+    def encode_records(self, records: list):
+        """Encode raw student dicts into the model's feature matrix"""
+        n = len(records)
+        X = np.empty((n, len(self.feature_columns) + len(self.categorical_columns)))
+        
+        X[:, :len(self.feature_columns)] = np.array(
+            [[record.get(col) for col in self.feature_columns] for record in records],
+            dtype=float
+        ).reshape(n, len(self.feature_columns))
+        
+        for offset, col in enumerate(self.categorical_columns, start=len(self.feature_columns)):
+            codes = self.category_codes[col]
+            for i, record in enumerate(records):
+                value = record.get(col)
+                code = codes.get('Unknown' if value is None else value)
+                if code is None:
+                    raise ValueError(f"Unknown {col} value {value!r} in record {i}")
+                X[i, offset] = code
+        
+        # Same default as prepare_features' fillna(0)
+        X[np.isnan(X)] = 0
+        return X
+    
+    def predict_many(self, records: list):
+        """Predict depression for many students with one vectorized model call"""
+        if not records:
+            return []
+        return self.predict_encoded(self.encode_records(records))
+    
+    @timed(PREDICT_SECONDS, method="batch")
+    def predict_encoded(self, X: np.ndarray):
+        """Predict from an already encoded feature matrix"""
+        probabilities, best = self._predict_proba_compiled(X)
+        predictions = self._compiled["classes"][best]
+        
+        return [
+            {
+                "prediction": int(prediction),
+                "probability": {
+                    "no_depression": float(probability[0]),
+                    "depression": float(probability[1])
+                }
+            }
+            for prediction, probability in zip(predictions, probabilities)
+        ]
+    
     def save_model(self, path: str):
         """Save model to disk"""
         Path(path).parent.mkdir(parents=True, exist_ok=True)
@@ -94,4 +263,46 @@ class MLService:
         with open(path, 'rb') as f:
             data = pickle.load(f)
             self.model = data['model']
-            self.label_encoders = data['label_encoders']
\ No newline at end of file
+            self.label_encoders = data['label_encoders']
+        self._compile()
+    
+    def save_artifact(self, path: str):
+        """Save the fitted parameters as a plain .npz, loadable without pickle"""
+        model = self.model
+        arrays = {
+            "classes": model.classes_,
+            "theta": model.theta_,
+            "var": model.var_,
+            "class_prior": model.class_prior_,
+            "class_count": model.class_count_,
+            "epsilon": np.array(model.epsilon_),
+            "var_smoothing": np.array(model.var_smoothing)
+        }
+        for col, encoder in self.label_encoders.items():
+            arrays[f"encoder_{col}"] = encoder.classes_.astype(str)
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+    
+    def load_artifact(self, path: str):
+        """Load parameters saved by save_artifact"""
+        with np.load(path, allow_pickle=False) as data:
+            model = GaussianNB(var_smoothing=float(data["var_smoothing"]))
+            model.classes_ = data["classes"]
+            model.theta_ = data["theta"]
+            model.var_ = data["var"]
+            model.class_prior_ = data["class_prior"]
+            model.class_count_ = data["class_count"]
+            model.epsilon_ = float(data["epsilon"])
+            model.n_features_in_ = model.theta_.shape[1]
+            
+            label_encoders = {}
+            for col in self.categorical_columns:
+                encoder = LabelEncoder()
+                encoder.classes_ = data[f"encoder_{col}"].astype(object)
+                label_encoders[col] = encoder
+        
+        self.model = model
+        self.label_encoders = label_encoders
+        self._compile()
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+from app.core.config import settings
+
+# MLService pulls in pandas and scikit-learn; it is imported when a model is loaded
+if TYPE_CHECKING:
+    from app.services.ml_service import MLService
+
+ARTIFACT_NAME = "model.npz"
+METADATA_NAME = "metadata.json"
+ACTIVE_NAME = "ACTIVE"
+
+class ModelRegistryError(Exception):
+    pass
+
+def _sha256(path: Path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+class ModelRegistry:
+    """Versioned model artifacts on disk
+
+    Each version is a directory holding `model.npz` (the fitted parameters,
+    no pickle) and `metadata.json` with its checksum, metrics and training
+    parameters. The `ACTIVE` file names the version the API should serve;
+    every write goes through a rename so readers never see partial files.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = Path(root or settings.MODEL_REGISTRY_DIR)
+
+    def versions(self):
+        if not self.root.exists():
+            return []
+        return sorted(
+            path.name for path in self.root.iterdir()
+            if path.is_dir() and (path / METADATA_NAME).exists()
+        )
+
+    def active_version(self):
+        active = self.root / ACTIVE_NAME
+        return active.read_text().strip() if active.exists() else None
+
+    def metadata(self, version: str):
+        path = self.root / version / METADATA_NAME
+        if not path.exists():
+            raise ModelRegistryError(f"Unknown model version {version}")
+        return json.loads(path.read_text())
+
+    def publish(self, ml_service: "MLService", metrics: dict = None, params: dict = None,
+                activate: bool = True):
+        """Store a fitted model as a new version, returns the version name"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        created_at = datetime.now(timezone.utc)
+        version = created_at.strftime("v%Y%m%d%H%M%S%f")
+
+        staging = self.root / f".{version}.tmp"
+        ml_service.save_artifact(staging / ARTIFACT_NAME)
+        metadata = {
+            "version": version,
+            "created_at": created_at.isoformat(),
+            "format": "npz",
+            "sha256": _sha256(staging / ARTIFACT_NAME),
+            "size_bytes": (staging / ARTIFACT_NAME).stat().st_size,
+            "feature_columns": ml_service.feature_columns,
+            "categorical_columns": ml_service.categorical_columns,
+            "metrics": metrics or {},
+            "params": params or {}
+        }
+        (staging / METADATA_NAME).write_text(json.dumps(metadata, indent=2))
+        os.rename(staging, self.root / version)
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str):
+        """Point ACTIVE at `version`; running watchers pick it up"""
+        self.metadata(version)
+        _write_atomic(self.root / ACTIVE_NAME, version)
+
+    def load(self, version: str):
+        """Load a version after checking its checksum, returns (MLService, metadata)"""
+        metadata = self.metadata(version)
+        artifact = self.root / version / ARTIFACT_NAME
+        if _sha256(artifact) != metadata["sha256"]:
+            raise ModelRegistryError(f"Checksum mismatch for model version {version}")
+
+        from app.services.ml_service import MLService
+        ml_service = MLService()
+        ml_service.load_artifact(artifact)
+        ml_service.version = version
+        return ml_service, metadata
+
+    def prune(self, keep: int = 5):
+        """Delete the oldest versions, never the active one"""
+        active = self.active_version()
+        removed = []
+        for version in self.versions()[:-keep]:
+            if version != active:
+                shutil.rmtree(self.root / version)
+                removed.append(version)
+        return removed
+
+class ModelManager:
+    """Serves the active model and hot-swaps it when the registry changes
+
+    Request handlers call `current()` once and keep that MLService for the
+    whole request. A new version is loaded completely before the reference
+    is replaced, so in-flight requests finish on the old model.
+    """
+
+    def __init__(self, registry: ModelRegistry = None, legacy_path: str = None):
+        self.registry = registry or ModelRegistry()
+        self.legacy_path = legacy_path or settings.MODEL_PATH
+        self.service = None
+        self.info = {"version": None}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def current(self):
+        service = self.service
+        if service is None:
+            raise ModelRegistryError("No model loaded. Train it first with: python scripts/train_model.py")
+        return service
+
+    def refresh(self, force: bool = False):
+        """Load the active version if it differs from the served one, returns True if swapped"""
+        with self._lock:
+            version = self.registry.active_version()
+            if version is None:
+                if self.service is None and Path(self.legacy_path).exists():
+                    return self._load_legacy()
+                return False
+            if not force and version == self.info["version"]:
+                return False
+
+            start = time.perf_counter()
+            service, metadata = self.registry.load(version)
+            load_seconds = time.perf_counter() - start
+
+            self.service = service
+            self.info = {
+                "version": version,
+                "source": "registry",
+                "created_at": metadata["created_at"],
+                "sha256": metadata["sha256"],
+                "metrics": metadata["metrics"],
+                "loaded_at": datetime.now(timezone.utc).isoformat(),
+                "load_ms": round(load_seconds * 1000, 3)
+            }
+            print(f"✅ Model {version} active (loaded in {self.info['load_ms']} ms)")
+            return True
+
+    def _load_legacy(self):
+        """Serve a pickle saved before the registry existed"""
+        from app.services.ml_service import MLService
+        start = time.perf_counter()
+        service = MLService()
+        service.load_model(self.legacy_path)
+        service.version = "legacy"
+        self.service = service
+        self.info = {
+            "version": "legacy",
+            "source": self.legacy_path,
+            "loaded_at": datetime.now(timezone.utc).isoformat(),
+            "load_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+        print(f"✅ Legacy model loaded from {self.legacy_path}")
+        return True
+
+    def start_watcher(self, interval: float = None):
+        """Poll the registry in a daemon thread and hot-swap new active versions"""
+        interval = settings.MODEL_WATCH_INTERVAL if interval is None else interval
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Model reload failed, keeping version {self.info['version']}: {e}")
+
+    def status(self):
+        return {
+            **self.info,
+            "loaded": self.service is not None,
+            "active_version": self.registry.active_version(),
+            "watching": self._watcher is not None
+        }
@@ -0,0 +1,192 @@
+import hashlib
+import threading
+import orjson
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+class MemoryPredictionBackend:
+    """Per-process LRU/TTL storage"""
+
+    name = "memory"
+    shared = False
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str):
+        return self.cache.get(key)
+
+    def set(self, key: str, value: dict):
+        self.cache.set(key, value)
+
+    def invalidate(self):
+        self.cache.invalidate()
+
+    def stats(self):
+        stats = self.cache.stats()
+        return {
+            "size": stats["size"],
+            "maxsize": stats["maxsize"],
+            "ttl": stats["ttl"],
+            "evictions": stats["evictions"],
+            "expirations": stats["expirations"]
+        }
+
+class RedisPredictionBackend:
+    """Redis storage shared by every API worker
+
+    Entries expire after `ttl` seconds and Redis' own maxmemory policy does
+    the LRU eviction, so the cache size is configured on the server.
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str, ttl: float, prefix: str = "mindgraph:predict:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis prediction cache backend requires the redis package") from e
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str):
+        value = self.client.get(self.prefix + key)
+        return None if value is None else orjson.loads(value)
+
+    def set(self, key: str, value: dict):
+        self.client.set(self.prefix + key, orjson.dumps(value), ex=max(1, int(self.ttl)))
+
+    def invalidate(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*", count=1000))
+        for start in range(0, len(keys), 1000):
+            self.client.delete(*keys[start:start + 1000])
+
+    def stats(self):
+        info = self.client.info("stats")
+        return {
+            "ttl": self.ttl,
+            "evictions": info.get("evicted_keys", 0),
+            "expirations": info.get("expired_keys", 0)
+        }
+
+def create_backend(kind: str = None):
+    kind = kind or settings.PREDICTION_CACHE_BACKEND
+    if kind == "redis":
+        return RedisPredictionBackend(settings.PREDICTION_CACHE_URL, settings.PREDICTION_CACHE_TTL)
+    return MemoryPredictionBackend(settings.PREDICTION_CACHE_SIZE, settings.PREDICTION_CACHE_TTL)
+
+class PredictionCache:
+    """Caches MLService.predict results by canonical feature vector
+
+    Keys hash the model version together with the features exactly as the
+    model sees them: numeric fields as floats (missing values become 0, as
+    in training, and optionally rounded to PREDICTION_CACHE_DECIMALS) and
+    categorical fields as strings ('Unknown' when missing). Requests that
+    only differ in field order, 3 vs 3.0 or omitted optional values share
+    an entry. A new model version changes every key; the in-process backend
+    is cleared at once, shared entries of old versions simply expire.
+    """
+
+    def __init__(self, backend=None, decimals: int = None):
+        self._backend = backend
+        self.decimals = settings.PREDICTION_CACHE_DECIMALS if decimals is None else decimals
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.invalidations = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = create_backend()
+        return self._backend
+
+    def key(self, ml_service, student_data: dict):
+        numeric = []
+        for col in ml_service.feature_columns:
+            value = student_data.get(col)
+            value = 0.0 if value is None or value != value else float(value)
+            numeric.append(round(value, self.decimals) if self.decimals is not None else value)
+        categorical = [
+            'Unknown' if student_data.get(col) is None else str(student_data.get(col))
+            for col in ml_service.categorical_columns
+        ]
+        digest = hashlib.blake2b(orjson.dumps([numeric, categorical]), digest_size=16).hexdigest()
+        return f"{ml_service.version}:{digest}"
+
+    def _check_version(self, version):
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            changed = self._version is not None
+            self._version = version
+        if changed and not self.backend.shared:
+            self.invalidate()
+
+    def predict(self, ml_service, student_data: dict):
+        """Cached ml_service.predict(student_data); a failing backend falls back to the model"""
+        self._check_version(ml_service.version)
+        key = self.key(ml_service, student_data)
+
+        try:
+            cached = self.backend.get(key)
+        except Exception as e:
+            cached = None
+            self._record_error(e)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached
+
+        with self._lock:
+            self.misses += 1
+        prediction = ml_service.predict(student_data)
+        try:
+            self.backend.set(key, prediction)
+        except Exception as e:
+            self._record_error(e)
+        return prediction
+
+    def _record_error(self, error: Exception):
+        with self._lock:
+            self.errors += 1
+            first = self.errors == 1
+        if first:
+            print(f"⚠️ Prediction cache backend unavailable, predicting uncached: {error}")
+
+    def invalidate(self):
+        with self._lock:
+            self.invalidations += 1
+        try:
+            self.backend.invalidate()
+        except Exception as e:
+            self._record_error(e)
+
+    def stats(self):
+        backend = self.backend
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "backend": backend.name,
+                "model_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "errors": self.errors,
+                "invalidations": self.invalidations
+            }
+        try:
+            stats.update(backend.stats())
+        except Exception as e:
+            stats["backend_error"] = str(e)
+        return stats
+
+prediction_cache = PredictionCache()
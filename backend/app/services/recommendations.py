@@ -0,0 +1,216 @@
+import json
+import time
+from pathlib import Path
+import numpy as np
+import scipy.sparse as sp
+from app.core.config import settings
+from app.services.search_engine import top_k
+from app.utils.index_files import build_directory
+
+# Risk factors over MLService features; each maps to a query describing the
+# articles that address it. The corpus is mostly Spanish, so queries carry
+# both languages.
+RISK_FACTORS = [
+    ("academic_pressure", lambda s: (s.get("academic_pressure") or 0) >= 4,
+     "presión académica estrés académico rendimiento exámenes academic pressure stress"),
+    ("work_pressure", lambda s: (s.get("work_pressure") or 0) >= 4,
+     "presión laboral estrés laboral trabajo burnout work pressure"),
+    ("financial_stress", lambda s: (s.get("financial_stress") or 0) >= 4,
+     "estrés financiero económico dinero deuda financial stress"),
+    ("low_study_satisfaction", lambda s: 0 < (s.get("study_satisfaction") or 0) <= 2,
+     "satisfacción estudios motivación bienestar académico study satisfaction"),
+    ("long_hours", lambda s: (s.get("work_study_hours") or 0) >= 10,
+     "horas de estudio carga académica agotamiento workload hours"),
+    ("short_sleep", lambda s: s.get("sleep_duration") in ("Less than 5 hours", "5-6 hours"),
+     "sueño insomnio calidad del sueño descanso sleep"),
+    ("unhealthy_diet", lambda s: s.get("dietary_habits") == "Unhealthy",
+     "alimentación dieta hábitos alimentarios nutrición diet"),
+    ("suicidal_thoughts", lambda s: s.get("suicidal_thoughts") == "Yes",
+     "suicidio ideación suicida prevención del suicidio riesgo suicidal"),
+    ("family_history", lambda s: s.get("family_history") == "Yes",
+     "familia antecedentes familiares enfermedad mental familiar family history"),
+]
+
+GENERAL_QUERY = "salud mental estudiantes depresión ansiedad bienestar mental health students"
+
+# Weight of the general query, so every profile (even without risk factors) gets articles
+GENERAL_WEIGHT = 0.25
+
+def risk_profile(student: dict):
+    """Bitmask of the risk factors present in a student's features"""
+    mask = 0
+    for bit, (_, applies, _) in enumerate(RISK_FACTORS):
+        if applies(student):
+            mask |= 1 << bit
+    return mask
+
+def profile_factors(mask: int):
+    return [name for bit, (name, _, _) in enumerate(RISK_FACTORS) if mask & (1 << bit)]
+
+class RecommendationIndex:
+    """Precomputed article recommendations
+
+    Two tables, both answered by array indexing:
+    - related: the top-k most similar articles (TF-IDF cosine) of every article
+    - profiles: the top-k articles of every risk-factor bitmask, scored by
+      the sum of the similarities to each active factor's query
+
+    Risk factors are fixed rules over the model's features, not learned
+    from student clusters or predictions. Both tables derive from one
+    search index build, recorded in `meta`; `is_current()` tells when the
+    index has changed since and the tables need rebuilding.
+    """
+
+    def __init__(self, index_dir: str = None):
+        self.index_dir = Path(index_dir or settings.RECOMMENDATION_DIR)
+        self.article_ids = None
+        self.related_positions = None
+        self.related_scores = None
+        self.profile_positions = None
+        self.profile_scores = None
+        self.docs = []
+        self.meta = {}
+
+    @property
+    def is_built(self):
+        return self.article_ids is not None
+
+    def build(self, search_index, k: int = None):
+        """Compute both tables from a loaded SearchIndex"""
+        k = k or settings.RECOMMENDATION_K
+        start = time.perf_counter()
+
+        matrix = search_index.matrix
+        if search_index.delta_matrix is not None:
+            matrix = sp.vstack([matrix, search_index.delta_matrix], format='csr')
+        n_docs = matrix.shape[0]
+        docs = [search_index.doc(i) for i in range(n_docs)]
+        if n_docs == 0:
+            return False
+
+        # Positions sorted by article id, so lookups are a binary search
+        ids = np.array([doc["id"] for doc in docs], dtype=np.int64)
+        order = np.argsort(ids)
+        rank = np.empty(n_docs, dtype=np.int64)
+        rank[order] = np.arange(n_docs)
+
+        related_k = min(k, n_docs - 1)
+        self.related_positions = np.full((n_docs, k), -1, dtype=np.int32)
+        self.related_scores = np.zeros((n_docs, k), dtype=np.float32)
+        transposed = matrix.T.tocsc()
+        # Bound each dense similarity block to about 16M floats
+        block_size = max(1, (1 << 24) // n_docs)
+        for block_start in range(0, n_docs, block_size):
+            block = (matrix[block_start:block_start + block_size] @ transposed).toarray()
+            rows = np.arange(block.shape[0])
+            block[rows, rows + block_start] = -np.inf
+            for row in rows:
+                best = top_k(block[row], related_k)
+                best = best[block[row, best] > 0]
+                target = rank[block_start + row]
+                self.related_positions[target, :best.size] = rank[best]
+                self.related_scores[target, :best.size] = block[row, best]
+
+        factor_scores = np.vstack([
+            search_index.similarities(search_index.transform(query))
+            for _, _, query in RISK_FACTORS
+        ])
+        general = search_index.similarities(search_index.transform(GENERAL_QUERY)) * GENERAL_WEIGHT
+
+        n_profiles = 1 << len(RISK_FACTORS)
+        profile_k = min(k, n_docs)
+        self.profile_positions = np.full((n_profiles, k), -1, dtype=np.int32)
+        self.profile_scores = np.zeros((n_profiles, k), dtype=np.float32)
+        bits = (np.arange(n_profiles)[:, None] >> np.arange(len(RISK_FACTORS))) & 1
+        for mask in range(n_profiles):
+            scores = bits[mask] @ factor_scores + general
+            best = top_k(scores, profile_k)
+            best = best[scores[best] > 0]
+            self.profile_positions[mask, :best.size] = rank[best]
+            self.profile_scores[mask, :best.size] = scores[best]
+
+        self.article_ids = ids[order]
+        self.docs = [
+            {"id": docs[i]["id"], "title": docs[i]["title"], "year": docs[i]["year"]}
+            for i in order
+        ]
+        self.meta = {
+            "built_at": time.time(),
+            "n_docs": n_docs,
+            "k": k,
+            "risk_factors": [name for name, _, _ in RISK_FACTORS],
+            "search_index_version": search_index.version,
+            "build_seconds": round(time.perf_counter() - start, 3)
+        }
+        return True
+
+    def is_current(self, search_index, k: int = None):
+        return (
+            self.is_built
+            and self.meta.get("search_index_version") == search_index.version
+            and (k is None or self.meta.get("k") == k)
+        )
+
+    def refresh(self, search_index, k: int = None):
+        """Rebuild and save the tables if the search index (or k) changed, returns True if rebuilt"""
+        if self.is_current(search_index, k):
+            return False
+        if not self.build(search_index, k or self.meta.get("k")):
+            return False
+        self.save()
+        return True
+
+    def save(self):
+        """Write the tables as a new build of `index_dir`"""
+        with build_directory(self.index_dir) as build:
+            np.save(build / "article_ids.npy", self.article_ids)
+            np.save(build / "related_positions.npy", self.related_positions)
+            np.save(build / "related_scores.npy", self.related_scores)
+            np.save(build / "profile_positions.npy", self.profile_positions)
+            np.save(build / "profile_scores.npy", self.profile_scores)
+            with open(build / "docs.json", "w", encoding="utf-8") as f:
+                json.dump(self.docs, f, ensure_ascii=False)
+            with open(build / "meta.json", "w") as f:
+                json.dump(self.meta, f)
+
+    def load(self):
+        """Memory-map saved tables, returns False if none exist"""
+        root = self.index_dir.resolve()
+        if not (root / "meta.json").exists():
+            return False
+
+        with open(root / "meta.json") as f:
+            self.meta = json.load(f)
+        with open(root / "docs.json", encoding="utf-8") as f:
+            self.docs = json.load(f)
+        self.article_ids = np.load(root / "article_ids.npy")
+        self.related_positions = np.load(root / "related_positions.npy", mmap_mode='r')
+        self.related_scores = np.load(root / "related_scores.npy", mmap_mode='r')
+        self.profile_positions = np.load(root / "profile_positions.npy")
+        self.profile_scores = np.load(root / "profile_scores.npy")
+        return True
+
+    def _articles(self, positions, scores, limit: int):
+        return [
+            {**self.docs[position], "score": float(score)}
+            for position, score in zip(positions[:limit], scores[:limit]) if position >= 0
+        ]
+
+    def related(self, article_id: int, limit: int = 10):
+        """Precomputed neighbors of an article, None if it is not indexed"""
+        position = int(np.searchsorted(self.article_ids, article_id))
+        if position >= self.article_ids.size or self.article_ids[position] != article_id:
+            return None
+        return self._articles(self.related_positions[position], self.related_scores[position], limit)
+
+    def for_profile(self, mask: int, limit: int = 10):
+        return self._articles(self.profile_positions[mask], self.profile_scores[mask], limit)
+
+    def for_student(self, student: dict, limit: int = 10):
+        mask = risk_profile(student)
+        return {
+            "risk_factors": profile_factors(mask),
+            "articles": self.for_profile(mask, limit)
+        }
+
+recommendations = RecommendationIndex()
@@ -0,0 +1,178 @@
+import numpy as np
+
+def top_k(scores: np.ndarray, k: int):
+    """Positions of the k highest scores, best first, without a full argsort"""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+class InvertedIndex:
+    """Posting lists over the TF-IDF vocabulary
+
+    The CSC form of the document-term matrix is exactly an inverted index:
+    for each term, `indptr` delimits a sorted run of document positions and
+    their weights. Queries only touch the postings of their own terms.
+    """
+
+    def __init__(self, matrix):
+        csc = matrix.tocsc()
+        csc.sort_indices()
+        self.n_docs = csc.shape[0]
+        self.indptr = csc.indptr
+        self.postings = csc.indices
+        self.weights = csc.data
+
+        # Upper bound of each term's contribution, used by MaxScore
+        self.max_weight = np.zeros(csc.shape[1], dtype=self.weights.dtype)
+        lengths = np.diff(self.indptr)
+        non_empty = lengths > 0
+        if non_empty.any():
+            self.max_weight[non_empty] = np.maximum.reduceat(
+                self.weights, self.indptr[:-1][non_empty]
+            )
+
+    def _term_postings(self, term: int):
+        start, end = self.indptr[term], self.indptr[term + 1]
+        return self.postings[start:end], self.weights[start:end]
+
+    def search(self, query_vec, k: int, early_termination: bool = False):
+        """Return (positions, scores) of the top-k documents for a query row vector"""
+        query = query_vec.tocsr()
+        terms = query.indices
+        query_weights = query.data
+        if terms.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if early_termination:
+            docs, scores = self._score_max_score(terms, query_weights, k)
+        else:
+            docs, scores = self._score_exhaustive(terms, query_weights)
+
+        order = top_k(scores, k)
+        keep = scores[order] > 0
+        return docs[order][keep], scores[order][keep]
+
+    def _score_exhaustive(self, terms, query_weights):
+        """Accumulate scores for every document sharing a term with the query"""
+        doc_parts = []
+        score_parts = []
+        for term, query_weight in zip(terms, query_weights):
+            docs, weights = self._term_postings(term)
+            doc_parts.append(docs)
+            score_parts.append(weights * query_weight)
+
+        all_docs = np.concatenate(doc_parts)
+        docs, inverse = np.unique(all_docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts), minlength=docs.size)
+        return docs, scores
+
+    def _score_max_score(self, terms, query_weights, k):
+        """Term-at-a-time MaxScore
+
+        Terms are processed by decreasing upper bound. Once the bounds of the
+        remaining terms cannot lift an unseen document past the current k-th
+        score, no new candidates are admitted, and candidates that cannot
+        reach the threshold are dropped. The result is the exact top-k.
+        """
+        bounds = self.max_weight[terms] * query_weights
+        order = np.argsort(bounds)[::-1]
+        terms, query_weights, bounds = terms[order], query_weights[order], bounds[order]
+        remaining = np.concatenate([np.cumsum(bounds[::-1])[::-1][1:], [0.0]])
+
+        docs = np.empty(0, dtype=self.postings.dtype)
+        scores = np.empty(0, dtype=np.float64)
+        admitting = True
+
+        for term, query_weight, rest in zip(terms, query_weights, remaining):
+            postings, weights = self._term_postings(term)
+            contributions = weights * query_weight
+
+            if admitting:
+                merged = np.concatenate([docs, postings])
+                merged_docs, inverse = np.unique(merged, return_inverse=True)
+                scores = np.bincount(
+                    inverse,
+                    weights=np.concatenate([scores, contributions]),
+                    minlength=merged_docs.size
+                )
+                docs = merged_docs
+            else:
+                # docs stays sorted, so postings can be matched by binary search
+                positions = np.searchsorted(docs, postings)
+                positions[positions == docs.size] = 0
+                hits = docs[positions] == postings
+                np.add.at(scores, positions[hits], contributions[hits])
+
+            if docs.size < k:
+                continue
+
+            threshold = np.partition(scores, -k)[-k]
+            if rest < threshold:
+                admitting = False
+            alive = scores + rest >= threshold
+            docs, scores = docs[alive], scores[alive]
+
+        return docs, scores
+
+class IVFIndex:
+    """Inverted-file approximate nearest neighbor index over unit vectors
+
+    Vectors are clustered with k-means and stored grouped by cluster, so a
+    list is a contiguous slice of the vector matrix. A query scores the
+    centroids, scans only the `nprobe` closest lists and returns the best
+    inner products among them.
+    """
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray):
+        self.centroids = centroids
+        self.offsets = offsets
+
+    @property
+    def n_lists(self):
+        return self.centroids.shape[0]
+
+    @staticmethod
+    def build(vectors: np.ndarray, n_lists: int, seed: int = 42, sample_size: int = 100000):
+        """Cluster unit `vectors`, returns (index, order that groups rows by list)"""
+        from sklearn.cluster import MiniBatchKMeans
+
+        rng = np.random.default_rng(seed)
+        n_lists = max(1, min(n_lists, vectors.shape[0]))
+        sample = vectors
+        if vectors.shape[0] > sample_size:
+            sample = vectors[np.sort(rng.choice(vectors.shape[0], sample_size, replace=False))]
+
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_lists, batch_size=4096, n_init=3, random_state=seed
+        ).fit(sample)
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids /= np.where(norms > 0, norms, 1)
+
+        # Assign by inner product in blocks, consistent with how queries probe
+        assignments = np.empty(vectors.shape[0], dtype=np.int32)
+        for start in range(0, vectors.shape[0], 65536):
+            block = vectors[start:start + 65536]
+            assignments[start:start + block.shape[0]] = (block @ centroids.T).argmax(axis=1)
+
+        order = np.argsort(assignments, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=n_lists))])
+        return IVFIndex(centroids, offsets.astype(np.int64)), order
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int, nprobe: int):
+        """Return (positions, scores) of the approximate top-k for a unit query vector"""
+        lists = top_k(self.centroids @ query, min(nprobe, self.n_lists))
+        ranges = [(self.offsets[i], self.offsets[i + 1]) for i in np.sort(lists)]
+        positions = np.concatenate(
+            [np.arange(start, end) for start, end in ranges]
+        ) if ranges else np.empty(0, dtype=np.int64)
+        if positions.size == 0:
+            return positions, np.empty(0, dtype=np.float32)
+
+        scores = np.concatenate([vectors[start:end] @ query for start, end in ranges])
+        best = top_k(scores, k)
+        return positions[best], scores[best]
@@ -0,0 +1,262 @@
+import json
+import time
+from pathlib import Path
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from app.core.config import settings
+from app.services.search_engine import InvertedIndex
+from app.utils.index_files import build_directory, link_files
+
+SNIPPET_LENGTH = 300
+
+# Files of the base segment, unchanged when only the delta is saved
+BASE_SEGMENT_FILES = [
+    "idf.npy", "matrix_data.npy", "matrix_indices.npy", "matrix_indptr.npy",
+    "vocabulary.json", "docs.json"
+]
+
+def article_text(title, abstract, introduction):
+    """Text indexed for an article"""
+    return f"{title or ''} {abstract or ''} {introduction or ''}"
+
+def article_doc(article_id, title, authors, year, abstract):
+    """Compact row kept in the docs table instead of the ORM object"""
+    return {
+        "id": article_id,
+        "title": title,
+        "authors": authors,
+        "year": year,
+        "abstract": abstract[:SNIPPET_LENGTH] + "..." if abstract else None
+    }
+
+class SearchIndex:
+    """TF-IDF article index persisted to disk and memory-mapped on load
+
+    The base segment (CSR matrix, vocabulary, idf and docs table) is built
+    offline. Articles added later are transformed with the frozen vocabulary
+    and idf and kept in a small delta segment, so a single insert never
+    refits the corpus; `needs_rebuild` tells when the delta has grown enough
+    that a full rebuild is worth it.
+    """
+
+    def __init__(self, index_dir: str = None):
+        self.index_dir = Path(index_dir or settings.SEARCH_INDEX_DIR)
+        self.vectorizer = None
+        self.matrix = None
+        self.docs = []
+        self.delta_matrix = None
+        self.delta_docs = []
+        self.meta = {}
+        self._inverted = None
+        self._positions = None
+
+    @staticmethod
+    def _new_vectorizer(**kwargs):
+        return TfidfVectorizer(
+            stop_words='english',
+            ngram_range=(1, 2),
+            **kwargs
+        )
+
+    @property
+    def size(self):
+        return len(self.docs) + len(self.delta_docs)
+
+    @property
+    def version(self):
+        """Changes with every full build and every persisted delta"""
+        return f"{self.meta.get('built_at')}:{len(self.delta_docs)}"
+
+    @property
+    def needs_rebuild(self):
+        base = max(len(self.docs), 1)
+        return len(self.delta_docs) / base > settings.SEARCH_REBUILD_RATIO
+
+    @property
+    def max_id(self):
+        ids = [doc["id"] for doc in self.docs + self.delta_docs]
+        return max(ids) if ids else 0
+
+    def build(self, rows, max_features: int = None):
+        """Fit TF-IDF on (id, title, authors, year, abstract, introduction) rows"""
+        corpus = []
+        docs = []
+        for article_id, title, authors, year, abstract, introduction in rows:
+            corpus.append(article_text(title, abstract, introduction))
+            docs.append(article_doc(article_id, title, authors, year, abstract))
+
+        if not corpus:
+            return False
+
+        self.vectorizer = self._new_vectorizer(
+            max_features=max_features or settings.SEARCH_MAX_FEATURES
+        )
+        self.matrix = self.vectorizer.fit_transform(corpus).astype(np.float32).tocsr()
+        self.docs = docs
+        self.delta_matrix = None
+        self.delta_docs = []
+        self._inverted = None
+        self._positions = None
+        self.meta = {
+            "built_at": time.time(),
+            "n_docs": len(docs),
+            "n_terms": len(self.vectorizer.vocabulary_),
+            "max_features": max_features or settings.SEARCH_MAX_FEATURES
+        }
+        return True
+
+    def save(self):
+        """Write the base and delta segments as a new build of `index_dir`"""
+        terms = sorted(self.vectorizer.vocabulary_, key=self.vectorizer.vocabulary_.get)
+        with build_directory(self.index_dir) as build:
+            np.save(build / "idf.npy", self.vectorizer.idf_)
+            np.save(build / "matrix_data.npy", self.matrix.data)
+            np.save(build / "matrix_indices.npy", self.matrix.indices)
+            np.save(build / "matrix_indptr.npy", self.matrix.indptr)
+
+            with open(build / "vocabulary.json", "w", encoding="utf-8") as f:
+                json.dump(terms, f, ensure_ascii=False)
+            with open(build / "docs.json", "w", encoding="utf-8") as f:
+                json.dump(self.docs, f, ensure_ascii=False)
+
+            self._write_delta(build)
+            with open(build / "meta.json", "w") as f:
+                json.dump(self.meta, f)
+
+    def _write_delta(self, directory: Path):
+        delta_path = directory / "delta_matrix.npz"
+        if self.delta_matrix is None:
+            delta_path.unlink(missing_ok=True)
+        else:
+            sp.save_npz(delta_path, self.delta_matrix)
+        with open(directory / "delta_docs.json", "w", encoding="utf-8") as f:
+            json.dump(self.delta_docs, f, ensure_ascii=False)
+
+    def save_delta(self):
+        """Write a new build sharing the base segment of the current one, with the new delta"""
+        current = self.index_dir.resolve()
+        if not (current / "meta.json").exists():
+            self.save()
+            return
+        with build_directory(self.index_dir) as build:
+            link_files(current, build, BASE_SEGMENT_FILES)
+            self._write_delta(build)
+            with open(build / "meta.json", "w") as f:
+                json.dump(self.meta, f)
+
+    def load(self):
+        """Memory-map a saved index, returns False if none exists"""
+        # Resolved once, so a build swapped in meanwhile is not mixed in
+        root = self.index_dir.resolve()
+        if not (root / "meta.json").exists():
+            return False
+
+        with open(root / "meta.json") as f:
+            self.meta = json.load(f)
+        with open(root / "vocabulary.json", encoding="utf-8") as f:
+            terms = json.load(f)
+        with open(root / "docs.json", encoding="utf-8") as f:
+            self.docs = json.load(f)
+
+        self.vectorizer = self._new_vectorizer(
+            vocabulary={term: i for i, term in enumerate(terms)}
+        )
+        self.vectorizer.idf_ = np.load(root / "idf.npy")
+
+        data = np.load(root / "matrix_data.npy", mmap_mode='r')
+        indices = np.load(root / "matrix_indices.npy", mmap_mode='r')
+        indptr = np.load(root / "matrix_indptr.npy", mmap_mode='r')
+        self.matrix = sp.csr_matrix(
+            (data, indices, indptr), shape=(len(self.docs), len(terms)), copy=False
+        )
+
+        delta_path = root / "delta_matrix.npz"
+        self.delta_matrix = sp.load_npz(delta_path).tocsr() if delta_path.exists() else None
+        delta_docs_path = root / "delta_docs.json"
+        if delta_docs_path.exists():
+            with open(delta_docs_path, encoding="utf-8") as f:
+                self.delta_docs = json.load(f)
+        self._inverted = None
+        self._positions = None
+        return True
+
+    def add_articles(self, rows, persist: bool = True):
+        """Append new articles to the delta segment using the frozen vocabulary"""
+        known = {doc["id"] for doc in self.docs + self.delta_docs}
+        corpus = []
+        docs = []
+        for article_id, title, authors, year, abstract, introduction in rows:
+            if article_id in known:
+                continue
+            corpus.append(article_text(title, abstract, introduction))
+            docs.append(article_doc(article_id, title, authors, year, abstract))
+
+        if not corpus:
+            return 0
+
+        added = self.vectorizer.transform(corpus).astype(np.float32).tocsr()
+        if self.delta_matrix is None:
+            self.delta_matrix = added
+        else:
+            self.delta_matrix = sp.vstack([self.delta_matrix, added], format='csr')
+        self.delta_docs.extend(docs)
+        self._inverted = None
+        self._positions = None
+
+        if persist:
+            self.save_delta()
+
+        if self.needs_rebuild:
+            print(f"⚠️ Search index delta has {len(self.delta_docs)} articles, consider a full rebuild")
+        return len(docs)
+
+    def transform(self, query: str):
+        return self.vectorizer.transform([query]).astype(np.float32)
+
+    def doc(self, position: int):
+        """Docs table row for a matrix position across base and delta"""
+        if position < len(self.docs):
+            return self.docs[position]
+        return self.delta_docs[position - len(self.docs)]
+
+    def positions(self, article_ids):
+        """Matrix positions of the given article ids, skipping ids not indexed"""
+        if self._positions is None:
+            self._positions = {doc["id"]: i for i, doc in enumerate(self.docs + self.delta_docs)}
+        lookup = self._positions
+        return np.fromiter(
+            (lookup[article_id] for article_id in article_ids if article_id in lookup), dtype=np.int64
+        )
+
+    def similarities_at(self, positions: np.ndarray, query_vec):
+        """Cosine similarity of a query against the articles at `positions` only"""
+        scores = np.zeros(positions.size, dtype=np.float32)
+        in_base = positions < len(self.docs)
+        if in_base.any():
+            scores[in_base] = (self.matrix[positions[in_base]] @ query_vec.T).toarray().ravel()
+        if not in_base.all():
+            delta_rows = positions[~in_base] - len(self.docs)
+            scores[~in_base] = (self.delta_matrix[delta_rows] @ query_vec.T).toarray().ravel()
+        return scores
+
+    def similarities(self, query_vec):
+        """Cosine similarity of a query against every indexed article
+
+        Rows and queries are L2 normalized, so cosine is a sparse dot product.
+        """
+        scores = (self.matrix @ query_vec.T).toarray().ravel()
+        if self.delta_matrix is not None:
+            delta_scores = (self.delta_matrix @ query_vec.T).toarray().ravel()
+            scores = np.concatenate([scores, delta_scores])
+        return scores
+
+    @property
+    def inverted(self):
+        """Inverted index over base and delta, built on first use"""
+        if self._inverted is None:
+            matrix = self.matrix
+            if self.delta_matrix is not None:
+                matrix = sp.vstack([self.matrix, self.delta_matrix], format='csr')
+            self._inverted = InvertedIndex(matrix)
+        return self._inverted
@@ -1,73 +1,212 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+from sqlalchemy import func, text
 from sqlalchemy.orm import Session
+from sqlalchemy.types import Text
+from app.core.config import settings
+from app.core.metrics import metrics
 from app.models.article import Article
+from app.services.embedding_index import EmbeddingIndex
+from app.services.search_engine import top_k
+from app.services.search_index import SearchIndex
+
+SEARCH_MODES = ("dense", "inverted", "hybrid", "semantic")
+
+SEARCH_SECONDS = metrics.histogram("mindgraph_search_seconds", "Article search latency by mode", ["mode"])
+
+# Must match idx_articles_fulltext in database/postgres/init.sql for the GIN index to be used
+ARTICLE_TSVECTOR = func.to_tsvector(
+    text("'english'::regconfig"),
+    func.coalesce(Article.title, '') + ' ' + func.coalesce(Article.abstract, '') + ' '
+    + func.coalesce(Article.introduction, '')
+)
+
+FULLTEXT_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_articles_fulltext ON articles USING gin(
+    to_tsvector('english'::regconfig,
+        coalesce(title, '') || ' ' || coalesce(abstract, '') || ' ' || coalesce(introduction, ''))
+)
+"""
+
+def any_term_tsquery(query: str):
+    """tsquery matching any of the query's terms, stemmed and without stop words
+
+    TF-IDF scores partial matches too, so candidates are OR-ed rather than
+    plainto_tsquery's AND.
+    """
+    plain = func.plainto_tsquery(text("'english'::regconfig"), query)
+    return func.to_tsquery(text("'english'::regconfig"), func.replace(func.cast(plain, Text), '&', '|'))
+
+INDEX_COLUMNS = (
+    Article.id, Article.title, Article.authors, Article.publication_year,
+    Article.abstract, Article.introduction
+)
 
 class SearchService:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words='english',
-            ngram_range=(1, 2)
-        )
-        self.tfidf_matrix = None
-        self.articles = []
-        self.is_fitted = False  # ⬅️ NUEVO
-    
+    def __init__(self, index_dir: str = None, embedding_dir: str = None):
+        self.index = SearchIndex(index_dir)
+        self.embeddings = EmbeddingIndex(embedding_dir)
+        self.is_fitted = False
+        self.has_embeddings = False
+
+    def load_index(self):
+        """Memory-map the prebuilt indexes from disk"""
+        self.is_fitted = self.index.load()
+        if self.is_fitted:
+            print(f"✅ Search index loaded ({self.index.size} articles)")
+        self.has_embeddings = self.embeddings.load()
+        if self.has_embeddings:
+            print(f"✅ Embedding index loaded ({self.embeddings.size} articles)")
+        return self.is_fitted
+
+    def fit_embeddings(self, db: Session):
+        """Compute LSA embeddings and the IVF index for all articles and persist them"""
+        rows = db.query(*INDEX_COLUMNS).order_by(Article.id).yield_per(1000)
+
+        if not self.embeddings.build(rows):
+            print("⚠️ No articles found in database")
+            return False
+
+        self.embeddings.save()
+        self.has_embeddings = True
+        print(f"✅ Embeddings built for {self.embeddings.size} articles: {self.embeddings.meta}")
+        return True
+
     def fit(self, db: Session):
-        """Train TF-IDF on all articles"""
-        articles = db.query(Article).all()
-        
-        if not articles:
+        """Train TF-IDF on all articles and persist the index"""
+        rows = db.query(*INDEX_COLUMNS).order_by(Article.id).yield_per(1000)
+
+        if not self.index.build(rows):
             print("⚠️ No articles found in database")
             return False
-        
-        self.articles = articles
-        
-        # Combine text fields
-        corpus = []
-        for article in articles:
-            text = f"{article.title or ''} {article.abstract or ''} {article.introduction or ''}"
-            corpus.append(text)
-        
-        if corpus:
-            self.tfidf_matrix = self.vectorizer.fit_transform(corpus)
-            self.is_fitted = True  # ⬅️ NUEVO
-            print(f"✅ TF-IDF trained on {len(corpus)} articles")
-            return True
-        
-        return False
-    
-    def search(self, query: str, limit: int, db: Session):
-        """Search articles using TF-IDF similarity"""
-        # ⬅️ NUEVO: Auto-fit si no está entrenado
-        if not self.is_fitted or self.tfidf_matrix is None:
+
+        self.index.save()
+        self.is_fitted = True
+        print(f"✅ TF-IDF trained on {self.index.size} articles")
+        return True
+
+    def add_articles(self, db: Session):
+        """Index articles inserted since the index was built"""
+        rows = (
+            db.query(*INDEX_COLUMNS)
+            .filter(Article.id > self.index.max_id)
+            .order_by(Article.id)
+            .all()
+        )
+        added = self.index.add_articles(rows)
+        if added:
+            print(f"✅ Added {added} articles to the search index")
+        return added
+
+    def ensure_fulltext_index(self, db: Session):
+        """Create the GIN index hybrid search filters candidates with"""
+        db.execute(text(FULLTEXT_INDEX))
+        db.commit()
+
+    def fulltext_candidates(self, query: str, db: Session, year_from: int = None,
+                            year_to: int = None, content_type: str = None, limit: int = None):
+        """Ids of the best full-text matches through the GIN index, filters applied in SQL
+
+        When more articles match than the cap, the ones kept are those
+        ts_rank scores highest, not whichever the scan returns first.
+        """
+        tsquery = any_term_tsquery(query)
+        candidates = db.query(Article.id).filter(ARTICLE_TSVECTOR.op('@@')(tsquery))
+        if year_from is not None:
+            candidates = candidates.filter(Article.publication_year >= year_from)
+        if year_to is not None:
+            candidates = candidates.filter(Article.publication_year <= year_to)
+        if content_type:
+            candidates = candidates.filter(Article.content_type == content_type)
+        candidates = candidates.order_by(func.ts_rank(ARTICLE_TSVECTOR, tsquery).desc()) \
+            .limit(limit or settings.SEARCH_HYBRID_CANDIDATES)
+        return [article_id for (article_id,) in candidates]
+
+    def search(self, query: str, limit: int, db: Session, mode: str = None,
+               year_from: int = None, year_to: int = None, content_type: str = None):
+        """Search articles using TF-IDF similarity
+
+        `dense` scores every document with one sparse product, `inverted`
+        only scores documents that share a term with the query. `hybrid`
+        asks PostgreSQL's full-text GIN index for candidates, with the year
+        and content_type filters in the same query, and re-ranks only those
+        by TF-IDF cosine. Candidates inserted after the index was built are
+        not scored until they are added to it. `semantic` ranks LSA
+        embeddings through the IVF index.
+        """
+        mode = mode or settings.SEARCH_MODE
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        filtered = year_from is not None or year_to is not None or content_type
+        if filtered and mode != "hybrid":
+            raise ValueError("year and content_type filters require mode=hybrid")
+
+        with SEARCH_SECONDS.time(mode=mode):
+            return self._search(query, limit, db, mode, year_from, year_to, content_type)
+
+    def _search(self, query: str, limit: int, db: Session, mode: str,
+                year_from: int, year_to: int, content_type: str):
+        if mode == "semantic":
+            return self._semantic_search(query, limit)
+
+        # Prefer the offline index, fall back to fitting from the database
+        if not self.is_fitted and not self.load_index():
             print("🔄 Training TF-IDF vectorizer...")
             success = self.fit(db)
             if not success:
                 return []
-        
+
         # Transform query
-        query_vec = self.vectorizer.transform([query])
-        
-        # Calculate similarity
-        similarities = cosine_similarity(query_vec, self.tfidf_matrix).flatten()
-        
-        # Get top results
-        top_indices = similarities.argsort()[-limit:][::-1]
-        
+        query_vec = self.index.transform(query)
+
+        if mode == "hybrid":
+            ids = self.fulltext_candidates(query, db, year_from, year_to, content_type)
+            positions = self.index.positions(ids)
+            candidate_scores = self.index.similarities_at(positions, query_vec)
+            best = top_k(candidate_scores, limit)
+            top_indices, scores = positions[best], candidate_scores[best]
+        elif mode == "inverted":
+            top_indices, scores = self.index.inverted.search(
+                query_vec, limit, early_termination=settings.SEARCH_EARLY_TERMINATION
+            )
+        else:
+            similarities = self.index.similarities(query_vec)
+            top_indices = top_k(similarities, limit)
+            scores = similarities[top_indices]
+
         results = []
-        for idx in top_indices:
-            if similarities[idx] > 0:
-                article = self.articles[idx]
+        for idx, score in zip(top_indices, scores):
+            if score > 0:
+                doc = self.index.doc(idx)
                 results.append({
-                    "id": article.id,
-                    "title": article.title,
-                    "authors": article.authors,
-                    "year": article.publication_year,
-                    "score": float(similarities[idx]),
-                    "abstract": article.abstract[:300] + "..." if article.abstract else None
+                    "id": doc["id"],
+                    "title": doc["title"],
+                    "authors": doc["authors"],
+                    "year": doc["year"],
+                    "score": float(score),
+                    "abstract": doc["abstract"]
                 })
-        
-        return results
\ No newline at end of file
+
+        return results
+
+    def _semantic_search(self, query: str, limit: int):
+        if not self.has_embeddings and not self.embeddings.load():
+            raise ValueError(
+                "Embedding index not built. Build it with: python scripts/build_search_index.py --embeddings"
+            )
+        self.has_embeddings = True
+
+        positions, scores = self.embeddings.search(query, limit)
+
+        results = []
+        for position, score in zip(positions, scores):
+            if score > 0:
+                doc = self.embeddings.doc(int(position))
+                results.append({
+                    "id": doc["id"],
+                    "title": doc["title"],
+                    "authors": doc["authors"],
+                    "year": doc["year"],
+                    "score": float(score),
+                    "abstract": doc["abstract"]
+                })
+
+        return results
@@ -0,0 +1,269 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+from sklearn.neighbors import BallTree
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.student import Student
+from app.services.ml_service import MLService
+from app.services.training import fit_encoders, stage
+
+KNN_METHODS = ("blocked", "ball_tree")
+
+def _chunks(n: int, chunk_size: int):
+    for start in range(0, n, chunk_size):
+        yield slice(start, min(start + chunk_size, n))
+
+def export_student_features(ml_service: MLService, db, data_dir: str, chunk_size: int):
+    """Stream every student into memory-mapped id and encoded feature arrays
+
+    Same encoding as MLService.prepare_features; returns the rows written.
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    n = db.query(func.count(Student.id)).scalar()
+    if n == 0:
+        return 0
+    width = len(ml_service.feature_columns) + len(ml_service.categorical_columns)
+
+    ids = np.lib.format.open_memmap(data_dir / "ids.npy", mode="w+", dtype=np.int64, shape=(n,))
+    features = np.lib.format.open_memmap(data_dir / "features.npy", mode="w+", dtype=np.float32, shape=(n, width))
+
+    columns = [getattr(Student, col) for col in ml_service.feature_columns + ml_service.categorical_columns]
+    statement = select(Student.id, *columns).order_by(Student.id).execution_options(yield_per=chunk_size)
+
+    written = 0
+    for partition in db.execute(statement).partitions():
+        partition = partition[:n - written]
+        if not partition:
+            break
+        end = written + len(partition)
+        ids[written:end] = [row[0] for row in partition]
+        features[written:end] = ml_service.encode_rows([row[1:] for row in partition])
+        written = end
+
+    ids.flush()
+    features.flush()
+    if written < n:
+        np.save(data_dir / "ids.npy", np.array(ids[:written]))
+        np.save(data_dir / "features.npy", np.array(features[:written]))
+    return written
+
+def standardize(features: np.ndarray, chunk_size: int):
+    """Scale every column to zero mean and unit variance in place, two passes over chunks"""
+    n, width = features.shape
+    total = np.zeros(width)
+    total_sq = np.zeros(width)
+    for chunk in _chunks(n, chunk_size):
+        block = features[chunk].astype(np.float64)
+        total += block.sum(axis=0)
+        total_sq += (block ** 2).sum(axis=0)
+
+    mean = total / n
+    std = np.sqrt(np.maximum(total_sq / n - mean ** 2, 0))
+    std[std == 0] = 1
+    for chunk in _chunks(n, chunk_size):
+        features[chunk] = (features[chunk] - mean) / std
+    return mean, std
+
+def _merge_top_k(best_positions: np.ndarray, best_distances: np.ndarray,
+                 distances: np.ndarray, ref_start: int):
+    """Merge a block of candidate distances into the running, sorted top-k in place"""
+    k = best_distances.shape[1]
+    worst = best_distances[:, -1]
+
+    if np.isinf(worst).any():
+        # Top-k not filled yet: full merge of the block
+        positions = np.broadcast_to(np.arange(ref_start, ref_start + distances.shape[1]), distances.shape)
+        candidates = np.hstack([best_distances, distances])
+        candidate_positions = np.hstack([best_positions, positions])
+        keep = np.argpartition(candidates, k - 1, axis=1)[:, :k]
+        keep = np.take_along_axis(keep, np.argsort(np.take_along_axis(candidates, keep, axis=1), axis=1), axis=1)
+        best_distances[:] = np.take_along_axis(candidates, keep, axis=1)
+        best_positions[:] = np.take_along_axis(candidate_positions, keep, axis=1)
+        return
+
+    # Only entries closer than a row's current k-th neighbor can enter its top-k,
+    # and after the first blocks they are rare, so merge just those
+    closer = np.flatnonzero(distances.min(axis=1) < worst)
+    if closer.size == 0:
+        return
+    hits, cols = np.nonzero(distances[closer] < worst[closer, None])
+    rows = closer[hits]
+    touched, counts = np.unique(rows, return_counts=True)
+    candidate_rows = np.concatenate([np.repeat(touched, k), rows])
+    candidate_distances = np.concatenate([best_distances[touched].ravel(), distances[rows, cols]])
+    candidate_positions = np.concatenate([best_positions[touched].ravel(), cols + ref_start])
+
+    order = np.lexsort((candidate_distances, candidate_rows))
+    starts = np.repeat(np.cumsum(counts + k) - (counts + k), counts + k)
+    keep = order[np.arange(order.size) - starts < k]
+    best_distances[touched] = candidate_distances[keep].reshape(-1, k)
+    best_positions[touched] = candidate_positions[keep].reshape(-1, k)
+
+def _blocked_knn(features: np.ndarray, sq_norms: np.ndarray, rows: slice, k: int, block_size: int):
+    """Exact k-NN of `rows` against all points, one reference block at a time
+
+    Squared distances come from |q|² + |r|² - 2 q·r, so each step is a single
+    matrix product of at most block_size × block_size entries; a running
+    top-k is merged with every block and nothing N×N is ever allocated.
+    |q|² does not change a row's ranking and is only added at the end.
+    """
+    queries = features[rows] * -2
+    n_rows = queries.shape[0]
+    best_positions = np.full((n_rows, k), -1, dtype=np.int64)
+    best_distances = np.full((n_rows, k), np.inf, dtype=np.float32)
+
+    for ref in _chunks(features.shape[0], block_size):
+        distances = queries @ features[ref].T
+        distances += sq_norms[ref]
+
+        # A student is not its own neighbor
+        first, last = max(rows.start, ref.start), min(rows.stop, ref.stop)
+        if first < last:
+            own = np.arange(first, last)
+            distances[own - rows.start, own - ref.start] = np.inf
+
+        _merge_top_k(best_positions, best_distances, distances, ref.start)
+
+    best_distances += sq_norms[rows, None]
+    return best_positions, np.sqrt(np.maximum(best_distances, 0))
+
+def _ball_tree_knn(tree: BallTree, features: np.ndarray, rows: slice, k: int):
+    distances, positions = tree.query(features[rows], k=k + 1)
+    # Drop each point itself; with duplicate points it may not be the first hit
+    own = positions == np.arange(rows.start, rows.stop)[:, None]
+    own[~own.any(axis=1), -1] = True
+    keep = ~own
+    n_rows = positions.shape[0]
+    return positions[keep].reshape(n_rows, k), distances[keep].reshape(n_rows, k).astype(np.float32)
+
+def compute_neighbors(data_dir: str, k: int, block_size: int, method: str = "blocked", workers: int = 1):
+    """Top-k nearest neighbors of every student, written to neighbors.npy and distances.npy
+
+    Query blocks are independent and run on `workers` threads (NumPy and
+    the ball tree release the GIL). Results are memory-mapped on disk.
+    """
+    if method not in KNN_METHODS:
+        raise ValueError(f"Unknown k-NN method: {method}")
+
+    data_dir = Path(data_dir)
+    features = np.load(data_dir / "features.npy", mmap_mode="r")
+    n = features.shape[0]
+    k = min(k, n - 1)
+
+    neighbors = np.lib.format.open_memmap(data_dir / "neighbors.npy", mode="w+", dtype=np.int64, shape=(n, k))
+    distances = np.lib.format.open_memmap(data_dir / "distances.npy", mode="w+", dtype=np.float32, shape=(n, k))
+
+    if method == "ball_tree":
+        tree = BallTree(np.asarray(features))
+        search = lambda rows: _ball_tree_knn(tree, features, rows, k)
+    else:
+        sq_norms = np.einsum('ij,ij->i', features, features)
+        search = lambda rows: _blocked_knn(features, sq_norms, rows, k, block_size)
+
+    def run(rows: slice):
+        neighbors[rows], distances[rows] = search(rows)
+
+    blocks = list(_chunks(n, block_size))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run, blocks))
+    else:
+        for rows in blocks:
+            run(rows)
+
+    neighbors.flush()
+    distances.flush()
+    return n, k
+
+def similarity_edges(data_dir: str, batch_size: int):
+    """Yield batches of weighted, undirected SIMILAR_TO edges from the k-NN tables
+
+    Each pair is emitted once, from its smaller position, even when both
+    students list each other, so concurrent batches never write the same
+    relationship. Weights are 1 / (1 + distance) over standardized features.
+    """
+    data_dir = Path(data_dir)
+    ids = np.load(data_dir / "ids.npy", mmap_mode="r")
+    neighbors = np.load(data_dir / "neighbors.npy", mmap_mode="r")
+    distances = np.load(data_dir / "distances.npy", mmap_mode="r")
+
+    batch = []
+    for chunk in _chunks(neighbors.shape[0], batch_size):
+        sources = np.arange(chunk.start, chunk.stop)[:, None]
+        targets = np.asarray(neighbors[chunk])
+        # (i, j) with i > j is written by row j, unless j does not list i
+        mutual = (neighbors[targets.ravel()].reshape(*targets.shape, -1) == sources[:, :, None]).any(axis=2)
+        emit = (sources < targets) | ~mutual
+        weights = 1.0 / (1.0 + distances[chunk])
+
+        for source, target, weight in zip(
+            np.broadcast_to(sources, targets.shape)[emit], targets[emit], weights[emit]
+        ):
+            low, high = (source, target) if source < target else (target, source)
+            batch.append({"source": int(ids[low]), "target": int(ids[high]), "weight": float(weight)})
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def similarity_pipeline(k: int = None, block_size: int = None, method: str = "blocked",
+                        batch_size: int = None, workers: int = None, data_dir: str = None,
+                        write: bool = True, graph_service=None):
+    """Encode students, compute their k-NN out of core and write SIMILAR_TO edges
+
+    Returns a report with the timing and peak memory of each stage.
+    """
+    k = k or settings.SIMILARITY_K
+    block_size = block_size or settings.SIMILARITY_BLOCK_SIZE
+    batch_size = batch_size or settings.NEO4J_BATCH_SIZE
+    workers = workers or os.cpu_count()
+    data_dir = data_dir or settings.SIMILARITY_DATA_DIR
+    log = []
+    ml_service = MLService()
+
+    db = SessionLocal()
+    try:
+        with stage("encoders", log):
+            fit_encoders(ml_service, db)
+        with stage("export", log) as entry:
+            entry["rows"] = rows = export_student_features(ml_service, db, data_dir, settings.TRAIN_CHUNK_SIZE)
+    finally:
+        db.close()
+
+    if rows < 2:
+        raise ValueError("At least two students are needed to build a similarity graph")
+
+    with stage("standardize", log):
+        features = np.load(Path(data_dir) / "features.npy", mmap_mode="r+")
+        standardize(features, settings.TRAIN_CHUNK_SIZE)
+        features.flush()
+        del features
+
+    with stage("knn", log) as entry:
+        _, k = compute_neighbors(data_dir, k, block_size, method, workers)
+        entry.update({"k": k, "method": method, "block_size": block_size, "workers": workers})
+
+    report = {"rows": rows, "k": k, "method": method, "stages": log}
+    if not write:
+        with stage("edges", log) as entry:
+            entry["edges"] = sum(len(batch) for batch in similarity_edges(data_dir, batch_size))
+        report["edges"] = entry["edges"]
+        return report
+
+    if graph_service is None:
+        from app.services.graph_service import GraphService
+        graph_service = GraphService()
+
+    with stage("clear", log) as entry:
+        entry["deleted"] = graph_service.clear_similarities(batch_size)
+    with stage("write", log) as entry:
+        result = graph_service.bulk_merge_similarities(similarity_edges(data_dir, batch_size))
+        entry.update(result)
+    report["edges"] = result["rows"]
+    return report
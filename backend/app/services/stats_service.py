@@ -0,0 +1,104 @@
+import threading
+import time
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.student import Student
+
+def _rate(part, total):
+    return round(part / total * 100, 2) if total > 0 else 0
+
+class StatsService:
+    """Student statistics computed in single-pass aggregates and cached
+
+    Results are cached in-process for STATS_CACHE_TTL seconds, and hits
+    run no query. The loaders and the incremental graph sync call
+    `invalidate()` when they see students change. Writes made by other
+    processes are caught by re-reading max(updated_at), a single probe of
+    the (updated_at, id) index, at most every STATS_VERSION_INTERVAL
+    seconds.
+    """
+
+    def __init__(self):
+        self.cache = TTLCache(maxsize=32, ttl=settings.STATS_CACHE_TTL)
+        self._version = None
+        self._version_checked = 0.0
+        self._version_lock = threading.Lock()
+
+    def invalidate(self):
+        self.cache.invalidate()
+
+    def _check_version(self, db: Session):
+        """Drop cached results if students changed since the last check"""
+        interval = settings.STATS_VERSION_INTERVAL
+        if interval <= 0 or time.monotonic() - self._version_checked < interval:
+            return
+        with self._version_lock:
+            if time.monotonic() - self._version_checked < interval:
+                return
+            version = db.query(func.max(Student.updated_at)).scalar()
+            if version != self._version:
+                if self._version_checked:
+                    self.cache.invalidate()
+                self._version = version
+            self._version_checked = time.monotonic()
+
+    def _cached(self, db: Session, key: str, compute):
+        self._check_version(db)
+        return self.cache.get_or_compute(key, compute)
+
+    def overview(self, db: Session):
+        return self._cached(db, "overview", lambda: self._query_overview(db))
+
+    def by_city(self, db: Session):
+        return self._cached(
+            db, "by_city", lambda: self._query_grouped(db, Student.city, "city")
+        )
+
+    def by_profession(self, db: Session):
+        return self._cached(
+            db, "by_profession", lambda: self._query_grouped(db, Student.profession, "profession")
+        )
+
+    def _query_overview(self, db: Session):
+        """Counts and averages in one scan of `students`"""
+        total, depressed, avg_cgpa, avg_age, suicidal = db.query(
+            func.count(Student.id),
+            func.coalesce(func.sum(case((Student.depression == 1, 1), else_=0)), 0),
+            func.avg(Student.cgpa),
+            func.avg(Student.age),
+            func.coalesce(func.sum(case((Student.suicidal_thoughts == 'Yes', 1), else_=0)), 0)
+        ).one()
+
+        return {
+            "total_students": total,
+            "depressed_count": depressed,
+            "depression_rate": _rate(depressed, total),
+            "avg_cgpa": round(avg_cgpa, 2) if avg_cgpa else 0,
+            "avg_age": round(avg_age, 2) if avg_age else 0,
+            "suicidal_thoughts_count": suicidal,
+            "suicidal_rate": _rate(suicidal, total)
+        }
+
+    def _query_grouped(self, db: Session, column, label: str):
+        """Depression totals and rate per value of `column`"""
+        results = db.query(
+            column,
+            func.count(Student.id).label('total'),
+            func.sum(Student.depression).label('depressed')
+        ).group_by(column).all()
+
+        stats = []
+        for value, total, depressed in results:
+            if value:
+                stats.append({
+                    label: value,
+                    "total": total,
+                    "depressed": depressed or 0,
+                    "rate": round((depressed or 0) / total * 100, 2)
+                })
+
+        return sorted(stats, key=lambda x: x['rate'], reverse=True)
+
+stats_service = StatsService()
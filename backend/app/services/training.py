@@ -0,0 +1,225 @@
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+from sklearn.naive_bayes import GaussianNB
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.student import Student
+from app.services.ml_service import MLService
+from app.services.model_registry import ModelRegistry
+
+DEFAULT_VAR_SMOOTHING = (1e-9, 1e-7, 1e-5, 1e-3)
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+@contextmanager
+def stage(name: str, log: list):
+    """Time a pipeline stage and record it with the process' peak memory"""
+    entry = {"stage": name}
+    start = time.perf_counter()
+    yield entry
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+    entry["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    log.append(entry)
+    print(f"⏱️ {name}: {entry['seconds']}s, peak RSS {entry['peak_rss_mb']} MB")
+
+def _chunks(n: int, chunk_size: int):
+    for start in range(0, n, chunk_size):
+        yield slice(start, min(start + chunk_size, n))
+
+def _open_arrays(data_dir: str):
+    data_dir = Path(data_dir)
+    return (
+        np.load(data_dir / "features.npy", mmap_mode="r"),
+        np.load(data_dir / "labels.npy", mmap_mode="r"),
+        np.load(data_dir / "folds.npy", mmap_mode="r")
+    )
+
+def fit_encoders(ml_service: MLService, db):
+    """Fit the label encoders from the distinct values of each categorical column"""
+    categories = {}
+    for col in ml_service.categorical_columns:
+        column = getattr(Student, col)
+        categories[col] = [value for (value,) in db.query(column).filter(column.isnot(None)).distinct()]
+    ml_service.fit_encoders(categories)
+
+def export_features(ml_service: MLService, db, data_dir: str, folds: int,
+                    chunk_size: int, seed: int = 42):
+    """Stream students into on-disk feature, label and fold arrays
+
+    Rows come from a server-side cursor in `chunk_size` partitions and are
+    encoded straight into memory-mapped .npy files, so memory stays flat
+    however large the table is. Returns the number of rows written.
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    labelled = Student.depression.isnot(None)
+    n = db.query(func.count(Student.id)).filter(labelled).scalar()
+    if n == 0:
+        return 0
+    width = len(ml_service.feature_columns) + len(ml_service.categorical_columns)
+
+    features = np.lib.format.open_memmap(data_dir / "features.npy", mode="w+", dtype=np.float64, shape=(n, width))
+    labels = np.lib.format.open_memmap(data_dir / "labels.npy", mode="w+", dtype=np.int8, shape=(n,))
+    fold_ids = np.lib.format.open_memmap(data_dir / "folds.npy", mode="w+", dtype=np.int8, shape=(n,))
+
+    columns = [getattr(Student, col) for col in ml_service.feature_columns + ml_service.categorical_columns]
+    statement = (
+        select(*columns, Student.depression)
+        .where(labelled)
+        .order_by(Student.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    rng = np.random.default_rng(seed)
+    written = 0
+    for partition in db.execute(statement).partitions():
+        # Rows inserted after the count are left for the next training run
+        partition = partition[:n - written]
+        if not partition:
+            break
+        end = written + len(partition)
+        features[written:end] = ml_service.encode_rows([row[:-1] for row in partition])
+        labels[written:end] = [row[-1] for row in partition]
+        fold_ids[written:end] = rng.integers(0, folds, len(partition))
+        written = end
+
+    for array in (features, labels, fold_ids):
+        array.flush()
+
+    if written < n:
+        # Rows deleted after the count: shrink the arrays to what was written
+        for name, array in (("features", features), ("labels", labels), ("folds", fold_ids)):
+            np.save(data_dir / f"{name}.npy", np.array(array[:written]))
+    return written
+
+def partial_fit_chunks(model: GaussianNB, features, labels, mask_fn, classes, chunk_size: int):
+    """Fit `model` incrementally over the rows selected by `mask_fn(chunk)`"""
+    rows = 0
+    for chunk in _chunks(labels.shape[0], chunk_size):
+        mask = mask_fn(chunk)
+        if not mask.any():
+            continue
+        model.partial_fit(features[chunk][mask], labels[chunk][mask], classes=classes)
+        rows += int(mask.sum())
+    return rows
+
+def evaluate_fold(task: tuple):
+    """Train on every fold but one and score it; runs in a worker process"""
+    data_dir, fold, var_smoothing, classes, chunk_size = task
+    start = time.perf_counter()
+    features, labels, folds = _open_arrays(data_dir)
+
+    model = GaussianNB(var_smoothing=var_smoothing)
+    train_rows = partial_fit_chunks(
+        model, features, labels, lambda chunk: folds[chunk] != fold, classes, chunk_size
+    )
+
+    correct = 0
+    test_rows = 0
+    for chunk in _chunks(labels.shape[0], chunk_size):
+        mask = folds[chunk] == fold
+        if not mask.any():
+            continue
+        predicted = model.predict(features[chunk][mask])
+        correct += int((predicted == labels[chunk][mask]).sum())
+        test_rows += int(mask.sum())
+
+    return {
+        "fold": fold,
+        "var_smoothing": var_smoothing,
+        "accuracy": correct / test_rows if test_rows else 0.0,
+        "train_rows": train_rows,
+        "test_rows": test_rows,
+        "seconds": round(time.perf_counter() - start, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+def cross_validate(data_dir: str, folds: int, grid, classes, chunk_size: int, workers: int):
+    """k-fold cross-validation of every var_smoothing value across a process pool"""
+    tasks = [
+        (str(data_dir), fold, float(var_smoothing), classes, chunk_size)
+        for var_smoothing in grid for fold in range(folds)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(evaluate_fold, tasks))
+
+    sweep = []
+    for var_smoothing in grid:
+        scores = [r["accuracy"] for r in results if r["var_smoothing"] == float(var_smoothing)]
+        sweep.append({
+            "var_smoothing": float(var_smoothing),
+            "mean_accuracy": float(np.mean(scores)),
+            "std_accuracy": float(np.std(scores))
+        })
+    return sweep, results
+
+def train_pipeline(registry: ModelRegistry = None, folds: int = 5, grid=DEFAULT_VAR_SMOOTHING,
+                   chunk_size: int = None, workers: int = None, data_dir: str = None,
+                   activate: bool = True):
+    """Out-of-core training: export features, cross-validate a sweep, fit and publish
+
+    Returns the fitted MLService and a report with the sweep results and the
+    timing and peak memory of each stage.
+    """
+    chunk_size = chunk_size or settings.TRAIN_CHUNK_SIZE
+    workers = workers or settings.TRAIN_WORKERS or os.cpu_count()
+    data_dir = data_dir or settings.TRAIN_DATA_DIR
+    log = []
+    ml_service = MLService()
+
+    db = SessionLocal()
+    try:
+        with stage("encoders", log):
+            fit_encoders(ml_service, db)
+        with stage("export", log) as entry:
+            entry["rows"] = rows = export_features(ml_service, db, data_dir, folds, chunk_size)
+    finally:
+        db.close()
+
+    if rows == 0:
+        raise ValueError("No labelled students to train on")
+
+    features, labels, _ = _open_arrays(data_dir)
+    classes = np.unique(labels)
+
+    with stage("cross_validation", log) as entry:
+        sweep, fold_results = cross_validate(data_dir, folds, grid, classes, chunk_size, workers)
+        entry["tasks"] = len(fold_results)
+        entry["workers"] = workers
+        entry["worker_peak_rss_mb"] = max(r["peak_rss_mb"] for r in fold_results)
+
+    best = max(sweep, key=lambda s: s["mean_accuracy"])
+
+    with stage("final_fit", log) as entry:
+        ml_service.model = GaussianNB(var_smoothing=best["var_smoothing"])
+        entry["rows"] = partial_fit_chunks(
+            ml_service.model, features, labels,
+            lambda chunk: np.ones(chunk.stop - chunk.start, dtype=bool), classes, chunk_size
+        )
+        ml_service._compile()
+
+    with stage("publish", log):
+        version = (registry or ModelRegistry()).publish(
+            ml_service,
+            metrics={"cv_accuracy": best["mean_accuracy"], "cv_std": best["std_accuracy"]},
+            params={"var_smoothing": best["var_smoothing"], "folds": folds, "rows": int(labels.shape[0])},
+            activate=activate
+        )
+
+    return ml_service, {
+        "version": version,
+        "rows": int(labels.shape[0]),
+        "folds": folds,
+        "best": best,
+        "sweep": sweep,
+        "stages": log
+    }
@@ -1,9 +1,17 @@
+import io
+import time
 import pandas as pd
 from sqlalchemy.orm import Session
 from app.models.student import Student
 from app.models.article import Article
+from app.core.config import settings
 from app.core.database import Base, engine
 from app.services.graph_service import GraphService
+from app.services.graph_sync import ensure_change_tracking
+from app.services.stats_service import stats_service
+
+# Every students column except updated_at, which the database maintains
+STUDENT_LOAD_COLUMNS = [column.name for column in Student.__table__.columns if column.name != 'updated_at']
 
 def load_students_to_postgres(csv_path: str, db: Session):
     """Load students CSV to PostgreSQL"""
@@ -45,10 +53,11 @@ def load_students_to_postgres(csv_path: str, db: Session):
         db.merge(student)
     
     db.commit()
+    stats_service.invalidate()
     print(f"✅ Loaded {len(df)} students to PostgreSQL")
 
-def load_students_to_neo4j(csv_path: str):
-    """Load students CSV to Neo4j"""
+def load_students_to_neo4j(csv_path: str, batch_size: int = None, workers: int = None):
+    """Load students CSV to Neo4j using batched UNWIND/MERGE writes"""
     df = pd.read_csv(csv_path)
     df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_').str.replace('/', '_')
     
@@ -58,44 +67,54 @@ def load_students_to_neo4j(csv_path: str):
     }
     df.rename(columns=column_mapping, inplace=True)
     
+    rows = students_to_graph_rows(df)
+    
     graph_service = GraphService()
+    stats = graph_service.bulk_merge_students(rows, batch_size=batch_size, workers=workers)
     
-    for _, row in df.iterrows():
-        # Create student node
-        student_data = {
-            "id": int(row['id']),
-            "gender": row.get('gender', 'Unknown'),
-            "age": float(row['age']) if pd.notna(row.get('age')) else 0,
-            "cgpa": float(row['cgpa']) if pd.notna(row.get('cgpa')) else 0,
-            "depression": int(row['depression']) if pd.notna(row.get('depression')) else 0,
-            "suicidal_thoughts": row.get('suicidal_thoughts', 'Unknown')
-        }
-        graph_service.create_student_node(student_data)
-        
-        # Create relationships
-        if pd.notna(row.get('city')):
-            graph_service.create_city_relationship(int(row['id']), row['city'])
-        
-        if pd.notna(row.get('profession')):
-            graph_service.create_profession_relationship(int(row['id']), row['profession'])
-        
-        if row.get('depression') == 1:
-            graph_service.create_mental_condition_relationship(int(row['id']))
+    print(f"✅ Loaded {stats['rows']} students to Neo4j "
+          f"in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec, {stats['batches']} batches)")
+    return stats
+
+def students_to_graph_rows(df: pd.DataFrame):
+    """Convert a normalized students DataFrame to Neo4j row parameters"""
+    graph_df = pd.DataFrame({
+        "id": df['id'].astype(int),
+        "gender": df['gender'] if 'gender' in df.columns else 'Unknown',
+        "age": df['age'].fillna(0).astype(float) if 'age' in df.columns else 0.0,
+        "cgpa": df['cgpa'].fillna(0).astype(float) if 'cgpa' in df.columns else 0.0,
+        "depression": df['depression'].fillna(0).astype(int) if 'depression' in df.columns else 0,
+        "suicidal_thoughts": df['suicidal_thoughts'] if 'suicidal_thoughts' in df.columns else 'Unknown',
+        "city": df['city'] if 'city' in df.columns else None,
+        "profession": df['profession'] if 'profession' in df.columns else None,
+    })
     
-    print(f"✅ Loaded {len(df)} students to Neo4j")
+    # Bolt cannot send NaN/numpy scalars, so convert to plain Python values
+    graph_df = graph_df.astype(object).where(pd.notna(graph_df), None)
+    return graph_df.to_dict('records')
 
 def load_articles_to_postgres(csv_path: str, db: Session):
-    """Load articles CSV to PostgreSQL"""
+    """Load articles CSV to PostgreSQL, updating articles whose DOI already exists
+    
+    DOI is unique (idx_articles_doi), so re-running the load must not insert
+    the same DOI again; rows without a DOI are always inserted.
+    """
     df = pd.read_csv(csv_path, sep=';', encoding='utf-8')
     
     # Clean column names
     df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
     
+    existing = dict(db.query(Article.doi, Article.id).filter(Article.doi.isnot(None)).all())
+    loaded = {}
+    inserted = 0
+    updated = 0
+    
     for _, row in df.iterrows():
-        article = Article(
+        doi = row.get('item_doi') if pd.notna(row.get('item_doi')) else None
+        values = dict(
             title=row.get('item_title'),
             publication_title=row.get('publication_title'),
-            doi=row.get('item_doi'),
+            doi=doi,
             authors=row.get('authors'),
             publication_year=int(row['publication_year']) if pd.notna(row.get('publication_year')) else None,
             url=row.get('url'),
@@ -105,12 +124,165 @@ def load_articles_to_postgres(csv_path: str, db: Session):
             conclusion=row.get('conclusion'),
             number=int(row['number']) if pd.notna(row.get('number')) else None
         )
-        db.add(article)
+        
+        if doi in loaded:
+            # Same DOI twice in the CSV: keep one article, like the COPY upsert
+            for column, value in values.items():
+                setattr(loaded[doi], column, value)
+            continue
+        
+        if doi in existing:
+            article = db.merge(Article(id=existing[doi], **values))
+            updated += 1
+        else:
+            article = Article(**values)
+            db.add(article)
+            inserted += 1
+        
+        if doi is not None:
+            loaded[doi] = article
     
     db.commit()
-    print(f"✅ Loaded {len(df)} articles to PostgreSQL")
+    print(f"✅ Loaded {len(df)} articles to PostgreSQL ({inserted} inserted, {updated} updated)")
+
+STUDENT_FLOAT_COLUMNS = [
+    'age', 'academic_pressure', 'work_pressure', 'cgpa', 'study_satisfaction',
+    'job_satisfaction', 'work_study_hours', 'financial_stress'
+]
+
+ARTICLE_COLUMN_MAPPING = {
+    'item_title': 'title',
+    'item_doi': 'doi'
+}
+
+def _normalize_students_chunk(chunk: pd.DataFrame):
+    """Clean a raw students CSV chunk into `students` table columns"""
+    chunk.columns = chunk.columns.str.strip().str.lower().str.replace(' ', '_').str.replace('/', '_')
+    chunk = chunk.rename(columns={
+        'have_you_ever_had_suicidal_thoughts_?': 'suicidal_thoughts',
+        'family_history_of_mental_illness': 'family_history'
+    })
+    
+    out = chunk.reindex(columns=STUDENT_LOAD_COLUMNS)
+    out['id'] = out['id'].astype(int)
+    out[STUDENT_FLOAT_COLUMNS] = out[STUDENT_FLOAT_COLUMNS].astype(float)
+    out['depression'] = out['depression'].fillna(0).astype(int)
+    return out
+
+def _normalize_articles_chunk(chunk: pd.DataFrame):
+    """Clean a raw articles CSV chunk into `articles` table columns"""
+    chunk.columns = chunk.columns.str.strip().str.lower().str.replace(' ', '_')
+    chunk = chunk.rename(columns=ARTICLE_COLUMN_MAPPING)
+    
+    # id is a serial column, articles are matched on DOI instead
+    columns = [column.name for column in Article.__table__.columns if column.name != 'id']
+    out = chunk.reindex(columns=columns)
+    out['publication_year'] = out['publication_year'].astype('Int64')
+    out['number'] = out['number'].astype('Int64')
+    return out
+
+def _copy_upsert(chunks, table: str, columns: list, key: str, label: str):
+    """Stream chunks through COPY into a staging table and upsert them into `table`
+    
+    Each chunk is copied into a session-local staging table, merged with
+    INSERT ... ON CONFLICT (key) and truncated, so memory on both the client
+    and the server stays bounded by the chunk size.
+    """
+    column_list = ", ".join(columns)
+    updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in columns if col != key)
+    staging = f"{table}_staging"
+    
+    timings = {"read": 0.0, "copy": 0.0, "upsert": 0.0}
+    total_rows = 0
+    
+    raw_conn = engine.raw_connection()
+    try:
+        cursor = raw_conn.cursor()
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} AS "
+            f"SELECT {column_list} FROM {table} WITH NO DATA"
+        )
+        
+        chunks = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            buffer = io.StringIO()
+            chunk.to_csv(buffer, index=False, header=False, na_rep='\\N')
+            buffer.seek(0)
+            timings["read"] += time.perf_counter() - start
+            
+            start = time.perf_counter()
+            cursor.copy_expert(
+                f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer
+            )
+            timings["copy"] += time.perf_counter() - start
+            
+            start = time.perf_counter()
+            # DISTINCT ON keeps ON CONFLICT from touching the same row twice
+            cursor.execute(
+                f"INSERT INTO {table} ({column_list}) "
+                f"SELECT DISTINCT ON ({key}) {column_list} FROM {staging} "
+                f"WHERE {key} IS NOT NULL ORDER BY {key} "
+                f"ON CONFLICT ({key}) DO UPDATE SET {updates}"
+            )
+            cursor.execute(
+                f"INSERT INTO {table} ({column_list}) "
+                f"SELECT {column_list} FROM {staging} WHERE {key} IS NULL"
+            )
+            cursor.execute(f"TRUNCATE {staging}")
+            raw_conn.commit()
+            timings["upsert"] += time.perf_counter() - start
+            
+            total_rows += len(chunk)
+        
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
+    
+    total = sum(timings.values())
+    print(f"✅ Loaded {total_rows} {label} to PostgreSQL via COPY in {total:.2f}s "
+          f"(read {timings['read']:.2f}s, copy {timings['copy']:.2f}s, upsert {timings['upsert']:.2f}s)")
+    
+    return {"rows": total_rows, "timings": {k: round(v, 3) for k, v in timings.items()}}
+
+def copy_students_to_postgres(csv_path: str, chunk_size: int = None):
+    """Stream students CSV into PostgreSQL with COPY + upsert on id"""
+    chunk_size = chunk_size or settings.LOAD_CHUNK_SIZE
+    reader = pd.read_csv(csv_path, chunksize=chunk_size)
+    
+    result = _copy_upsert(
+        (_normalize_students_chunk(chunk) for chunk in reader),
+        "students", STUDENT_LOAD_COLUMNS, key="id", label="students"
+    )
+    stats_service.invalidate()
+    return result
+
+def copy_articles_to_postgres(csv_path: str, chunk_size: int = None):
+    """Stream articles CSV into PostgreSQL with COPY + upsert on DOI"""
+    chunk_size = chunk_size or settings.LOAD_CHUNK_SIZE
+    reader = pd.read_csv(csv_path, sep=';', encoding='utf-8', chunksize=chunk_size)
+    columns = [column.name for column in Article.__table__.columns if column.name != 'id']
+    
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_doi ON articles(doi)"
+        )
+    
+    return _copy_upsert(
+        (_normalize_articles_chunk(chunk) for chunk in reader),
+        "articles", columns, key="doi", label="articles"
+    )
 
 def create_tables():
     """Create all database tables"""
     Base.metadata.create_all(bind=engine)
+    ensure_change_tracking()
     print("✅ Database tables created")
\ No newline at end of file
@@ -0,0 +1,91 @@
+import csv
+import io
+from datetime import datetime
+from itertools import islice
+import orjson
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+def _batches(rows, size: int):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+def ndjson_chunks(rows, batch_size: int):
+    for batch in _batches(rows, batch_size):
+        yield b"".join(orjson.dumps(row) + b"\n" for row in batch)
+
+def csv_chunks(rows, columns: list, batch_size: int):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    for batch in _batches(rows, batch_size):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+ARROW_TYPES = {int: "int64", float: "float64", str: "string", bool: "bool", datetime: "timestamp[us]"}
+
+def column_types(columns: list):
+    """Python types of SQLAlchemy columns, used to fix the Arrow schema up front"""
+    return {column.name: column.type.python_type for column in columns}
+
+def arrow_chunks(rows, columns: list, batch_size: int, types: dict = None):
+    """Arrow IPC stream, one record batch per chunk of rows"""
+    import pyarrow as pa
+
+    schema = None
+    if types:
+        schema = pa.schema([(column, ARROW_TYPES[types[column]]) for column in columns])
+
+    sink = io.BytesIO()
+    writer = None
+    for batch in _batches(rows, batch_size):
+        # Without declared types the first batch's inferred schema is kept
+        record_batch = pa.RecordBatch.from_pylist(batch, schema=schema)
+        if writer is None:
+            schema = record_batch.schema
+            writer = pa.ipc.new_stream(sink, schema)
+        writer.write_batch(record_batch)
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+
+    if writer is None:
+        writer = pa.ipc.new_stream(sink, schema or pa.schema([(column, pa.null()) for column in columns]))
+    writer.close()
+    yield sink.getvalue()
+
+def stream_rows(rows, columns: list, format: str, filename: str, types: dict = None):
+    """StreamingResponse writing `rows` (an iterator of dicts) incrementally
+
+    Rows are pulled from the iterator one batch at a time, so only one batch
+    is ever held in memory; the server applies backpressure by not asking
+    for the next chunk until the previous one has been sent.
+    """
+    batch_size = settings.EXPORT_BATCH_SIZE
+    if format == "csv":
+        chunks = csv_chunks(rows, columns, batch_size)
+    elif format == "arrow":
+        chunks = arrow_chunks(rows, columns, batch_size, types)
+    else:
+        chunks = ndjson_chunks(rows, batch_size)
+
+    extension = "arrows" if format == "arrow" else format
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'}
+    )
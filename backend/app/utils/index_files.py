@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+@contextmanager
+def build_directory(path):
+    """Write a new build of an index directory aside and swap it in atomically
+
+    Yields a fresh sibling directory to write into. On success `path`
+    becomes a symlink to it, replaced with a single rename, so a reader
+    that resolves `path` once sees either the previous build or the new
+    one, never a mix; a crash mid-write leaves the previous build in use.
+    The previous build is kept for readers still opening its files, older
+    ones are removed.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    build = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+    os.chmod(build, 0o755)
+    try:
+        yield build
+    except BaseException:
+        shutil.rmtree(build, ignore_errors=True)
+        raise
+
+    previous = path.resolve() if path.is_symlink() else None
+    if path.exists() and not path.is_symlink():
+        # Directory written in place before builds were swapped in
+        previous = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+        os.rename(path, previous / "legacy")
+
+    link = path.with_name(f".{path.name}.link")
+    link.unlink(missing_ok=True)
+    os.symlink(build.name, link)
+    os.replace(link, path)
+
+    for stale in path.parent.glob(f".{path.name}-*"):
+        if stale not in (build, previous) and stale.is_dir():
+            shutil.rmtree(stale, ignore_errors=True)
+
+def link_files(source, target, names):
+    """Hard-link unchanged files of a previous build into a new one
+
+    Builds are never modified once swapped in, so sharing their files is
+    safe; falls back to copying where hard links are not supported.
+    """
+    source, target = Path(source), Path(target)
+    for name in names:
+        try:
+            os.link(source / name, target / name)
+        except OSError:
+            shutil.copy2(source / name, target / name)
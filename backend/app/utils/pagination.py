@@ -0,0 +1,37 @@
+from typing import Optional
+from fastapi import HTTPException, Response
+
+def select_columns(model, fields: Optional[str]):
+    """Columns to load for a comma-separated `fields=` projection, None for full rows"""
+    if not fields:
+        return None
+
+    available = model.__table__.columns
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    # id is always returned so keyset clients can continue from the last row
+    if 'id' not in names:
+        names.insert(0, 'id')
+    return [getattr(model, name) for name in names]
+
+def paginate(query, model, response: Response, skip: int, limit: int,
+             after_id: Optional[int] = None, projected: bool = False):
+    """Apply keyset (after_id) or offset pagination
+
+    Keyset pagination seeks on the primary key index, so every page costs the
+    same regardless of depth; start with after_id=0 and pass back the
+    X-Next-Cursor header. Offset pagination is kept for existing callers.
+    """
+    if after_id is not None:
+        rows = query.filter(model.id > after_id).order_by(model.id).limit(limit).all()
+        if rows and len(rows) == limit:
+            response.headers["X-Next-Cursor"] = str(rows[-1].id)
+    else:
+        rows = query.offset(skip).limit(limit).all()
+
+    if projected:
+        return [row._asdict() for row in rows]
+    return rows
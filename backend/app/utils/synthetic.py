@@ -0,0 +1,144 @@
+import re
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+STUDENT_LABEL = 'Depression'
+
+# Numeric columns with more distinct values than this are sampled as continuous
+CONTINUOUS_MIN_VALUES = 40
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def _empirical(values: pd.Series):
+    counts = values.value_counts(dropna=False)
+    return counts.index.to_numpy(), (counts / counts.sum()).to_numpy()
+
+class StudentGenerator:
+    """Synthetic students drawn from the bundled dataset's distributions
+
+    Depression is drawn from its observed rate, then every other column
+    from its empirical distribution within that class (missing values
+    included), so marginals, the class balance and each feature's relation
+    to the label match the source. Continuous columns such as CGPA are
+    resampled with a small Gaussian jitter and clipped to the observed range.
+    """
+
+    def __init__(self, sample: pd.DataFrame, seed: int = 42):
+        self.columns = list(sample.columns)
+        self.rng = np.random.default_rng(seed)
+        labels = sample[STUDENT_LABEL]
+        self.classes, self.class_probs = _empirical(labels)
+        self.distributions = {}
+        for column in self.columns:
+            if column in ('id', STUDENT_LABEL):
+                continue
+            values = sample[column]
+            continuous = (
+                pd.api.types.is_numeric_dtype(values) and values.nunique() > CONTINUOUS_MIN_VALUES
+            )
+            per_class = {label: _empirical(values[labels == label]) for label in self.classes}
+            spread = float(values.std()) * 0.05 if continuous else 0.0
+            bounds = (float(values.min()), float(values.max())) if continuous else None
+            self.distributions[column] = (per_class, spread, bounds)
+
+    @classmethod
+    def from_csv(cls, path: str, seed: int = 42):
+        return cls(pd.read_csv(path), seed)
+
+    def generate(self, n: int, start_id: int = 1):
+        labels = self.rng.choice(self.classes, size=n, p=self.class_probs)
+        data = {'id': np.arange(start_id, start_id + n)}
+        for column, (per_class, spread, bounds) in self.distributions.items():
+            out = np.empty(n, dtype=object)
+            for label, (values, probs) in per_class.items():
+                mask = labels == label
+                out[mask] = self.rng.choice(values, size=int(mask.sum()), p=probs)
+            if bounds is not None:
+                out = out.astype(float)
+                out += self.rng.normal(0, spread, n)
+                out = np.round(np.clip(out, *bounds), 2)
+            data[column] = out
+        data[STUDENT_LABEL] = labels
+        return pd.DataFrame(data)[self.columns]
+
+    def write_csv(self, path: str, n: int, chunk_size: int = 100000, start_id: int = 1):
+        """Write `n` students in the raw CSV layout, one chunk in memory at a time"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            while written < n:
+                size = min(chunk_size, n - written)
+                self.generate(size, start_id + written).to_csv(f, index=False, header=written == 0)
+                written += size
+        return written
+
+class ArticleGenerator:
+    """Synthetic articles whose text follows the bundled corpus
+
+    Each article is modeled on a random source article: most words come
+    from that article's own word distribution and the rest from the whole
+    corpus, so documents keep topical clusters and a realistic vocabulary
+    and TF-IDF behaves as on real data. Lengths follow the source
+    abstracts and introductions; DOIs are unique so COPY upserts insert.
+    """
+
+    TOPIC_WEIGHT = 0.7
+
+    def __init__(self, sample: pd.DataFrame, seed: int = 42):
+        self.rng = np.random.default_rng(seed)
+        self.columns = list(sample.columns)
+        self.sample = sample.reset_index(drop=True)
+        self.records = self.sample.to_dict('records')
+        vocabulary = {}
+
+        def encode(text):
+            tokens = TOKEN_PATTERN.findall(str(text)) if pd.notna(text) else []
+            return np.array([vocabulary.setdefault(token, len(vocabulary)) for token in tokens], dtype=np.int32)
+
+        self.fields = {}
+        for field in ('Item Title', 'Abstract', 'Introduction', 'Conclusion'):
+            self.fields[field] = [encode(text) for text in self.sample.get(field, [])]
+        self.words = np.array(sorted(vocabulary, key=vocabulary.get), dtype=object)
+        self.corpus = np.concatenate([tokens for texts in self.fields.values() for tokens in texts])
+        self.years = _empirical(self.sample['Publication Year'])
+
+    @classmethod
+    def from_csv(cls, path: str, seed: int = 42):
+        return cls(pd.read_csv(path, sep=';', encoding='utf-8-sig'), seed)
+
+    def _text(self, source_tokens: np.ndarray, length: int):
+        if length == 0 or self.corpus.size == 0:
+            return None
+        from_topic = self.rng.random(length) < self.TOPIC_WEIGHT if source_tokens.size else np.zeros(length, bool)
+        ids = self.corpus[self.rng.integers(0, self.corpus.size, length)]
+        ids[from_topic] = source_tokens[self.rng.integers(0, source_tokens.size, int(from_topic.sum()))]
+        return " ".join(self.words[ids])
+
+    def generate(self, n: int, start: int = 1):
+        sources = self.rng.integers(0, len(self.records), n)
+        rows = []
+        for number, source in zip(range(start, start + n), sources):
+            row = dict(self.records[source])
+            for field, texts in self.fields.items():
+                # Length of another random article, text modeled on the source
+                length = texts[self.rng.integers(0, len(texts))].size
+                row[field] = self._text(texts[source], length)
+            row['Item DOI'] = f"10.0000/mindgraph.synthetic.{number}"
+            row['URL'] = f"https://example.org/mindgraph/synthetic/{number}"
+            row['Number'] = number
+            rows.append(row)
+        frame = pd.DataFrame(rows, columns=self.columns)
+        frame['Publication Year'] = self.rng.choice(self.years[0], size=n, p=self.years[1])
+        return frame
+
+    def write_csv(self, path: str, n: int, chunk_size: int = 10000, start: int = 1):
+        """Write `n` articles in the raw ';'-separated CSV layout"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            while written < n:
+                size = min(chunk_size, n - written)
+                self.generate(size, start + written).to_csv(f, sep=';', index=False, header=written == 0)
+                written += size
+        return written
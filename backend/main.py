@@ -1,15 +1,29 @@
-from fastapi import FastAPI
+import asyncio
+import threading
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from app.api.routes import router
+from app.services.graph_engine import graph_engine
+from app.services.graph_queries import graph_queries
 from app.core.config import settings
-from app.services.ml_service import MLService
+from app.core.container import container, warmup
+from app.core.database import (
+    SessionLocal, close_neo4j, get_neo4j, ping_neo4j, ping_postgres, prime_neo4j, prime_postgres
+)
+from app.core.executor import ExecutorSaturated, executor_stats, run_io, shutdown_executors
+from app.core.metrics import MetricsMiddleware, metrics, slow_queries
+from app.services.graph_sync import check_change_tracking, graph_sync
+from app.services.recommendations import recommendations
 
 app = FastAPI(
     title="MindGraphDB API",
     description="API for Mental Health Analysis with Graphs and ML",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS
@@ -19,17 +33,112 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(router, prefix="/api/v1")
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
+@warmup.step("postgres", required=True)
+def warm_postgres():
+    # Only checked here: the DDL locks students, so it runs from init.sql,
+    # create_tables() and scripts/sync_graph.py rather than in every worker
+    change_tracking = check_change_tracking()
+    if not change_tracking["column"]:
+        raise RuntimeError(
+            "students.updated_at is missing. Add it with: python scripts/sync_graph.py"
+        )
+    if change_tracking["trigger"] is False:
+        print("⚠️ students_updated_at trigger missing, SQL updates will not reach Neo4j. "
+              "Add it with: python scripts/sync_graph.py")
+    return {
+        "change_tracking": change_tracking,
+        "connections": prime_postgres(settings.WARMUP_POOL_CONNECTIONS)
+    }
+
+@warmup.step("neo4j", required=True)
+def warm_neo4j():
+    prime_neo4j(settings.WARMUP_POOL_CONNECTIONS)
+    return {"prepared_queries": graph_queries.warm_up()}
+
+@warmup.step("model", required=True)
+def warm_model():
+    model_manager = container.model_manager
+    try:
+        model_manager.refresh()
+    finally:
+        model_manager.start_watcher()
+    if model_manager.service is None:
+        print("⚠️ Model not found. Train it first with: python scripts/train_model.py")
+    return {"version": model_manager.info["version"]}
+
+@warmup.step("search")
+def warm_search():
+    search_service = container.search_service
+    if not search_service.load_index():
+        if not settings.SEARCH_BUILD_ON_STARTUP:
+            print("⚠️ Search index not built yet. Build it with: python scripts/build_search_index.py")
+            return {"loaded": False}
+        db = SessionLocal()
+        try:
+            search_service.fit(db)
+            search_service.fit_embeddings(db)
+        finally:
+            db.close()
+    return {"articles": search_service.index.size, "embeddings": search_service.has_embeddings}
+
+@warmup.step("recommendations")
+def warm_recommendations():
+    if not recommendations.load():
+        return {"loaded": False}
+    search_service = container.search_service
+    if settings.RECOMMENDATION_REFRESH_ON_STARTUP and search_service.is_fitted \
+            and recommendations.refresh(search_service.index):
+        print(f"🔄 Search index changed, recommendations rebuilt ({recommendations.meta['n_docs']} articles)")
+    else:
+        print(f"✅ Recommendations loaded ({recommendations.meta['n_docs']} articles)")
+    return {
+        "articles": recommendations.meta["n_docs"],
+        "current": search_service.is_fitted and recommendations.is_current(search_service.index)
+    }
+
+@warmup.step("graph")
+def warm_graph():
+    if settings.GRAPH_BACKEND != "memory":
+        return {"backend": settings.GRAPH_BACKEND}
+    graph_engine.reload()
+    return graph_engine.status()
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize services on startup"""
+    """Warm up services, in a background thread if WARMUP_IN_BACKGROUND"""
     print("🚀 Starting MindGraphDB API...")
+    enabled = {name.strip() for name in settings.WARMUP_COMPONENTS.split(",") if name.strip()}
+    if settings.WARMUP_IN_BACKGROUND:
+        threading.Thread(target=warmup.run, args=(enabled,), name="mindgraph-warmup", daemon=True).start()
+    else:
+        warmup.run(enabled)
+    graph_sync.start()
     print(f"📚 Docs available at: http://localhost:8000/docs")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background loops, drain the worker pools and close the Neo4j driver"""
+    graph_sync.stop()
+    if container.is_loaded("model_manager"):
+        container.model_manager.stop_watcher()
+    shutdown_executors()
+    close_neo4j()
+
 @app.get("/")
 async def root():
     return {
@@ -43,10 +152,60 @@ async def root():
         }
     }
 
+async def _ping(check):
+    """Run a backend check with HEALTH_TIMEOUT, returns (status, latency_ms)"""
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(run_io(check), timeout=settings.HEALTH_TIMEOUT)
+        status = "connected"
+    except asyncio.TimeoutError:
+        status = "timeout"
+    except Exception:
+        status = "unavailable"
+    return status, round((time.perf_counter() - start) * 1000, 3)
+
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
-        "database": "connected",
-        "neo4j": "connected"
-    }
\ No newline at end of file
+    """Ping PostgreSQL and Neo4j; 503 unless both answer in time"""
+    (database, database_ms), (neo4j, neo4j_ms) = await asyncio.gather(
+        _ping(ping_postgres), _ping(ping_neo4j)
+    )
+    healthy = database == "connected" and neo4j == "connected"
+    return ORJSONResponse(
+        status_code=200 if healthy else 503,
+        content={
+            "status": "healthy" if healthy else "unhealthy",
+            "database": database,
+            "neo4j": neo4j,
+            "latency_ms": {"database": database_ms, "neo4j": neo4j_ms}
+        }
+    )
+
+@app.get("/ready")
+async def readiness():
+    """503 until the startup warm-up has finished, or when a required step failed
+
+    `failed_required` names those steps; startup time is reported per component.
+    """
+    status = warmup.status()
+    return ORJSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Request, query, inference and search metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/slow-queries")
+async def slow_query_log():
+    """Most recent statements slower than SLOW_QUERY_MS"""
+    return {"threshold_ms": slow_queries.threshold_ms, "queries": slow_queries.entries()}
+
+@app.get("/health/executors")
+async def executors_health():
+    """Worker pool utilization and queue depth"""
+    return executor_stats()
+
+@app.get("/health/neo4j")
+async def neo4j_pool_health():
+    """Neo4j sessions open in this process, against the driver's pool size"""
+    return get_neo4j().session_stats()
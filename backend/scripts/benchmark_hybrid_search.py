@@ -0,0 +1,88 @@
+import sys
+sys.path.append('/app')
+
+import argparse
+import re
+import time
+import numpy as np
+from sqlalchemy import func
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.article import Article
+from app.services.search_service import ARTICLE_TSVECTOR, SearchService, any_term_tsquery
+
+WORD = re.compile(r"[a-z]{4,}")
+
+def sample_queries(db, n_queries: int, seed: int = 7):
+    """1-3 word queries drawn from real article titles"""
+    rng = np.random.default_rng(seed)
+    titles = [title for (title,) in db.query(Article.title).filter(Article.title.isnot(None)).limit(5000)]
+    queries = []
+    for _ in range(n_queries):
+        words = WORD.findall(titles[rng.integers(len(titles))].lower())
+        if words:
+            size = min(len(words), int(rng.integers(1, 4)))
+            queries.append(" ".join(rng.choice(words, size, replace=False)))
+    return queries
+
+def match_count(db, query: str):
+    """Articles the hybrid full-text filter matches before the candidate cap"""
+    return db.query(func.count(Article.id)) \
+        .filter(ARTICLE_TSVECTOR.op('@@')(any_term_tsquery(query))).scalar()
+
+def overlap_at_k(expected: list, got: list):
+    return np.mean([
+        len(set(e) & set(g)) / max(len(e), 1) for e, g in zip(expected, got)
+    ]) if expected else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-scan vs hybrid (GIN + TF-IDF) article search")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--index-dir', default=None)
+    parser.add_argument(
+        '--candidates', type=int, default=None,
+        help="Hybrid candidate cap, defaults to SEARCH_HYBRID_CANDIDATES"
+    )
+    args = parser.parse_args()
+    if args.candidates:
+        settings.SEARCH_HYBRID_CANDIDATES = args.candidates
+
+    search_service = SearchService(args.index_dir)
+    db = SessionLocal()
+    try:
+        if not search_service.load_index():
+            print("⚠️ Search index not built yet. Build it with: python scripts/build_search_index.py")
+            return
+        queries = sample_queries(db, args.queries)
+        print(f"📊 {search_service.index.size:,} articles, {len(queries)} queries, k={args.k}")
+
+        # Only these queries lose matches to the cap, so they show what ranking candidates costs
+        cap = settings.SEARCH_HYBRID_CANDIDATES
+        capped = [i for i, query in enumerate(queries) if match_count(db, query) > cap]
+        print(f"   {len(capped)} queries match more than {cap:,} articles")
+
+        baseline = None
+        for mode in ("dense", "inverted", "hybrid"):
+            latencies = []
+            results = []
+            for query in queries:
+                start = time.perf_counter()
+                found = search_service.search(query, args.k, db, mode=mode)
+                latencies.append((time.perf_counter() - start) * 1000)
+                results.append([result["id"] for result in found])
+            if baseline is None:
+                baseline = results
+            overlap = overlap_at_k(baseline, results)
+            capped_overlap = overlap_at_k([baseline[i] for i in capped], [results[i] for i in capped])
+            print(
+                f"   {mode:<10} p50 {np.percentile(latencies, 50):8.2f} ms"
+                f"   p95 {np.percentile(latencies, 95):8.2f} ms"
+                f"   overlap@{args.k} {overlap:.3f}"
+                + (f"   capped {capped_overlap:.3f}" if capped else "")
+            )
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+sys.path.append('/app')
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from app.services.ml_service import MLService
+
+def load_records(csv_path: str):
+    df = pd.read_csv(csv_path)
+    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_').str.replace('/', '_')
+    df.rename(columns={
+        'have_you_ever_had_suicidal_thoughts_?': 'suicidal_thoughts',
+        'family_history_of_mental_illness': 'family_history'
+    }, inplace=True)
+    ml_service = MLService()
+    return df[ml_service.feature_columns + ml_service.categorical_columns].to_dict('records')
+
+def measure(fn, records, iterations: int):
+    latencies = np.empty(iterations)
+    for i in range(iterations):
+        record = records[i % len(records)]
+        start = time.perf_counter()
+        fn(record)
+        latencies[i] = (time.perf_counter() - start) * 1e6
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Single prediction latency: pandas vs compiled NumPy path")
+    parser.add_argument('--model', default='/app/models/depression_model.pkl')
+    parser.add_argument('--data', default='/app/data/raw/Student Depression Dataset.csv')
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    ml_service = MLService()
+    ml_service.load_model(args.model)
+    records = load_records(args.data)
+
+    mismatches = sum(
+        ml_service.predict(record) != ml_service.predict_pandas(record) for record in records
+    )
+    print(f"🔍 Checked {len(records)} records, {mismatches} mismatches between paths")
+
+    # Warm up both paths before timing
+    measure(ml_service.predict_pandas, records, 200)
+    measure(ml_service.predict, records, 200)
+
+    for name, fn in (("pandas", ml_service.predict_pandas), ("numpy", ml_service.predict)):
+        latencies = measure(fn, records, args.iterations)
+        print(
+            f"   {name:<7} p50 {np.percentile(latencies, 50):8.1f} µs"
+            f"   p99 {np.percentile(latencies, 99):8.1f} µs"
+        )
+
+if __name__ == "__main__":
+    main()
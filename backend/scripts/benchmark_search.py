@@ -0,0 +1,102 @@
+import sys
+sys.path.append('/app')
+
+import argparse
+import time
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+from app.services.search_engine import InvertedIndex, top_k
+
+def synthetic_tfidf(n_docs: int, n_terms: int, terms_per_doc: int, seed: int = 42):
+    """L2-normalized TF-IDF-like matrix with a Zipfian term distribution"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.poisson(terms_per_doc, n_docs).clip(1, n_terms)
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+    terms = (rng.zipf(1.3, indptr[-1]) - 1) % n_terms
+    counts = rng.integers(1, 5, indptr[-1]).astype(np.float32)
+
+    matrix = sp.csr_matrix((counts, terms, indptr), shape=(n_docs, n_terms))
+    matrix.sum_duplicates()
+
+    df = np.bincount(matrix.indices, minlength=n_terms)
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    matrix = matrix @ sp.diags(idf.astype(np.float32))
+    return normalize(matrix, norm='l2', copy=False).astype(np.float32).tocsr()
+
+def synthetic_queries(n_queries: int, n_terms: int, seed: int = 7):
+    """Short 1-4 term queries drawn from the same Zipfian vocabulary"""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(n_queries):
+        terms = np.unique((rng.zipf(1.3, rng.integers(1, 5)) - 1) % n_terms)
+        weights = np.ones(terms.size, dtype=np.float32) / np.sqrt(terms.size)
+        queries.append(sp.csr_matrix(
+            (weights, terms, [0, terms.size]), shape=(1, n_terms)
+        ))
+    return queries
+
+def dense_argsort(matrix, query, k):
+    """Current path: score every document and fully sort"""
+    scores = (matrix @ query.T).toarray().ravel()
+    order = scores.argsort()[-k:][::-1]
+    return order[scores[order] > 0]
+
+def dense_top_k(matrix, query, k):
+    scores = (matrix @ query.T).toarray().ravel()
+    order = top_k(scores, k)
+    return order[scores[order] > 0]
+
+def time_queries(fn, queries):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(fn(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies), results
+
+def overlap(expected, got, k):
+    return np.mean([
+        len(set(np.asarray(e)[:k]) & set(np.asarray(g)[:k])) / max(min(k, len(e)), 1)
+        for e, g in zip(expected, got)
+    ])
+
+def main():
+    parser = argparse.ArgumentParser(description="Dense vs inverted-index TF-IDF search benchmark")
+    parser.add_argument('--sizes', default="10000,100000,1000000")
+    parser.add_argument('--terms', type=int, default=50000, help="Vocabulary size")
+    parser.add_argument('--terms-per-doc', type=int, default=60)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    queries = synthetic_queries(args.queries, args.terms)
+
+    for n_docs in [int(size) for size in args.sizes.split(',')]:
+        print(f"\n📊 {n_docs:,} synthetic articles, {args.terms:,} terms")
+        start = time.perf_counter()
+        matrix = synthetic_tfidf(n_docs, args.terms, args.terms_per_doc)
+        index = InvertedIndex(matrix)
+        print(f"   built in {time.perf_counter() - start:.1f}s ({matrix.nnz:,} postings)")
+
+        methods = {
+            "dense + argsort": lambda q: dense_argsort(matrix, q, args.k),
+            "dense + top-k": lambda q: dense_top_k(matrix, q, args.k),
+            "inverted": lambda q: index.search(q, args.k)[0],
+            "inverted + maxscore": lambda q: index.search(q, args.k, early_termination=True)[0],
+        }
+
+        baseline = None
+        for name, fn in methods.items():
+            latencies, results = time_queries(fn, queries)
+            if baseline is None:
+                baseline = results
+            print(
+                f"   {name:<22} p50 {np.percentile(latencies, 50):8.2f} ms"
+                f"   p95 {np.percentile(latencies, 95):8.2f} ms"
+                f"   overlap@{args.k} {overlap(baseline, results, args.k):.3f}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import sys
+sys.path.append('/app')
+
+import argparse
+import time
+import numpy as np
+from app.services.search_engine import IVFIndex, top_k
+
+def synthetic_embeddings(n_docs: int, dim: int, n_topics: int = 200, seed: int = 42):
+    """Unit vectors scattered around topic directions, like LSA document vectors"""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    vectors = np.empty((n_docs, dim), dtype=np.float32)
+    for start in range(0, n_docs, 100000):
+        size = min(100000, n_docs - start)
+        assigned = rng.integers(0, n_topics, size)
+        block = topics[assigned] + 0.8 * rng.standard_normal((size, dim)).astype(np.float32)
+        vectors[start:start + size] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    return vectors
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact vs IVF embedding search: recall@k and latency")
+    parser.add_argument('--sizes', default="10000,100000,500000")
+    parser.add_argument('--dim', type=int, default=256)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--nprobe', default="1,4,8,16,32")
+    args = parser.parse_args()
+
+    for n_docs in [int(size) for size in args.sizes.split(',')]:
+        print(f"\n📊 {n_docs:,} synthetic embeddings, {args.dim} dimensions")
+        vectors = synthetic_embeddings(n_docs, args.dim)
+        queries = synthetic_embeddings(args.queries, args.dim, seed=7)
+
+        start = time.perf_counter()
+        index, order = IVFIndex.build(vectors, int(np.sqrt(n_docs)))
+        vectors = vectors[order]
+        print(f"   IVF built in {time.perf_counter() - start:.1f}s ({index.n_lists} lists)")
+
+        latencies = []
+        exact = []
+        for query in queries:
+            start = time.perf_counter()
+            scores = vectors @ query
+            exact.append(set(top_k(scores, args.k).tolist()))
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"   {'exact':<12} p50 {np.percentile(latencies, 50):8.2f} ms"
+              f"   p95 {np.percentile(latencies, 95):8.2f} ms   recall@{args.k} 1.000")
+
+        for nprobe in [int(value) for value in args.nprobe.split(',')]:
+            latencies = []
+            recalls = []
+            for query, expected in zip(queries, exact):
+                start = time.perf_counter()
+                positions, _ = index.search(vectors, query, args.k, nprobe)
+                latencies.append((time.perf_counter() - start) * 1000)
+                recalls.append(len(expected & set(positions.tolist())) / args.k)
+            print(f"   {f'ivf nprobe={nprobe}':<12} p50 {np.percentile(latencies, 50):8.2f} ms"
+                  f"   p95 {np.percentile(latencies, 95):8.2f} ms   recall@{args.k} {np.mean(recalls):.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+import sys
+sys.path.append('/app')
+
+import argparse
+import json
+import os
+import platform
+import resource
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+
+STUDENTS_CSV = '/app/data/raw/Student Depression Dataset.csv'
+ARTICLES_CSV = '/app/data/raw/articles.csv'
+
+STAGES = ("generate", "load", "stats", "ml", "search", "api")
+
+# Compared between runs: lower is better unless listed in HIGHER_IS_BETTER
+COMPARED_KEYS = ("seconds", "p50_ms", "p95_ms", "p99_ms", "throughput", "peak_rss_mb")
+HIGHER_IS_BETTER = {"throughput"}
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic data at scale and benchmark loaders, stats, ML, search and the API"
+    )
+    parser.add_argument('--students', type=int, default=10000, help="Synthetic students (10k to 10M)")
+    parser.add_argument('--articles', type=int, default=None, help="Synthetic articles (default: students / 100)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', default=None, help="Directory for generated data and indexes")
+    parser.add_argument('--students-csv', default=STUDENTS_CSV, help="Source students CSV to model")
+    parser.add_argument('--articles-csv', default=ARTICLES_CSV, help="Source articles CSV to model")
+    parser.add_argument(
+        '--standin', action='store_true',
+        help="Run in-process: SQLite instead of PostgreSQL and the memory graph instead of Neo4j"
+    )
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--queries', type=int, default=200, help="Calls per search mode and prediction")
+    parser.add_argument('--requests', type=int, default=100, help="Requests per API endpoint")
+    parser.add_argument('--output', default=None, help="JSON report path")
+    parser.add_argument('--compare', default=None, help="Earlier JSON report to compare with")
+    return parser.parse_args()
+
+def configure(args):
+    """Point settings at the work directory; must run before importing app modules"""
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="mindgraph-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    if args.standin:
+        os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+        os.environ["GRAPH_BACKEND"] = "memory"
+    os.environ["SEARCH_INDEX_DIR"] = str(workdir / "search_index")
+    os.environ["SEARCH_EMBEDDING_DIR"] = str(workdir / "embedding_index")
+    os.environ["RECOMMENDATION_DIR"] = str(workdir / "recommendations")
+    os.environ["MODEL_REGISTRY_DIR"] = str(workdir / "registry")
+    os.environ["TRAIN_DATA_DIR"] = str(workdir / "training")
+    os.environ["MODEL_WATCH_INTERVAL"] = "0"
+    os.environ["SYNC_INTERVAL"] = "0"
+    return workdir
+
+def current_rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def summarize(latencies_ms, seconds: float = None):
+    values = np.asarray(latencies_ms, dtype=float)
+    if values.size == 0:
+        return {"count": 0}
+    seconds = seconds if seconds is not None else values.sum() / 1000
+    return {
+        "count": int(values.size),
+        "throughput": round(values.size / seconds, 2) if seconds > 0 else 0.0,
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+def measure(fn, calls):
+    """Call fn(arg) for every arg, returns per-call latencies in ms and the wall time"""
+    latencies = []
+    start = time.perf_counter()
+    for arg in calls:
+        call_start = time.perf_counter()
+        fn(arg)
+        latencies.append((time.perf_counter() - call_start) * 1000)
+    return latencies, time.perf_counter() - start
+
+class Report:
+    def __init__(self, meta: dict):
+        self.meta = meta
+        self.results = {}
+
+    def run(self, name: str, fn, *args, **kwargs):
+        """Run one benchmark, recording its wall time and memory next to its own metrics"""
+        print(f"\n🔄 {name}...")
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs) or {}
+        except Exception as e:
+            print(f"⚠️ {name} failed: {e}")
+            result = {"error": str(e)}
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        result["rss_delta_mb"] = round(current_rss_mb() - rss_before, 1)
+        result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        self.results[name] = result
+        print(f"⏱️ {name}: {json.dumps(result)}")
+        return result
+
+    def to_dict(self):
+        return {"meta": self.meta, "results": self.results}
+
+def bench_generate(args, workdir: Path):
+    from app.utils.synthetic import ArticleGenerator, StudentGenerator
+
+    students_path = workdir / "students.csv"
+    articles_path = workdir / "articles.csv"
+    start = time.perf_counter()
+    students = StudentGenerator.from_csv(args.students_csv, args.seed).write_csv(students_path, args.students)
+    students_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    articles = ArticleGenerator.from_csv(args.articles_csv, args.seed).write_csv(articles_path, args.articles)
+    articles_seconds = time.perf_counter() - start
+    return {
+        "students": students,
+        "students_per_sec": round(students / students_seconds, 1),
+        "students_csv_mb": round(students_path.stat().st_size / 1024 / 1024, 1),
+        "articles": articles,
+        "articles_per_sec": round(articles / articles_seconds, 1),
+        "articles_csv_mb": round(articles_path.stat().st_size / 1024 / 1024, 1)
+    }
+
+def bench_load_postgres(args, workdir: Path):
+    from app.core.database import SessionLocal, engine
+    from app.utils import data_loader
+
+    data_loader.create_tables()
+    students_path = str(workdir / "students.csv")
+    articles_path = str(workdir / "articles.csv")
+    result = {"dialect": engine.dialect.name}
+
+    start = time.perf_counter()
+    if engine.dialect.name == "postgresql":
+        data_loader.copy_students_to_postgres(students_path)
+        data_loader.copy_articles_to_postgres(articles_path)
+        result["mode"] = "copy"
+    else:
+        db = SessionLocal()
+        try:
+            data_loader.load_students_to_postgres(students_path, db)
+            data_loader.load_articles_to_postgres(articles_path, db)
+        finally:
+            db.close()
+        result["mode"] = "orm"
+    elapsed = time.perf_counter() - start
+    result["rows"] = args.students + args.articles
+    result["throughput"] = round(result["rows"] / elapsed, 1)
+    return result
+
+def bench_load_graph(args, workdir: Path):
+    from app.core.config import settings
+
+    start = time.perf_counter()
+    if settings.GRAPH_BACKEND == "memory":
+        from app.services.graph_engine import graph_engine
+        graph_engine.reload(force=True)
+        result = {"backend": "memory", **graph_engine.status()}
+    else:
+        from app.utils.data_loader import load_students_to_neo4j
+        result = {"backend": "neo4j", **(load_students_to_neo4j(str(workdir / "students.csv")) or {})}
+    result["throughput"] = round(args.students / (time.perf_counter() - start), 1)
+    return result
+
+def bench_stats(args):
+    from app.core.database import SessionLocal
+    from app.services.stats_service import stats_service
+
+    result = {}
+    db = SessionLocal()
+    try:
+        for name in ("overview", "by_city", "by_profession"):
+            query = getattr(stats_service, name)
+
+            def cold(_):
+                stats_service.invalidate()
+                query(db)
+
+            cold_ms, _ = measure(cold, range(5))
+            warm_ms, _ = measure(lambda _: query(db), range(args.queries))
+            result[name] = {"cold": summarize(cold_ms), "warm": summarize(warm_ms)}
+    finally:
+        db.close()
+    return result
+
+def _sample_students(workdir: Path, n: int, seed: int):
+    import pandas as pd
+    from app.utils.data_loader import _normalize_students_chunk
+
+    frame = _normalize_students_chunk(pd.read_csv(workdir / "students.csv", nrows=max(n, 1)))
+    return frame.sample(n=min(n, len(frame)), random_state=seed, replace=len(frame) < n).to_dict('records')
+
+def bench_ml(args, workdir: Path):
+    from app.services.model_registry import ModelRegistry
+    from app.services.training import train_pipeline
+
+    start = time.perf_counter()
+    ml_service, report = train_pipeline(ModelRegistry(), folds=3, grid=(1e-9,))
+    train_seconds = time.perf_counter() - start
+
+    records = _sample_students(workdir, max(args.queries, 1000), args.seed)
+    single_ms, single_seconds = measure(ml_service.predict, records[:args.queries])
+
+    start = time.perf_counter()
+    ml_service.predict_many(records)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "train": {
+            "rows": report["rows"],
+            "seconds": round(train_seconds, 3),
+            "throughput": round(report["rows"] / train_seconds, 1),
+            "cv_accuracy": round(report["best"]["mean_accuracy"], 4),
+            "stages": report["stages"]
+        },
+        "predict_single": summarize(single_ms, single_seconds),
+        "predict_batch": {
+            "rows": len(records),
+            "seconds": round(batch_seconds, 4),
+            "throughput": round(len(records) / batch_seconds, 1)
+        }
+    }
+
+def _search_queries(workdir: Path, n: int, seed: int):
+    """1-4 word queries drawn from the generated articles' titles"""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    titles = pd.read_csv(workdir / "articles.csv", sep=';', usecols=['Item Title'], nrows=5000)['Item Title']
+    words = [word for title in titles.dropna() for word in str(title).split() if len(word) > 3]
+    return [" ".join(rng.choice(words, rng.integers(1, 5))) for _ in range(n)]
+
+def bench_search(args, workdir: Path):
+    from app.core.database import SessionLocal, engine
+    from app.services.search_service import SearchService
+
+    search_service = SearchService()
+    result = {}
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        search_service.fit(db)
+        result["fit_tfidf"] = {"seconds": round(time.perf_counter() - start, 3), "docs": search_service.index.size}
+        start = time.perf_counter()
+        search_service.fit_embeddings(db)
+        result["fit_embeddings"] = {"seconds": round(time.perf_counter() - start, 3)}
+
+        modes = ["dense", "inverted", "semantic"]
+        if engine.dialect.name == "postgresql":
+            search_service.ensure_fulltext_index(db)
+            modes.append("hybrid")
+
+        queries = _search_queries(workdir, args.queries, args.seed)
+        for mode in modes:
+            latencies, seconds = measure(lambda query: search_service.search(query, 10, db, mode=mode), queries)
+            result[mode] = summarize(latencies, seconds)
+    finally:
+        db.close()
+    return result
+
+def api_requests(workdir: Path, seed: int):
+    """(name, method, path, body) for every endpoint the benchmark drives"""
+    from app.api.endpoints.students import StudentCreate
+    from app.core.database import SessionLocal
+    from app.models.student import Student
+
+    db = SessionLocal()
+    try:
+        student_id = db.query(Student.id).order_by(Student.id).first()[0]
+    finally:
+        db.close()
+    sample = _sample_students(workdir, 1, seed)[0]
+    student = {
+        key: sample[key] if sample[key] == sample[key] else 0
+        for key in StudentCreate.__fields__
+    }
+    return [
+        ("list_students", "GET", "/api/v1/students/?limit=50", None),
+        ("list_students_keyset", "GET", f"/api/v1/students/?limit=50&after_id={student_id}", None),
+        ("get_student", "GET", f"/api/v1/students/{student_id}", None),
+        ("stats_overview", "GET", "/api/v1/students/stats/overview", None),
+        ("stats_by_city", "GET", "/api/v1/students/stats/by_city", None),
+        ("predict", "POST", "/api/v1/students/predict", student),
+        ("predict_batch_100", "POST", "/api/v1/students/predict/batch", [student] * 100),
+        ("search_dense", "GET", "/api/v1/articles/search?query=salud+mental+estudiantes&mode=dense", None),
+        ("search_semantic", "GET", "/api/v1/articles/search?query=salud+mental+estudiantes&mode=semantic", None),
+        ("graph_cities", "GET", "/api/v1/graphs/cities/depression", None),
+        ("metrics", "GET", "/metrics", None),
+    ]
+
+def bench_api(args, workdir: Path):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    result = {}
+    with TestClient(app) as client:
+        for name, method, path, body in api_requests(workdir, args.seed):
+            statuses = {}
+
+            def call(_):
+                response = client.request(method, path, json=body)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+            latencies, seconds = measure(call, range(args.requests))
+            result[name] = {**summarize(latencies, seconds), "status": statuses}
+    return result
+
+def _flatten(results: dict, prefix: str = ""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and key in COMPARED_KEYS:
+            yield f"{prefix}{key}", value
+
+def compare(report: dict, baseline_path: str):
+    """Print every compared metric next to the baseline run's value"""
+    with open(baseline_path) as f:
+        baseline = dict(_flatten(json.load(f)["results"]))
+    print(f"\n📊 Compared with {baseline_path}:")
+    for name, value in _flatten(report["results"]):
+        old = baseline.get(name)
+        if not old:
+            continue
+        ratio = value / old
+        better = ratio > 1 if name.rsplit(".", 1)[-1] in HIGHER_IS_BETTER else ratio < 1
+        marker = "✅" if better else ("⚠️" if abs(ratio - 1) > 0.1 else "  ")
+        print(f"   {marker} {name:<48} {old:>12.3f} → {value:>12.3f}  ({ratio:.2f}x)")
+
+def main():
+    args = parse_args()
+    args.articles = args.articles or max(100, args.students // 100)
+    workdir = configure(args)
+
+    from app.core.config import settings
+
+    report = Report({
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "students": args.students,
+        "articles": args.articles,
+        "seed": args.seed,
+        "standin": args.standin,
+        "database": settings.DATABASE_URL.split("://")[0],
+        "graph_backend": settings.GRAPH_BACKEND,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "workdir": str(workdir)
+    })
+    print(f"🚀 Benchmarking {args.students} students and {args.articles} articles in {workdir}")
+
+    if "generate" in args.stages:
+        report.run("generate", bench_generate, args, workdir)
+    if "load" in args.stages:
+        report.run("load_postgres", bench_load_postgres, args, workdir)
+        report.run("load_graph", bench_load_graph, args, workdir)
+    if "stats" in args.stages:
+        report.run("stats", bench_stats, args)
+    if "ml" in args.stages:
+        report.run("ml", bench_ml, args, workdir)
+    if "search" in args.stages:
+        report.run("search", bench_search, args, workdir)
+    if "api" in args.stages:
+        report.run("api", bench_api, args, workdir)
+
+    output = Path(args.output or workdir / f"benchmark-{args.students}.json")
+    output.write_text(json.dumps(report.to_dict(), indent=2, default=str))
+    print(f"\n💾 Report saved to {output}")
+
+    if args.compare:
+        compare(report.to_dict(), args.compare)
+
+if __name__ == "__main__":
+    main()
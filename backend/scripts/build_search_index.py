@@ -0,0 +1,65 @@
+import sys
+sys.path.append('/app')
+
+import argparse
+from app.core.database import SessionLocal
+from app.services.recommendations import RecommendationIndex
+from app.services.search_service import SearchService
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the persisted TF-IDF search index")
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help="Only index articles newer than the existing index"
+    )
+    parser.add_argument('--index-dir', default=None, help="Output directory for the index")
+    parser.add_argument(
+        '--embeddings', action='store_true',
+        help="Also build the LSA embedding index used by semantic search"
+    )
+    parser.add_argument('--embedding-dir', default=None, help="Output directory for the embeddings")
+    parser.add_argument(
+        '--recommendations', action='store_true',
+        help="Also precompute related articles and risk-profile recommendations"
+    )
+    parser.add_argument('--recommendation-dir', default=None, help="Output directory for the recommendations")
+    parser.add_argument('--k', type=int, default=None, help="Recommendations kept per article and profile")
+    args = parser.parse_args()
+    
+    search_service = SearchService(args.index_dir, args.embedding_dir)
+    db = SessionLocal()
+    
+    try:
+        search_service.ensure_fulltext_index(db)
+        
+        if args.incremental and search_service.load_index():
+            print("🔄 Adding new articles to the search index...")
+            search_service.add_articles(db)
+            if search_service.index.needs_rebuild:
+                print("🔄 Delta too large, rebuilding the full index...")
+                search_service.fit(db)
+        else:
+            print("🔄 Building search index...")
+            search_service.fit(db)
+        
+        print(f"\n💾 Search index saved to {search_service.index.index_dir}")
+        
+        if args.embeddings:
+            print("\n🔄 Building embedding index...")
+            search_service.fit_embeddings(db)
+            print(f"💾 Embedding index saved to {search_service.embeddings.index_dir}")
+        
+        # Existing recommendations are derived from the index, so they follow its changes
+        recommendations = RecommendationIndex(args.recommendation_dir)
+        if search_service.is_fitted and (recommendations.load() or args.recommendations):
+            print("\n🔄 Precomputing recommendations...")
+            if recommendations.refresh(search_service.index, args.k):
+                print(f"✅ Recommendations built: {recommendations.meta}")
+                print(f"💾 Recommendations saved to {recommendations.index_dir}")
+            else:
+                print("✅ Recommendations already match the search index")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import sys
+sys.path.append('/app')
+
+import argparse
+from app.services.similarity import KNN_METHODS, similarity_pipeline
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Link each student to its nearest neighbors with SIMILAR_TO edges")
+    parser.add_argument('--k', type=int, default=None, help="Neighbors per student")
+    parser.add_argument('--block-size', type=int, default=None, help="Students per k-NN block")
+    parser.add_argument('--method', choices=KNN_METHODS, default="blocked", help="k-NN algorithm")
+    parser.add_argument('--batch-size', type=int, default=None, help="Edges per Neo4j transaction")
+    parser.add_argument('--workers', type=int, default=None, help="k-NN threads")
+    parser.add_argument('--data-dir', default=None, help="Directory for the memory-mapped arrays")
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help="Compute the neighbors and count the edges without writing to Neo4j"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("🚀 Building student similarity graph...")
+    
+    report = similarity_pipeline(
+        k=args.k,
+        block_size=args.block_size,
+        method=args.method,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        data_dir=args.data_dir,
+        write=not args.dry_run
+    )
+    
+    print(f"\n📊 {report['rows']} students, k={report['k']} ({report['method']})")
+    print(f"\n⏱️ Stages:")
+    for entry in report['stages']:
+        print(f"   {entry['stage']:<12} {entry['seconds']:>8.2f}s  peak RSS {entry['peak_rss_mb']:.1f} MB")
+    
+    if args.dry_run:
+        print(f"\n✅ {report['edges']} SIMILAR_TO edges computed (dry run, nothing written)")
+    else:
+        print(f"\n✅ {report['edges']} SIMILAR_TO edges written to Neo4j")
+
+if __name__ == "__main__":
+    main()
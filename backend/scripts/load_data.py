@@ -1,20 +1,43 @@
 import sys
 sys.path.append('/app')
 
+import argparse
+import time
 from app.core.database import SessionLocal, Base, engine
+from app.services.graph_analytics import GraphAnalytics
 from app.utils.data_loader import (
     create_tables,
     load_students_to_postgres,
     load_students_to_neo4j,
-    load_articles_to_postgres
+    load_articles_to_postgres,
+    copy_students_to_postgres,
+    copy_articles_to_postgres
 )
 
+STUDENTS_CSV = '/app/data/raw/Student Depression Dataset.csv'
+ARTICLES_CSV = '/app/data/raw/articles.csv'
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load MindGraphDB datasets")
+    parser.add_argument(
+        '--mode', choices=['orm', 'copy'], default='orm',
+        help="PostgreSQL ingestion path: per-row ORM or streaming COPY + upsert"
+    )
+    parser.add_argument('--chunk-size', type=int, default=None, help="CSV rows per COPY chunk")
+    parser.add_argument('--neo4j-batch-size', type=int, default=None, help="Rows per UNWIND batch")
+    parser.add_argument('--neo4j-workers', type=int, default=None, help="Concurrent Neo4j batches")
+    return parser.parse_args()
+
 def main():
-    print("🚀 Starting data loading process...")
+    args = parse_args()
+    print(f"🚀 Starting data loading process (mode: {args.mode})...")
+    timings = {}
     
     # Create tables
     print("\n1️⃣ Creating database tables...")
+    start = time.perf_counter()
     create_tables()
+    timings['tables'] = time.perf_counter() - start
     
     # Get database session
     db = SessionLocal()
@@ -22,17 +45,45 @@ def main():
     try:
         # Load students to PostgreSQL
         print("\n2️⃣ Loading students to PostgreSQL...")
-        load_students_to_postgres('/app/data/raw/Student Depression Dataset.csv', db)
+        start = time.perf_counter()
+        if args.mode == 'copy':
+            copy_students_to_postgres(STUDENTS_CSV, chunk_size=args.chunk_size)
+        else:
+            load_students_to_postgres(STUDENTS_CSV, db)
+        timings['students_postgres'] = time.perf_counter() - start
         
         # Load students to Neo4j
         print("\n3️⃣ Loading students to Neo4j...")
-        load_students_to_neo4j('/app/data/raw/Student Depression Dataset.csv')
+        start = time.perf_counter()
+        load_students_to_neo4j(
+            STUDENTS_CSV,
+            batch_size=args.neo4j_batch_size,
+            workers=args.neo4j_workers
+        )
+        timings['students_neo4j'] = time.perf_counter() - start
         
         # Load articles
         print("\n4️⃣ Loading articles to PostgreSQL...")
-        load_articles_to_postgres('/app/data/raw/articles.csv', db)
+        start = time.perf_counter()
+        if args.mode == 'copy':
+            copy_articles_to_postgres(ARTICLES_CSV, chunk_size=args.chunk_size)
+        else:
+            load_articles_to_postgres(ARTICLES_CSV, db)
+        timings['articles_postgres'] = time.perf_counter() - start
+        
+        # Precompute graph analytics on the fresh data
+        print("\n5️⃣ Refreshing graph analytics...")
+        start = time.perf_counter()
+        try:
+            GraphAnalytics().ensure_fresh()
+        except Exception as e:
+            print(f"⚠️ Graph analytics skipped (is the GDS plugin installed?): {e}")
+        timings['graph_analytics'] = time.perf_counter() - start
         
         print("\n✅ All data loaded successfully!")
+        print("\n⏱️ Phase timings:")
+        for phase, seconds in timings.items():
+            print(f"   {phase}: {seconds:.2f}s")
         
     except Exception as e:
         print(f"\n❌ Error loading data: {e}")
@@ -41,4 +92,4 @@ def main():
         db.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
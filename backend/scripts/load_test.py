@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+import httpx
+
+SAMPLE_STUDENT = {
+    "gender": "Female",
+    "age": 21,
+    "academic_pressure": 4,
+    "work_pressure": 0,
+    "cgpa": 7.5,
+    "study_satisfaction": 2,
+    "job_satisfaction": 0,
+    "sleep_duration": "5-6 hours",
+    "dietary_habits": "Moderate",
+    "suicidal_thoughts": "No",
+    "work_study_hours": 8,
+    "financial_stress": 3,
+    "family_history": "No"
+}
+
+# (name, weight, method, path, body)
+MIXED_TRAFFIC = [
+    ("stats_overview", 20, "GET", "/api/v1/students/stats/overview", None),
+    ("stats_by_city", 10, "GET", "/api/v1/students/stats/by_city", None),
+    ("list_students", 15, "GET", "/api/v1/students/?limit=50", None),
+    ("search", 20, "GET", "/api/v1/articles/search?query=mental+health+students", None),
+    ("predict", 25, "POST", "/api/v1/students/predict", SAMPLE_STUDENT),
+    ("graph_cities", 10, "GET", "/api/v1/graphs/cities/depression", None),
+]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def worker(client, deadline, latencies, statuses):
+    weights = [entry[1] for entry in MIXED_TRAFFIC]
+    while time.perf_counter() < deadline:
+        name, _, method, path, body = random.choices(MIXED_TRAFFIC, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            statuses[name][response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[name][type(e).__name__] += 1
+            continue
+        latencies[name].append((time.perf_counter() - start) * 1000)
+
+async def run(base_url: str, concurrency: int, duration: float):
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            worker(client, deadline, latencies, statuses) for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+        pools = (await client.get("/health/executors")).json()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"\n📊 {total} requests in {elapsed:.1f}s with {concurrency} clients "
+          f"→ {total / elapsed:.1f} req/s")
+    for name, _, _, _, _ in MIXED_TRAFFIC:
+        values = latencies[name]
+        print(
+            f"   {name:<16} n={len(values):<6} p50 {percentile(values, 50):8.1f} ms"
+            f"   p95 {percentile(values, 95):8.1f} ms   p99 {percentile(values, 99):8.1f} ms"
+            f"   status {dict(statuses[name])}"
+        )
+
+    print("\n🧵 Worker pools:")
+    for name, stats in pools.items():
+        print(f"   {name}: {stats}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent mixed-traffic load test for the API")
+    parser.add_argument('--base-url', default="http://localhost:8000")
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds to run")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.base_url, args.concurrency, args.duration))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import sys
+sys.path.append('/app')
+
+import argparse
+import time
+from app.core.config import settings
+from app.services.graph_sync import SyncInProgress, ensure_change_tracking, graph_sync
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Merge students changed in PostgreSQL into Neo4j")
+    parser.add_argument('--loop', action='store_true', help="Keep syncing every --interval seconds")
+    parser.add_argument('--interval', type=float, default=None, help="Seconds between runs with --loop")
+    parser.add_argument('--batch-size', type=int, default=None, help="Students per Neo4j transaction")
+    parser.add_argument(
+        '--reset', action='store_true',
+        help="Forget the watermark first and merge every student again"
+    )
+    return parser.parse_args()
+
+def print_report(report: dict):
+    print(f"✅ {report['changed']} changed students ({report['rows']} merged, {report['batches']} batches) "
+          f"in {report['seconds']}s, {report['rows_per_sec']} rows/sec")
+    print(f"📊 Watermark {report['watermark']['updated_at']} (id {report['watermark']['last_id']}), "
+          f"{report['pending']} pending, lag {report['lag_seconds']}s")
+
+def main():
+    args = parse_args()
+    if ensure_change_tracking():
+        print("✅ Change tracking on students is in place")
+
+    if args.reset:
+        graph_sync.reset()
+        print("🔄 Watermark reset, every student will be merged again")
+
+    if not args.loop:
+        try:
+            print_report(graph_sync.run_once(args.batch_size))
+        except SyncInProgress as e:
+            print(f"⚠️ {e}, try again later")
+        return
+
+    interval = args.interval or settings.SYNC_INTERVAL or 30.0
+    print(f"🚀 Syncing every {interval}s, Ctrl+C to stop")
+    try:
+        while True:
+            try:
+                report = graph_sync.run_once(args.batch_size)
+                if report['changed'] or report['pending']:
+                    print_report(report)
+            except SyncInProgress:
+                pass
+            except Exception as e:
+                print(f"⚠️ Sync failed, retrying in {interval}s: {e}")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,59 @@
 import sys
 sys.path.append('/app')
 
-import pandas as pd
-from app.services.ml_service import MLService
-from app.core.database import SessionLocal
-from app.models.student import Student
+import argparse
+from app.services.model_registry import ModelRegistry
+from app.services.training import DEFAULT_VAR_SMOOTHING, train_pipeline
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the depression model out of core")
+    parser.add_argument('--folds', type=int, default=5, help="Cross-validation folds")
+    parser.add_argument(
+        '--var-smoothing', type=float, nargs='+', default=list(DEFAULT_VAR_SMOOTHING),
+        help="GaussianNB var_smoothing values to sweep"
+    )
+    parser.add_argument('--chunk-size', type=int, default=None, help="Rows per streamed chunk")
+    parser.add_argument('--workers', type=int, default=None, help="Cross-validation processes")
+    parser.add_argument('--data-dir', default=None, help="Directory for the memory-mapped features")
+    parser.add_argument('--registry-dir', default=None, help="Model registry directory")
+    parser.add_argument(
+        '--no-activate', action='store_true',
+        help="Publish the version without making the API serve it"
+    )
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
     print("🚀 Starting model training...")
     
-    # Get data from database
-    db = SessionLocal()
-    students = db.query(Student).all()
-    
-    # Convert to DataFrame
-    data = []
-    for s in students:
-        data.append({
-            'gender': s.gender,
-            'age': s.age,
-            'academic_pressure': s.academic_pressure,
-            'work_pressure': s.work_pressure,
-            'cgpa': s.cgpa,
-            'study_satisfaction': s.study_satisfaction,
-            'job_satisfaction': s.job_satisfaction,
-            'sleep_duration': s.sleep_duration,
-            'dietary_habits': s.dietary_habits,
-            'suicidal_thoughts': s.suicidal_thoughts,
-            'work_study_hours': s.work_study_hours,
-            'financial_stress': s.financial_stress,
-            'family_history': s.family_history,
-            'depression': s.depression
-        })
-    
-    df = pd.DataFrame(data)
-    print(f"📊 Training on {len(df)} students")
+    registry = ModelRegistry(args.registry_dir)
+    ml_service, report = train_pipeline(
+        registry,
+        folds=args.folds,
+        grid=args.var_smoothing,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        data_dir=args.data_dir,
+        activate=not args.no_activate
+    )
     
-    # Train model
-    ml_service = MLService()
-    results = ml_service.train(df)
+    print(f"\n📊 Trained on {report['rows']} students")
+    print(f"\n🔄 {report['folds']}-fold cross-validation:")
+    for result in report['sweep']:
+        print(f"   var_smoothing={result['var_smoothing']:g}: "
+              f"{result['mean_accuracy']:.2%} ± {result['std_accuracy']:.2%}")
     
+    best = report['best']
     print(f"\n✅ Model trained!")
-    print(f"   Accuracy: {results['accuracy']:.2%}")
-    print(f"   Train size: {results['train_size']}")
-    print(f"   Test size: {results['test_size']}")
+    print(f"   Accuracy: {best['mean_accuracy']:.2%} (cross-validated)")
+    print(f"   var_smoothing: {best['var_smoothing']:g}")
     
-    # Save model
-    ml_service.save_model('/app/models/depression_model.pkl')
-    print(f"\n💾 Model saved to /app/models/depression_model.pkl")
+    print(f"\n⏱️ Stages:")
+    for entry in report['stages']:
+        print(f"   {entry['stage']:<18} {entry['seconds']:>8.2f}s  peak RSS {entry['peak_rss_mb']:.1f} MB")
     
-    db.close()
+    status = "active" if not args.no_activate else "not activated"
+    print(f"\n💾 Model version {report['version']} saved to {registry.root} ({status})")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
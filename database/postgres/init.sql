@@ -6,6 +6,28 @@ CREATE INDEX IF NOT EXISTS idx_students_depression ON students(depression);
 CREATE INDEX IF NOT EXISTS idx_students_city ON students(city);
 CREATE INDEX IF NOT EXISTS idx_students_profession ON students(profession);
 
+-- Change tracking for the incremental Neo4j sync; same as CHANGE_TRACKING_DDL in graph_sync.py
+ALTER TABLE students ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+CREATE INDEX IF NOT EXISTS idx_students_updated_at ON students (updated_at, id);
+CREATE OR REPLACE FUNCTION students_touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS students_updated_at ON students;
+CREATE TRIGGER students_updated_at BEFORE UPDATE ON students
+FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+EXECUTE FUNCTION students_touch_updated_at();
+
 -- Articles indexes
+-- DOI is the upsert key for the COPY loader
+CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_doi ON articles(doi);
 CREATE INDEX IF NOT EXISTS idx_articles_year ON articles(publication_year);
-CREATE INDEX IF NOT EXISTS idx_articles_title ON articles USING gin(to_tsvector('english', title));
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_articles_title ON articles USING gin(to_tsvector('english', title));
+-- Hybrid search candidates; the expression must match ARTICLE_TSVECTOR in search_service.py
+CREATE INDEX IF NOT EXISTS idx_articles_fulltext ON articles USING gin(
+    to_tsvector('english'::regconfig,
+        coalesce(title, '') || ' ' || coalesce(abstract, '') || ' ' || coalesce(introduction, ''))
+);
+CREATE INDEX IF NOT EXISTS idx_articles_content_type ON articles(content_type);
\ No newline at end of file